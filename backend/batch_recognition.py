@@ -0,0 +1,301 @@
+"""
+Reconocimiento por lotes de videos archivados
+
+Cada worker del pool de procesos tiene su propio HandKeypointExtractor (un
+grafo de MediaPipe por proceso, con el tracking reiniciado al empezar cada
+clip) y decodifica + extrae keypoints de un clip por tarea. El proceso principal carga un solo SignLanguageModel y predice en
+batches a medida que llegan las extracciones. Los resultados se escriben en
+streaming (JSONL o CSV) y al relanzar se omiten los clips ya registrados.
+
+Uso: python utils.py --batch <directorio|lista.txt|video>... --output resultados.jsonl
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from config import MODEL_CONFIG, INFERENCE_CONFIG, UPLOAD_CONFIG, get_model_files
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v", ".mpg", ".mpeg"}
+
+CSV_FIELDS = [
+    "clip", "status", "main_prediction", "confidence", "predictions",
+    "frames_sampled", "frames_with_hands", "duration", "decode_ms", "extract_ms", "cached", "error"
+]
+
+
+def discover_clips(inputs: Iterable) -> List[Path]:
+    """
+    Clips a procesar a partir de directorios (recursivo), listas .txt o videos sueltos
+
+    Las rutas de una lista .txt pueden ser relativas a la lista; se ignoran
+    líneas vacías y comentarios (#). El orden es determinista y sin duplicados.
+    """
+    clips = []
+    for item in map(Path, inputs):
+        if item.is_dir():
+            clips.extend(sorted(path for path in item.rglob("*") if path.suffix.lower() in VIDEO_EXTENSIONS))
+        elif item.suffix.lower() == ".txt":
+            for line in item.read_text(encoding="utf-8").splitlines():
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    path = Path(line)
+                    clips.append(path if path.is_absolute() else item.parent / path)
+        else:
+            clips.append(item)
+
+    seen = set()
+    unique = []
+    for clip in clips:
+        key = str(clip.resolve())
+        if key not in seen:
+            seen.add(key)
+            unique.append(clip)
+    return unique
+
+
+def load_completed(output_path: Path) -> Set[str]:
+    """Clips ya registrados en la salida (para reanudar); tolera una última línea cortada"""
+    if not output_path.exists():
+        return set()
+
+    completed = set()
+    with open(output_path, newline="", encoding="utf-8") as f:
+        if output_path.suffix.lower() == ".csv":
+            for row in csv.DictReader(f):
+                if row.get("clip") and row.get("status"):
+                    completed.add(row["clip"])
+        else:
+            for line in f:
+                try:
+                    completed.add(json.loads(line)["clip"])
+                except (json.JSONDecodeError, KeyError):
+                    continue  # Escritura interrumpida
+    return completed
+
+
+def _ends_with_newline(path: Path) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class ResultWriter:
+    """Escritura en streaming de resultados (JSONL o CSV según la extensión), en modo append"""
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        self.is_csv = output_path.suffix.lower() == ".csv"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        write_header = self.is_csv and (not output_path.exists() or output_path.stat().st_size == 0)
+        self._file = open(output_path, "a", newline="", encoding="utf-8")
+        if self._file.tell() and not _ends_with_newline(output_path):
+            self._file.write("\n")  # Cerrar la línea que dejó cortada una interrupción
+        self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS, extrasaction="ignore") if self.is_csv else None
+        if write_header:
+            self._csv.writeheader()
+
+    def write(self, record: Dict[str, Any]):
+        if self.is_csv:
+            row = dict(record)
+            row["predictions"] = ";".join(f"{p['label']}:{p['confidence']:.4f}" for p in record.get("predictions") or [])
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # Cada resultado queda en disco: una interrupción pierde como máximo el batch en curso
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+# ===== WORKERS =====
+_worker_extractor = None
+_worker_cache = None
+
+
+def _init_worker():
+    """Un grafo de MediaPipe por proceso, reutilizado entre clips (extract_video_keypoints reinicia su tracking)"""
+    global _worker_extractor, _worker_cache
+    from keypoint_cache import get_keypoint_cache
+    from keypoint_extractor import HandKeypointExtractor
+    _worker_extractor = HandKeypointExtractor()
+    # La caché de keypoints se comparte en disco con el servidor y entre workers
+    _worker_cache = get_keypoint_cache()
+
+
+def _extract_clip(clip: str, sample_frames: int) -> Dict[str, Any]:
+    """Decodifica y extrae keypoints de un clip (se ejecuta en el worker)"""
+    from video_processing import extract_video_keypoints
+    try:
+        extraction = extract_video_keypoints(clip, sample_frames, extractor=_worker_extractor, cache=_worker_cache)
+    except Exception as e:
+        return {"clip": clip, "error": str(e)}
+    extraction["clip"] = clip
+    return extraction
+
+
+# ===== PROCESO PRINCIPAL =====
+def load_batch_model():
+    """SignLanguageModel con la configuración del servidor"""
+    from model_processor import SignLanguageModel
+    from prediction_cache import create_prediction_cache
+
+    model_files = get_model_files()
+    model = SignLanguageModel(
+        model_path=str(model_files["model_path"]),
+        encoder_path=str(model_files["encoder_path"]),
+        info_path=str(model_files["info_path"]),
+        backend=MODEL_CONFIG["backend"],
+        jit_compile=INFERENCE_CONFIG["jit_compile"],
+        warmup_batch_sizes=INFERENCE_CONFIG["warmup_batch_sizes"],
+        result_mode="lean",
+        prediction_cache=create_prediction_cache()
+    )
+    if not model.load_model_components():
+        raise RuntimeError("No se pudo cargar el modelo")
+    return model
+
+
+def _base_record(extraction: Dict[str, Any]) -> Dict[str, Any]:
+    video = extraction.get("video") or {}
+    timing = extraction.get("timing_ms") or {}
+    return {
+        "clip": extraction["clip"],
+        "frames_sampled": extraction.get("frames_sampled", 0),
+        "frames_with_hands": extraction.get("frames_with_hands", 0),
+        "duration": video.get("duration"),
+        "decode_ms": timing.get("decode"),
+        "extract_ms": timing.get("extract"),
+        "cached": extraction.get("cached", False)
+    }
+
+
+def _predict_pending(model, pending: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    """Predice en un solo batch los clips con secuencia válida"""
+    records = []
+    ready = [extraction for extraction in pending if extraction.get("keypoints") is not None]
+    results = model.predict_batch([e["keypoints"] for e in ready], [top_k] * len(ready)) if ready else []
+    predictions = dict(zip((e["clip"] for e in ready), results))
+
+    for extraction in pending:
+        record = _base_record(extraction)
+        if "error" in extraction:
+            record.update(status="error", error=extraction["error"])
+        elif extraction["clip"] not in predictions:
+            record.update(status="no_hands", error="Menos de 21 frames con ambas manos")
+        elif predictions[extraction["clip"]] is None:
+            # predict_batch devuelve None para las filas que fallaron (el error ya quedó en el log)
+            record.update(status="error", error="Error en predicción del modelo")
+        else:
+            result = predictions[extraction["clip"]]
+            record.update(
+                status="ok",
+                main_prediction=result["main_prediction"],
+                confidence=result["confidence"],
+                predictions=[{"label": p["label"], "confidence": p["confidence"]} for p in result["predictions"]]
+            )
+        records.append(record)
+    return records
+
+
+def run_batch(inputs: Iterable, output_path: Path, workers: Optional[int] = None, top_k: int = 3,
+              batch_size: int = INFERENCE_CONFIG["max_batch_size"], resume: bool = True,
+              sample_frames: int = UPLOAD_CONFIG["sample_frames"], model=None) -> Dict[str, Any]:
+    """
+    Procesa todos los clips y escribe un resultado por clip
+
+    Returns:
+        Resumen con conteos por estado y throughput (clips/s, frames/s)
+    """
+    output_path = Path(output_path)
+    clips = discover_clips(inputs)
+    completed = load_completed(output_path) if resume else set()
+    todo = [clip for clip in clips if str(clip) not in completed]
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+
+    print(f"📂 Clips encontrados: {len(clips)} | ya procesados: {len(clips) - len(todo)} | pendientes: {len(todo)}")
+    summary = {"clips": 0, "ok": 0, "no_hands": 0, "error": 0, "cached": 0, "frames_sampled": 0,
+               "video_frames": 0, "elapsed_s": 0.0, "clips_per_s": 0.0, "frames_per_s": 0.0}
+    if not todo:
+        return summary
+
+    if model is None:
+        model = load_batch_model()
+    if not resume and output_path.exists():
+        output_path.unlink()
+    writer = ResultWriter(output_path)
+
+    print(f"🚀 Procesando con {workers} workers (un grafo de MediaPipe por worker), batch de inferencia {batch_size}")
+    start = time.perf_counter()
+    pending: List[Dict[str, Any]] = []
+
+    def flush():
+        for record in _predict_pending(model, pending, top_k):
+            writer.write(record)
+            summary[record["status"]] += 1
+        pending.clear()
+
+    def collect(extraction: Dict[str, Any]):
+        summary["frames_sampled"] += extraction.get("frames_sampled", 0)
+        summary["cached"] += extraction.get("cached", False)
+        if not extraction.get("cached"):
+            summary["video_frames"] += (extraction.get("video") or {}).get("frame_count", 0)
+        pending.append(extraction)
+        if len(pending) >= batch_size:
+            flush()
+
+    # spawn: los workers no heredan el estado de TensorFlow del proceso principal
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker)
+    futures: Dict[Any, str] = {}
+    consumed = set()
+    try:
+        futures = {pool.submit(_extract_clip, str(clip), sample_frames): str(clip) for clip in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            consumed.add(future)
+            try:
+                extraction = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                # _extract_clip ya captura los errores del clip; esto cubre, p. ej., un resultado que no se pudo enviar
+                extraction = {"clip": futures[future], "error": f"{type(e).__name__}: {e}"}
+            collect(extraction)
+
+            if done % 25 == 0 or done == len(todo):
+                elapsed = time.perf_counter() - start
+                rate = done / elapsed
+                print(f"   {done}/{len(todo)} clips | {rate:.2f} clips/s | "
+                      f"ETA {(len(todo) - done) / rate:.0f}s")
+        flush()
+    except KeyboardInterrupt:
+        print("\n⏹️ Interrumpido: los resultados escritos se conservan, relanzar para reanudar")
+        pool.shutdown(wait=False, cancel_futures=True)
+        flush()
+    except BrokenProcessPool:
+        # Un crash nativo (MediaPipe/OpenCV) mata al worker y con él al pool: los clips
+        # ya extraídos se predicen y escriben antes de propagar el error
+        print("\n💥 Un worker terminó abruptamente: se escriben los clips ya extraídos")
+        for future in futures:
+            if future not in consumed and future.done() and not future.cancelled() and future.exception() is None:
+                collect(future.result())
+        flush()
+        raise
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    summary["clips"] = summary["ok"] + summary["no_hands"] + summary["error"]
+    summary["elapsed_s"] = round(elapsed, 2)
+    summary["clips_per_s"] = round(summary["clips"] / elapsed, 3)
+    summary["frames_per_s"] = round(summary["frames_sampled"] / elapsed, 1)
+    summary["video_frames_per_s"] = round(summary["video_frames"] / elapsed, 1)
+    return summary
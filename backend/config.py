@@ -8,11 +8,19 @@ PROJECT_ROOT = BASE_DIR.parent
 # Rutas del modelo
 MODEL_DIR = PROJECT_ROOT / "models"  # Carpeta donde estarán los modelos entrenados
 MODEL_CONFIG = {
+    "backend": "keras",   # "keras" (TensorFlow completo) | "tflite" (intérprete LiteRT, generar con export_model.py)
     "model_path": MODEL_DIR / "modelo_finetuned_pucp_glosas.keras",
+    "tflite_path": MODEL_DIR / "modelo_finetuned_pucp_glosas.tflite",
     "encoder_path": MODEL_DIR / "label_encoder.pkl", 
     "info_path": MODEL_DIR / "model_info.pkl"
 }
 
+# Archivo del modelo que usa cada backend
+MODEL_BACKEND_PATHS = {
+    "keras": "model_path",
+    "tflite": "tflite_path"
+}
+
 # Configuración del servidor
 SERVER_CONFIG = {
     "host": "127.0.0.1",
@@ -29,13 +37,76 @@ MEDIAPIPE_CONFIG = {
     "min_tracking_confidence": 0.5
 }
 
+# Decodificación de frames
+FRAME_DECODER_CONFIG = {
+    "decoder": "fused",   # "fused": JPEG → RGB 640x480 en un paso | "legacy": imdecode + letterbox + BGR→RGB
+    "target_width": 640,
+    "target_height": 480
+}
+
+# Anotación de landmarks (overlay de depuración)
+ANNOTATION_CONFIG = {
+    "mode": "off",        # "off" | "on_demand" (el cliente pide overlays) | "debug_stream" (overlay en cada frame)
+    "jpeg_quality": 70
+}
+
 # Configuración de captura
 CAPTURE_CONFIG = {
     "target_frames": 50,  # Exactamente 50 frames para el modelo
     "recording_duration": 2.5,  # segundos - optimizado para señas naturales  
     "countdown_duration": 3.0,  # segundos
     "min_frames_for_processing": 50,  # Requerir exactamente 50 frames
-    "target_fps": 20  # 50 frames ÷ 2.5s = 20 FPS exactos
+    "target_fps": 20,  # 50 frames ÷ 2.5s = 20 FPS exactos
+    "buffer_capacity": 128  # Frames del buffer circular de grabación/video upload (holgura sobre 2.8s a 30 FPS)
+}
+
+# Video upload por HTTP: el servidor decodifica el archivo completo
+UPLOAD_CONFIG = {
+    "sample_frames": 50,      # Frames muestreados por timestamp (<= CAPTURE_CONFIG["buffer_capacity"])
+    "max_upload_mb": 100,
+    "min_duration_s": 1.0,
+    "max_duration_s": 60.0,
+    "fallback_fps": 30.0,     # Si el contenedor no informa fps
+    "chunk_size": 1024 * 1024 # Lectura del archivo subido por bloques
+}
+
+# Caché en disco de keypoints extraídos de videos (clave: hash del contenido + parámetros del extractor)
+KEYPOINT_CACHE_CONFIG = {
+    "enabled": True,
+    "directory": BASE_DIR / "cache" / "keypoints",
+    "max_mb": 512             # Tope de tamaño; se desalojan las entradas usadas hace más tiempo (LRU)
+}
+
+# Salida temprana de la grabación (modo countdown)
+EARLY_EXIT_CONFIG = {
+    "mode": "off",            # "off" | "shadow" (solo mide, graba completo) | "on" (corta la grabación)
+    "min_frames": 21,         # Frames con manos antes de la primera evaluación parcial (mínimo del modelo)
+    "interval_frames": 5,     # Evaluar la secuencia parcial cada N frames con manos
+    "min_confidence": 0.85,   # Confianza top-1 mínima
+    "min_margin": 0.5,        # Diferencia mínima entre top-1 y top-2
+    "stable_checks": 2        # Evaluaciones seguidas con la misma glosa para cortar
+}
+
+# Modo continuo: ventana deslizante sin countdown ni pausa
+CONTINUOUS_CONFIG = {
+    "default_mode": "countdown",  # "countdown" | "continuous" (el cliente lo cambia con settings.recognitionMode)
+    "window_frames": 50,       # Frames de la ventana evaluada (~2.5s a 20 FPS)
+    "stride_frames": 10,       # Evaluar cada K frames
+    "min_present_frames": 30,  # Frames con manos requeridos en la ventana (>= 21 para el modelo)
+    "min_confidence": 0.7,     # Confianza top-1 mínima para contar una ventana
+    "stable_windows": 2        # Ventanas consecutivas con la misma glosa para emitir
+}
+
+# Gate de movimiento: ventanas con manos en reposo no llegan al modelo (modo continuo)
+MOTION_GATE_CONFIG = {
+    "enabled": True,
+    "start_threshold": 0.006,     # Desplazamiento medio por frame que abre un intervalo de seña
+    "stop_threshold": 0.003,      # Por debajo de esto el frame cuenta como quieto
+    "onset_frames": 2,            # Frames consecutivos sobre start_threshold para abrir el intervalo
+    "release_frames": 8,          # Frames quietos (o sin manos) para cerrarlo
+    "min_active_frames": 10,      # Frames activos requeridos en la ventana para ejecutar inferencia
+    "min_window_variance": 1e-5,  # Varianza temporal mínima (movement_variance de check_data_quality)
+    "max_segments": 8             # Últimos intervalos guardados para diagnóstico
 }
 
 # Configuración de procesamiento
@@ -46,6 +117,59 @@ PROCESSING_CONFIG = {
     "frame_rate_ms": 66  # ~15 FPS
 }
 
+# Recomendaciones de captura adaptativas enviadas al cliente (rate_hint)
+RATE_CONTROL_CONFIG = {
+    "enabled": True,
+    "ewma_alpha": 0.2,                     # Suavizado de la latencia por frame
+    "warmup_frames": 3,                    # Frames iniciales sin medir (inicialización de MediaPipe)
+    "fps_step": 5,                         # Escalones de fps recomendados al reducir
+    "recover_ratio": 0.75,                 # Volver a calidad completa con latencia < 75% del presupuesto
+    "idle_after_frames": 10,               # Frames seguidos sin manos para pasar a idle
+    "idle_fps": 4,                         # FPS sin manos frente a la cámara
+    "min_fps": 5,                          # Piso con manos si el servidor no da abasto
+    "high_cpu_load": 0.9,                  # loadavg / CPUs a partir del cual se baja calidad
+    "quality_levels": (0.85, 0.7, 0.55),   # Calidad JPEG por nivel (0 = mejor)
+    "width_levels": (640, 480, 320)        # Ancho máximo del frame por nivel (el servidor usa 640x480)
+}
+
+# Ejecutores para el trabajo bloqueante (fuera del event loop de asyncio)
+EXECUTOR_CONFIG = {
+    "frame_workers": 4,      # Hilos para decodificación de frames + MediaPipe
+    "inference_workers": 1   # Worker dedicado para predicciones del modelo
+}
+
+# Ingesta de frames por sesión (backpressure)
+INGEST_CONFIG = {
+    "latest_frame_wins": True,        # Frames de cámara: solo se conserva el más reciente pendiente
+    "keep_all_while_recording": True  # Durante la grabación se procesan todos (calidad de los 50 frames)
+}
+
+# Micro-batching de inferencia: predicciones concurrentes comparten un forward pass
+INFERENCE_CONFIG = {
+    "max_batch_size": 8,   # Solicitudes por batch (1 = sin batching)
+    "max_wait_ms": 10,     # Ventana de espera para juntar solicitudes
+    "jit_compile": False,  # Compilar el forward pass con XLA
+    "warmup_batch_sizes": (1, 2, 4, 8),  # Tamaños calentados al cargar (con XLA, los batches se rellenan a estos)
+    "result_mode": "lean"  # "lean": solo top-k | "full": además raw_probabilities y processing_info
+}
+
+# Caché de predicciones por entrada preprocesada (z-score) cuantizada
+PREDICTION_CACHE_CONFIG = {
+    "enabled": True,
+    "max_entries": 2048,          # ~4 KB por entrada con 1000 clases (float32)
+    "ttl_s": 600,                 # None = sin expiración
+    "quantization_step": 1e-3,    # Entradas que difieren menos que esto comparten entrada
+    "fingerprint_check_s": 5.0    # Cada cuánto revisar si cambiaron los archivos del modelo
+}
+
+# Arranque: el servidor acepta conexiones mientras MediaPipe y el modelo cargan en segundo plano
+STARTUP_CONFIG = {
+    "warm_up_tracking": True,     # Procesar un frame vacío con MediaPipe antes de marcar el tracking listo
+    "tracking_wait_s": 60.0,      # Espera máxima de una conexión WebSocket nueva por el tracking
+    "model_wait_s": 30.0,         # Espera máxima de una predicción por el modelo mientras carga
+    "retry_after_s": 5            # Header Retry-After de los 503 mientras el modelo carga
+}
+
 # Logging
 LOGGING_CONFIG = {
     "level": "INFO",
@@ -67,11 +191,20 @@ def ensure_directories():
             directory.mkdir(parents=True, exist_ok=True)
             print(f"📁 Directorio creado: {directory}")
 
+def get_model_files(backend=None):
+    """Archivos necesarios para servir con el backend indicado (default: MODEL_CONFIG["backend"])"""
+    backend = backend or MODEL_CONFIG["backend"]
+    return {
+        "model_path": MODEL_CONFIG[MODEL_BACKEND_PATHS[backend]],
+        "encoder_path": MODEL_CONFIG["encoder_path"],
+        "info_path": MODEL_CONFIG["info_path"]
+    }
+
 def check_model_files():
     """Verifica si los archivos del modelo existen"""
     missing_files = []
     
-    for name, path in MODEL_CONFIG.items():
+    for name, path in get_model_files().items():
         if not path.exists():
             missing_files.append(f"{name}: {path}")
     
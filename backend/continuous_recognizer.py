@@ -0,0 +1,141 @@
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config import CONTINUOUS_CONFIG
+from keypoint_buffer import KeypointRingBuffer
+from motion_gate import MotionGate
+
+RECOGNITION_MODES = ("countdown", "continuous")
+
+
+class ContinuousRecognizer:
+    """
+    Reconocimiento continuo sobre una ventana deslizante de keypoints
+
+    En lugar de countdown (3s) + grabación (2.8s) + pausa (2s), cada frame se
+    escribe en un buffer circular y cada `stride_frames` frames se evalúa la
+    ventana más reciente. Una predicción se emite cuando la misma glosa supera
+    el umbral de confianza en `stable_windows` ventanas consecutivas.
+
+    Las ventanas sin movimiento (manos en reposo) no llegan al modelo: el
+    `MotionGate` las descarta y, al cerrar un intervalo de seña, fuerza la
+    evaluación sin esperar el stride.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 motion_gate_config: Optional[Dict[str, Any]] = None):
+        config = {**CONTINUOUS_CONFIG, **(config or {})}
+        self.window_frames = config["window_frames"]
+        self.stride_frames = config["stride_frames"]
+        self.min_present_frames = config["min_present_frames"]
+        self.min_confidence = config["min_confidence"]
+        self.stable_windows = config["stable_windows"]
+
+        # Holgura sobre la ventana para que los frames que llegan no la pisen de inmediato
+        self.buffer = KeypointRingBuffer(self.window_frames + self.stride_frames)
+        self.motion_gate = MotionGate(self.window_frames, motion_gate_config)
+
+        # Métricas
+        self.windows_evaluated = 0
+        self.predictions_emitted = 0
+        self.reset()
+
+    def reset(self):
+        """Descarta la ventana y el estado de estabilidad"""
+        self.buffer.clear()
+        self.motion_gate.reset()
+        self._frames_since_inference = 0
+        self._candidate_label: Optional[str] = None
+        self._candidate_streak = 0
+        self._last_emitted_label: Optional[str] = None
+        self.last_window_at: Optional[float] = None
+
+    def add_frame(self, keypoints: Optional[np.ndarray], timestamp: Optional[float] = None):
+        """Escribe un frame en la ventana (None = frame sin manos)"""
+        self.buffer.append(keypoints, timestamp)
+        self.motion_gate.update(keypoints)
+        self._frames_since_inference += 1
+
+    def window_ready(self) -> bool:
+        """
+        True si toca evaluar la ventana: pasó el stride (o terminó un intervalo de seña),
+        hay suficientes frames con manos y la ventana tiene movimiento
+        """
+        gate = self.motion_gate
+        due = (self._frames_since_inference >= self.stride_frames or
+               (gate.segment_ended and self._frames_since_inference > 0))
+        if not (due and
+                len(self.buffer) >= self.window_frames and
+                self.buffer.present_count(self.window_frames) >= self.min_present_frames):
+            return False
+
+        if not gate.window_has_activity(self.buffer.present_keypoints(self.window_frames)):
+            gate.record(executed=False)
+            self._frames_since_inference = 0
+            return False
+
+        gate.record(executed=True)
+        return True
+
+    def take_window(self) -> np.ndarray:
+        """
+        Copia de los frames con manos de la ventana más reciente
+
+        Se copia porque la inferencia es asíncrona y los frames siguientes siguen
+        escribiéndose en el buffer mientras el modelo corre.
+        """
+        self._frames_since_inference = 0
+        self.last_window_at = time.time()
+        window = self.buffer.present_keypoints(self.window_frames)
+        return window.copy() if window.base is not None else window
+
+    def observe(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Actualiza la estabilidad con la predicción de una ventana
+
+        Returns:
+            El resultado a emitir si la predicción es estable, o None
+        """
+        self.windows_evaluated += 1
+        label = result.get("main_prediction")
+        confidence = result.get("confidence", 0.0)
+
+        if label is None or confidence < self.min_confidence:
+            # Ventana sin una glosa clara: corta la racha y permite repetir la última
+            self._candidate_label = None
+            self._candidate_streak = 0
+            self._last_emitted_label = None
+            return None
+
+        if label == self._candidate_label:
+            self._candidate_streak += 1
+        else:
+            self._candidate_label = label
+            self._candidate_streak = 1
+
+        if self._candidate_streak >= self.stable_windows and label != self._last_emitted_label:
+            self._last_emitted_label = label
+            self.predictions_emitted += 1
+            return result
+        return None
+
+    def get_progress(self) -> Dict[str, Any]:
+        """Estado de la ventana para el cliente"""
+        return {
+            "window_frames": len(self.buffer),
+            "window_present_frames": self.buffer.present_count(self.window_frames),
+            "candidate": self._candidate_label,
+            "streak": self._candidate_streak,
+            "motion_active": self.motion_gate.active
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "windows_evaluated": self.windows_evaluated,
+            "predictions_emitted": self.predictions_emitted,
+            "window_frames": self.window_frames,
+            "stride_frames": self.stride_frames,
+            "motion_gate": self.motion_gate.get_stats()
+        }
@@ -0,0 +1,250 @@
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config import EARLY_EXIT_CONFIG, CAPTURE_CONFIG, MODEL_CONFIG
+from metrics import Histogram
+
+EARLY_EXIT_MODES = ("off", "shadow", "on")
+
+# Tiempo desde el inicio de la grabación hasta tener la predicción
+TIME_TO_RESULT_BUCKETS_MS = (250, 500, 750, 1000, 1250, 1500, 2000, 2500, 3000, 4000)
+
+
+class EarlyExitPolicy:
+    """
+    Salida temprana de la grabación cuando la predicción parcial ya es clara
+
+    Desde `min_frames` frames con manos, cada `interval_frames` frames se evalúa
+    la secuencia parcial (el preprocesador la remuestrea a 50 frames). Si la
+    top-1 supera `min_confidence` con un margen sobre la segunda de al menos
+    `min_margin` en `stable_checks` evaluaciones seguidas, la grabación termina.
+
+    Modos:
+        off:    grabación de duración fija (comportamiento original)
+        shadow: evalúa y registra dónde habría cortado, pero graba completo y
+                compara esa predicción con la de la secuencia completa
+        on:     corta la grabación en el punto de salida
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = {**EARLY_EXIT_CONFIG, **(config or {})}
+        if config["mode"] not in EARLY_EXIT_MODES:
+            raise ValueError(f"Modo de salida temprana inválido: {config['mode']} (opciones: {EARLY_EXIT_MODES})")
+        self.mode = config["mode"]
+        self.min_frames = config["min_frames"]
+        self.interval_frames = config["interval_frames"]
+        self.min_confidence = config["min_confidence"]
+        self.min_margin = config["min_margin"]
+        self.stable_checks = config["stable_checks"]
+
+        # Métricas
+        self.partial_checks = 0
+        self.recordings = 0
+        self.early_exits = 0
+        self.shadow_comparisons = 0
+        self.shadow_agreements = 0
+        self.shadow_frames_saved = 0
+        self.shadow_time_saved_ms = 0.0
+        self.time_to_result = {
+            path: Histogram(f"time_to_result_{path}_ms", TIME_TO_RESULT_BUCKETS_MS,
+                            f"Inicio de grabación -> predicción ({path})")
+            for path in ("early", "full")
+        }
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def reset(self):
+        """Estado de una nueva grabación"""
+        self._next_check_at = self.min_frames
+        self._label: Optional[str] = None
+        self._streak = 0
+        self.exit_point: Optional[Dict[str, Any]] = None
+
+    def check_due(self, present_frames: int) -> bool:
+        """True si toca evaluar la secuencia parcial"""
+        return self.enabled and self.exit_point is None and present_frames >= self._next_check_at
+
+    def observe(self, result: Dict[str, Any], present_frames: int, elapsed: float) -> bool:
+        """
+        Registra la predicción de una secuencia parcial
+
+        Args:
+            result: Resultado de predict() (top-k >= 2 para calcular el margen)
+            present_frames: Frames con manos de la secuencia parcial
+            elapsed: Segundos desde el inicio de la grabación
+
+        Returns:
+            True si la grabación debe terminar ahora (solo en modo "on")
+        """
+        self.partial_checks += 1
+        self._next_check_at = present_frames + self.interval_frames
+
+        predictions = result["predictions"]
+        confidence = predictions[0]["confidence"]
+        margin = confidence - (predictions[1]["confidence"] if len(predictions) > 1 else 0.0)
+
+        if confidence < self.min_confidence or margin < self.min_margin:
+            self._label = None
+            self._streak = 0
+            return False
+
+        label = predictions[0]["label"]
+        self._streak = self._streak + 1 if label == self._label else 1
+        self._label = label
+        if self._streak < self.stable_checks:
+            return False
+
+        self.exit_point = {
+            "label": label,
+            "confidence": confidence,
+            "margin": margin,
+            "frames": present_frames,
+            "elapsed_ms": elapsed * 1000
+        }
+        return self.mode == "on"
+
+    def finish(self, label: Optional[str], present_frames: int, elapsed: float) -> Dict[str, Any]:
+        """
+        Cierra la grabación con la predicción entregada al cliente
+
+        Args:
+            label: Glosa predicha (None si la predicción falló)
+            present_frames: Frames con manos de la secuencia predicha
+            elapsed: Segundos desde el inicio de la grabación hasta la predicción
+
+        Returns:
+            Resumen de la grabación para la respuesta
+        """
+        self.recordings += 1
+        elapsed_ms = elapsed * 1000
+        early = self.mode == "on" and self.exit_point is not None
+        self.time_to_result["early" if early else "full"].observe(elapsed_ms)
+
+        report = {"mode": self.mode, "early_exit": early, "time_to_result_ms": round(elapsed_ms, 1)}
+        if early:
+            self.early_exits += 1
+        elif self.mode == "shadow" and self.exit_point is not None and label is not None:
+            agreed = self.exit_point["label"] == label
+            frames_saved = present_frames - self.exit_point["frames"]
+            time_saved_ms = elapsed_ms - self.exit_point["elapsed_ms"]
+            self.shadow_comparisons += 1
+            self.shadow_agreements += agreed
+            self.shadow_frames_saved += frames_saved
+            self.shadow_time_saved_ms += time_saved_ms
+            report["shadow"] = {
+                "label": self.exit_point["label"],
+                "agrees": agreed,
+                "frames_saved": frames_saved,
+                "time_saved_ms": round(time_saved_ms, 1)
+            }
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            "mode": self.mode,
+            "recordings": self.recordings,
+            "partial_checks": self.partial_checks,
+            "early_exits": self.early_exits,
+            "time_to_result_ms": {path: histogram.snapshot() for path, histogram in self.time_to_result.items()}
+        }
+        if self.shadow_comparisons:
+            stats["shadow"] = {
+                "comparisons": self.shadow_comparisons,
+                "agreement": self.shadow_agreements / self.shadow_comparisons,
+                "mean_frames_saved": self.shadow_frames_saved / self.shadow_comparisons,
+                "mean_time_saved_ms": self.shadow_time_saved_ms / self.shadow_comparisons
+            }
+        return stats
+
+
+def evaluate_early_exit(model, sequences: List[np.ndarray], labels: Optional[List[str]] = None,
+                        config: Optional[Dict[str, Any]] = None, fps: float = CAPTURE_CONFIG["target_fps"]) -> Dict[str, Any]:
+    """
+    Simula la salida temprana sobre grabaciones completas (sin cámara)
+
+    Cada secuencia se recorre por prefijos como lo haría la grabación en vivo; se
+    compara la predicción en el punto de salida con la de la secuencia completa
+    (y con la etiqueta real si se pasa `labels`). El tiempo se estima a `fps`.
+    """
+    policy = EarlyExitPolicy({**(config or {}), "mode": "on"})
+    exits = agreements = correct_full = correct_early = 0
+    frames_used = []
+    for index, sequence in enumerate(sequences):
+        policy.reset()
+        full_label = model.predict(sequence, top_k=2)["main_prediction"]
+        exit_label, used = full_label, sequence.shape[0]
+        for frames in range(policy.min_frames, sequence.shape[0] + 1):
+            if not policy.check_due(frames):
+                continue
+            if policy.observe(model.predict(sequence[:frames], top_k=2), frames, frames / fps):
+                exit_label, used = policy.exit_point["label"], frames
+                exits += 1
+                break
+        frames_used.append(used)
+        agreements += exit_label == full_label
+        if labels is not None:
+            correct_full += full_label == labels[index]
+            correct_early += exit_label == labels[index]
+
+    count = len(sequences)
+    total_frames = sum(sequence.shape[0] for sequence in sequences)
+    report = {
+        "sequences": count,
+        "early_exits": exits,
+        "agreement_with_full": agreements / count,
+        "mean_frames_used": float(np.mean(frames_used)),
+        "mean_time_to_result_ms": float(np.mean(frames_used)) / fps * 1000,
+        "mean_time_full_ms": total_frames / count / fps * 1000
+    }
+    if labels is not None:
+        report["accuracy_full"] = correct_full / count
+        report["accuracy_early"] = correct_early / count
+    return report
+
+
+def main():
+    """Reporte de salida temprana sobre secuencias grabadas (.npz/.npy) o sintéticas"""
+    import argparse
+    from pathlib import Path
+    from export_model import generate_fixtures, load_fixtures
+    from model_processor import SignLanguageModel
+
+    parser = argparse.ArgumentParser(description="Evaluación de salida temprana")
+    parser.add_argument("--fixtures", type=Path, help="Secuencias grabadas (.npz/.npy)")
+    parser.add_argument("--labels", type=Path, help="Etiquetas reales (una por línea, mismo orden)")
+    parser.add_argument("--min-confidence", type=float, default=EARLY_EXIT_CONFIG["min_confidence"])
+    parser.add_argument("--min-margin", type=float, default=EARLY_EXIT_CONFIG["min_margin"])
+    args = parser.parse_args()
+
+    model = SignLanguageModel(
+        model_path=str(MODEL_CONFIG["model_path"]),
+        encoder_path=str(MODEL_CONFIG["encoder_path"]),
+        info_path=str(MODEL_CONFIG["info_path"])
+    )
+    if not model.load_model_components():
+        print("❌ No se pudo cargar el modelo")
+        return 1
+
+    sequences = load_fixtures(args.fixtures) if args.fixtures else generate_fixtures()
+    labels = args.labels.read_text().split() if args.labels else None
+    report = evaluate_early_exit(model, sequences, labels,
+                                 {"min_confidence": args.min_confidence, "min_margin": args.min_margin})
+
+    print(f"\n⚡ Salida temprana (confianza >= {args.min_confidence}, margen >= {args.min_margin}):")
+    print(f"   Secuencias: {report['sequences']}, cortadas antes: {report['early_exits']}")
+    print(f"   Frames usados: {report['mean_frames_used']:.1f} en promedio")
+    print(f"   Tiempo hasta el resultado: {report['mean_time_to_result_ms']:.0f} ms "
+          f"(grabación completa: {report['mean_time_full_ms']:.0f} ms)")
+    print(f"   Concordancia con la secuencia completa: {report['agreement_with_full']:.1%}")
+    if labels is not None:
+        print(f"   Accuracy completa: {report['accuracy_full']:.1%} | con salida temprana: {report['accuracy_early']:.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Exporta el modelo Keras a TensorFlow Lite y verifica la paridad de predicciones
+
+Uso:
+    python export_model.py                     # .keras -> .tflite + verificación de paridad
+    python export_model.py --quantize          # Cuantización de pesos (dynamic range)
+    python export_model.py --check-only        # Solo compara los backends existentes
+    python export_model.py --fixtures seq.npz  # Secuencias propias (frames, 42, 2) para la paridad
+
+Para servir con el .tflite: MODEL_CONFIG["backend"] = "tflite" en config.py.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from config import MODEL_CONFIG, INFERENCE_CONFIG
+from inference_backends import KerasBackend
+from model_processor import SignLanguageModel
+
+
+def export_tflite(keras_path: Path, output_path: Path, quantize: bool = False) -> Path:
+    """Convierte el modelo .keras a .tflite desde su forward pass compilado"""
+    import tensorflow as tf
+
+    print(f"📦 Exportando {keras_path.name} -> {output_path.name}")
+    backend = KerasBackend(str(keras_path))
+    backend.load()
+
+    # Sin pasar el modelo como trackable: las variables se congelan como constantes
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([backend.get_concrete_function()])
+    if quantize:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    tflite_model = converter.convert()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(tflite_model)
+
+    size_mb = len(tflite_model) / (1024 * 1024)
+    print(f"✅ Modelo TFLite guardado: {output_path} ({size_mb:.2f} MB)")
+    return output_path
+
+
+def generate_fixtures(count: int = 64, seed: int = 0) -> List[np.ndarray]:
+    """Secuencias sintéticas (trayectorias suaves en [0, 1]) de largo variable"""
+    rng = np.random.default_rng(seed)
+    fixtures = []
+    for _ in range(count):
+        frames = int(rng.integers(21, 61))
+        start = rng.random((42, 2))
+        drift = rng.normal(0, 0.01, (frames, 42, 2)).cumsum(axis=0)
+        fixtures.append(np.clip(start + drift, 0, 1).astype(np.float32))
+    return fixtures
+
+
+def load_fixtures(path: Path) -> List[np.ndarray]:
+    """Carga secuencias (frames, 42, 2) desde un .npz (una secuencia por clave) o .npy"""
+    if path.suffix == ".npz":
+        with np.load(path) as data:
+            return [data[key].astype(np.float32) for key in data.files]
+    array = np.load(path)
+    return [array.astype(np.float32)] if array.ndim == 3 else [seq.astype(np.float32) for seq in array]
+
+
+def compare_backends(reference: SignLanguageModel, candidate: SignLanguageModel,
+                     fixtures: List[np.ndarray], top_k: int = 3) -> Dict[str, float]:
+    """Compara top-1, top-k y probabilidades entre dos backends"""
+    reference_results = reference.predict_batch(fixtures, [top_k] * len(fixtures), include_probabilities=True)
+    candidate_results = candidate.predict_batch(fixtures, [top_k] * len(fixtures), include_probabilities=True)
+
+    top1_matches = 0
+    topk_overlap = 0.0
+    max_probability_diff = 0.0
+    for expected, actual in zip(reference_results, candidate_results):
+        expected_labels = [p['label'] for p in expected['predictions']]
+        actual_labels = [p['label'] for p in actual['predictions']]
+        top1_matches += expected_labels[0] == actual_labels[0]
+        topk_overlap += len(set(expected_labels) & set(actual_labels)) / len(expected_labels)
+        max_probability_diff = max(max_probability_diff, float(np.max(np.abs(
+            np.asarray(expected['raw_probabilities']) - np.asarray(actual['raw_probabilities'])
+        ))))
+
+    count = len(fixtures)
+    return {
+        "fixtures": count,
+        "top1_agreement": top1_matches / count,
+        "topk_overlap": topk_overlap / count,
+        "max_probability_diff": max_probability_diff
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportación del modelo LSP-AYNI a TFLite")
+    parser.add_argument("--output", type=Path, default=MODEL_CONFIG["tflite_path"], help="Ruta del .tflite")
+    parser.add_argument("--quantize", action="store_true", help="Cuantizar pesos (modelo más chico, revisar paridad)")
+    parser.add_argument("--check-only", action="store_true", help="No exportar, solo verificar paridad")
+    parser.add_argument("--fixtures", type=Path, help="Secuencias de prueba (.npz/.npy)")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--min-agreement", type=float, default=0.99, help="Concordancia top-1 mínima")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if not args.check_only:
+        export_tflite(MODEL_CONFIG["model_path"], args.output, quantize=args.quantize)
+
+    models = {}
+    for backend, model_path in (("keras", MODEL_CONFIG["model_path"]), ("tflite", args.output)):
+        model = SignLanguageModel(
+            model_path=str(model_path),
+            encoder_path=str(MODEL_CONFIG["encoder_path"]),
+            info_path=str(MODEL_CONFIG["info_path"]),
+            backend=backend,
+            warmup_batch_sizes=INFERENCE_CONFIG["warmup_batch_sizes"]
+        )
+        if not model.load_model_components():
+            print(f"❌ No se pudo cargar el backend {backend}")
+            return 1
+        models[backend] = model
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else generate_fixtures()
+    report = compare_backends(models["keras"], models["tflite"], fixtures, top_k=args.top_k)
+
+    print("\n🔍 Paridad keras vs tflite:")
+    print(f"   Secuencias: {report['fixtures']}")
+    print(f"   Concordancia top-1: {report['top1_agreement']:.1%}")
+    print(f"   Solapamiento top-{args.top_k}: {report['topk_overlap']:.1%}")
+    print(f"   Diferencia máxima de probabilidad: {report['max_probability_diff']:.2e}")
+
+    if report["top1_agreement"] < args.min_agreement:
+        print(f"❌ Concordancia por debajo de {args.min_agreement:.0%}")
+        return 1
+
+    print("✅ Backends equivalentes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Union
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+FRAMES_RECEIVED = REGISTRY.counter("frames_received_total", "Frames recibidos por WebSocket", ("source",))
+FRAMES_DROPPED = REGISTRY.counter("frames_dropped_total", "Frames de cámara reemplazados por uno más nuevo antes de procesarse")
+
+
+class IngestedFrame:
+    """Frame recibido pendiente de procesar"""
+
+    __slots__ = ("data", "source", "sequence", "droppable", "received_at")
+
+    def __init__(self, data, source: str, sequence: Optional[int], droppable: bool):
+        self.data = data
+        self.source = source
+        self.sequence = sequence
+        self.droppable = droppable
+        self.received_at = time.time()
+
+
+class IngestJob:
+    """Tarea encolada entre frames (p. ej. dibujar un overlay); nunca se descarta"""
+
+    __slots__ = ("run",)
+    droppable = False
+
+    def __init__(self, run: Callable[[], Awaitable[None]]):
+        self.run = run
+
+
+class FrameIngest:
+    """
+    Ingesta de frames por sesión con backpressure "el último frame gana"
+
+    El bucle de recepción del WebSocket solo encola; un worker por sesión
+    procesa los frames en orden. Un frame de cámara descartable reemplaza al
+    frame descartable pendiente (el viejo se cuenta como descartado), así que
+    la latencia queda acotada a un frame aunque el cliente envíe más rápido de
+    lo que el servidor procesa. Los frames marcados como no descartables
+    (video upload, grabación) se conservan todos.
+
+    El worker es el único que usa el extractor de la sesión mientras está
+    activo: lo que necesite el estado del último frame (overlays) se encola
+    como `IngestJob` y corre en orden entre frames.
+    """
+
+    def __init__(self, handler: Callable[[IngestedFrame], Awaitable[None]], session_id: str = ""):
+        self.handler = handler
+        self.session_id = session_id
+        self._pending: Deque[Union[IngestedFrame, IngestJob]] = deque()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._worker: Optional[asyncio.Task] = None
+
+        # Métricas
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.max_pending = 0
+
+    def start(self):
+        """Lanza el worker de la sesión"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    def submit(self, data, source: str = "camera", sequence: Optional[int] = None, droppable: bool = True):
+        """
+        Encola un frame sin esperar su procesamiento
+
+        Args:
+            data: Frame en base64 o JPEG crudo
+            source: Origen del frame ("camera" o "upload")
+            sequence: Número de secuencia del protocolo binario
+            droppable: False para conservar el frame aunque lleguen otros
+        """
+        self.received += 1
+        FRAMES_RECEIVED.inc(source=source)
+        if droppable:
+            # Solo se espera un frame descartable a la vez: reemplazarlo
+            for index, pending in enumerate(self._pending):
+                if pending.droppable:
+                    del self._pending[index]
+                    self.dropped += 1
+                    FRAMES_DROPPED.inc()
+                    break
+
+        self._pending.append(IngestedFrame(data, source, sequence, droppable))
+        self.max_pending = max(self.max_pending, len(self._pending))
+        self._idle.clear()
+        self._wakeup.set()
+
+    def submit_job(self, run: Callable[[], Awaitable[None]]):
+        """Encola una tarea para el worker, después de los frames ya pendientes"""
+        self._pending.append(IngestJob(run))
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                item = self._pending.popleft()
+                is_job = isinstance(item, IngestJob)
+                try:
+                    await (item.run() if is_job else self.handler(item))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error procesando frame [{self.session_id}]: {e}")
+                if not is_job:
+                    self.processed += 1
+            self._idle.set()
+
+    async def drain(self):
+        """Espera a que se procesen todos los frames pendientes"""
+        await self._idle.wait()
+
+    def close(self):
+        """Cancela el worker y descarta los frames pendientes"""
+        self._pending.clear()
+        self._idle.set()
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        self._worker = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "pending": len(self._pending),
+            "max_pending": self.max_pending
+        }
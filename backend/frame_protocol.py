@@ -0,0 +1,65 @@
+"""
+Protocolo de frames binarios por WebSocket
+
+Un mensaje binario es una cabecera fija de 8 bytes seguida del JPEG crudo:
+
+    byte 0     versión del protocolo (1)
+    byte 1     origen del frame (0 = cámara, 1 = video upload)
+    bytes 2-3  flags (reservado, 0)
+    bytes 4-7  número de secuencia (uint32, big-endian)
+
+Evita el base64 (+33% de tamaño) y el JSON por frame; el JPEG se entrega al
+decodificador como memoryview, sin copias.
+"""
+
+import struct
+from typing import Tuple
+
+FRAME_PROTOCOL_VERSION = 1
+FRAME_HEADER = struct.Struct("!BBHI")
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+
+FRAME_SOURCES = {
+    0: "camera",
+    1: "upload"
+}
+FRAME_SOURCE_CODES = {name: code for code, name in FRAME_SOURCES.items()}
+
+
+def parse_binary_frame(data: bytes) -> Tuple[str, int, memoryview]:
+    """
+    Separa la cabecera del JPEG de un mensaje binario
+
+    Args:
+        data: Mensaje binario recibido por el WebSocket
+
+    Returns:
+        Tuple (source, sequence, jpeg_data) donde jpeg_data es una vista sin copia
+
+    Raises:
+        ValueError: si el mensaje es demasiado corto o la versión/origen no son válidos
+    """
+    if len(data) <= FRAME_HEADER_SIZE:
+        raise ValueError(f"Frame binario demasiado corto: {len(data)} bytes")
+
+    version, source_code, _flags, sequence = FRAME_HEADER.unpack_from(data)
+
+    if version != FRAME_PROTOCOL_VERSION:
+        raise ValueError(f"Versión de protocolo no soportada: {version}")
+
+    source = FRAME_SOURCES.get(source_code)
+    if source is None:
+        raise ValueError(f"Origen de frame desconocido: {source_code}")
+
+    return source, sequence, memoryview(data)[FRAME_HEADER_SIZE:]
+
+
+def build_binary_frame(jpeg_data: bytes, source: str = "camera", sequence: int = 0) -> bytes:
+    """Construye un mensaje binario (usado por herramientas de prueba en Python)"""
+    header = FRAME_HEADER.pack(
+        FRAME_PROTOCOL_VERSION,
+        FRAME_SOURCE_CODES[source],
+        0,
+        sequence & 0xFFFFFFFF
+    )
+    return header + bytes(jpeg_data)
@@ -0,0 +1,160 @@
+"""
+Backends de inferencia para el modelo de señas
+
+- keras:  modelo .keras completo con TensorFlow (tf.function de firma fija, XLA opcional)
+- tflite: modelo exportado a TensorFlow Lite, ejecutado con el intérprete LiteRT
+          (ai-edge-litert o tflite-runtime); no importa TensorFlow al servir
+
+El backend se elige en MODEL_CONFIG["backend"]; el .tflite se genera con
+`python export_model.py`.
+"""
+
+import logging
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class KerasBackend:
+    """Modelo Keras envuelto en un tf.function con firma (None, 50, 42, 2)"""
+
+    name = "keras"
+
+    def __init__(self, model_path: str, jit_compile: bool = False, **_options):
+        self.model_path = Path(model_path)
+        self.jit_compile = jit_compile
+        self.keras_model = None
+        self._inference_fn = None
+        self._tf = None
+
+    @property
+    def static_batch_shapes(self) -> bool:
+        # Con XLA cada tamaño de batch es una compilación distinta
+        return self.jit_compile
+
+    @property
+    def input_shape(self) -> Tuple:
+        return self.keras_model.input_shape
+
+    def load(self):
+        import tensorflow as tf  # Solo este backend necesita TensorFlow
+        self._tf = tf
+
+        self.keras_model = tf.keras.models.load_model(self.model_path)
+        model = self.keras_model
+
+        @tf.function(
+            input_signature=[tf.TensorSpec(shape=(None,) + tuple(model.input_shape[1:]), dtype=tf.float32)],
+            jit_compile=self.jit_compile
+        )
+        def inference_fn(inputs):
+            return model(inputs, training=False)
+
+        self._inference_fn = inference_fn
+        logger.info(f"⚙️ Inferencia compilada para entrada {model.input_shape} (XLA: {self.jit_compile})")
+
+    def get_concrete_function(self, batch_size: int = 1):
+        """
+        Función concreta del forward pass con batch fijo (usada para exportar a TFLite)
+
+        Las capas recurrentes solo se convierten a ops nativas de TFLite con forma
+        estática; el intérprete redimensiona el batch al cargar.
+        """
+        tf = self._tf
+        model = self.keras_model
+        spec = tf.TensorSpec(shape=(batch_size,) + tuple(model.input_shape[1:]), dtype=tf.float32)
+        return tf.function(lambda inputs: model(inputs, training=False)).get_concrete_function(spec)
+
+    def forward(self, batch: np.ndarray) -> np.ndarray:
+        return self._inference_fn(self._tf.convert_to_tensor(batch)).numpy()
+
+
+def _load_tflite_interpreter_class():
+    """Intérprete LiteRT disponible, del más liviano a TensorFlow completo"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    logger.warning("⚠️ Intérprete LiteRT no instalado, usando tf.lite (importa TensorFlow)")
+    return tf.lite.Interpreter
+
+
+class TFLiteBackend:
+    """
+    Modelo .tflite ejecutado con el intérprete LiteRT
+
+    El modelo se exporta con batch fijo (las capas recurrentes no admiten
+    redimensionar el intérprete): un batch más grande se ejecuta por bloques del
+    tamaño exportado sobre los mismos tensores ya asignados. No es thread-safe;
+    el ejecutor de inferencia usa un solo worker.
+    """
+
+    name = "tflite"
+    static_batch_shapes = False
+
+    def __init__(self, model_path: str, num_threads: int = None, **_options):
+        self.model_path = Path(model_path)
+        self.num_threads = num_threads
+        self._interpreter = None
+        self._input_index = None
+        self._output_index = None
+        self._export_batch_size = 1
+        self._input_shape = None
+
+    @property
+    def input_shape(self) -> Tuple:
+        return self._input_shape
+
+    def load(self):
+        interpreter_class = _load_tflite_interpreter_class()
+        self._interpreter = interpreter_class(model_path=str(self.model_path), num_threads=self.num_threads)
+        self._interpreter.allocate_tensors()
+
+        input_details = self._interpreter.get_input_details()[0]
+        self._input_index = input_details["index"]
+        self._output_index = self._interpreter.get_output_details()[0]["index"]
+        self._export_batch_size = int(input_details["shape"][0])
+        self._input_shape = (None,) + tuple(int(dim) for dim in input_details["shape"][1:])
+        logger.info(
+            f"⚙️ Modelo TFLite cargado: entrada {self._input_shape}, "
+            f"batch exportado {self._export_batch_size} ({interpreter_class.__module__})"
+        )
+
+    def forward(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        chunk_size = self._export_batch_size
+        outputs = []
+        for start in range(0, batch.shape[0], chunk_size):
+            chunk = batch[start:start + chunk_size]
+            rows = chunk.shape[0]
+            if rows < chunk_size:
+                padding = np.zeros((chunk_size - rows,) + chunk.shape[1:], dtype=np.float32)
+                chunk = np.concatenate([chunk, padding])
+            self._interpreter.set_tensor(self._input_index, chunk)
+            self._interpreter.invoke()
+            outputs.append(self._interpreter.get_tensor(self._output_index)[:rows].copy())
+        return np.concatenate(outputs) if len(outputs) > 1 else outputs[0]
+
+
+INFERENCE_BACKENDS = {
+    "keras": KerasBackend,
+    "tflite": TFLiteBackend
+}
+
+
+def create_backend(name: str, model_path: str, **options):
+    """Instancia el backend configurado (sin cargarlo)"""
+    backend_class = INFERENCE_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Backend de inferencia desconocido: {name} (opciones: {list(INFERENCE_BACKENDS)})")
+    return backend_class(model_path, **options)
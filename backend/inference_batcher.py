@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from metrics import Histogram
+from stage_executors import StageExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingPrediction:
+    __slots__ = ("keypoints", "top_k", "future", "enqueued_at")
+
+    def __init__(self, keypoints: np.ndarray, top_k: int, future: asyncio.Future):
+        self.keypoints = keypoints
+        self.top_k = top_k
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class InferenceBatcher:
+    """
+    Agrupa predicciones concurrentes en un solo forward pass del modelo
+
+    Las solicitudes que llegan dentro de una ventana corta (max_wait_ms) o hasta
+    completar max_batch_size se envían juntas al ejecutor de inferencia como un
+    batch (B, 50, 42, 2); cada llamador recibe su propio resultado.
+    """
+
+    def __init__(self, predict_batch: Callable[[List[np.ndarray], List[int]], List[Optional[Dict]]],
+                 executor: StageExecutor, max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.predict_batch = predict_batch
+        self.executor = executor
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._pending: List[_PendingPrediction] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight = set()
+
+        # Métricas del scheduler
+        self.batch_size_histogram = Histogram(
+            "inference_batch_size", [1, 2, 3, 4, 6, 8, 12, 16, 32],
+            "Solicitudes por forward pass"
+        )
+        self.wait_time_histogram = Histogram(
+            "inference_batch_wait_ms", [0.5, 1, 2, 5, 10, 20, 50, 100],
+            "Espera en la ventana de batching (ms)"
+        )
+        self.batches = 0
+
+    async def predict(self, keypoints: np.ndarray, top_k: int = 5) -> Optional[Dict[str, Any]]:
+        """Encola una secuencia y espera su predicción"""
+        loop = asyncio.get_running_loop()
+        request = _PendingPrediction(keypoints, top_k, loop.create_future())
+        self._pending.append(request)
+
+        if len(self._pending) >= self.max_batch_size or self.max_wait == 0:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await request.future
+
+    def _flush(self):
+        """Cierra la ventana actual y despacha el batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[_PendingPrediction]):
+        dispatched_at = time.perf_counter()
+        for request in batch:
+            self.wait_time_histogram.observe((dispatched_at - request.enqueued_at) * 1000)
+        self.batch_size_histogram.observe(len(batch))
+        self.batches += 1
+
+        try:
+            results = await self.executor.run(
+                self.predict_batch,
+                [request.keypoints for request in batch],
+                [request.top_k for request in batch]
+            )
+        except Exception as e:
+            logger.error(f"Error en batch de inferencia ({len(batch)} solicitudes): {e}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        for request, result in zip(batch, results):
+            if not request.future.done():
+                request.future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Configuración e histogramas del scheduler"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "wait_time_ms": self.wait_time_histogram.snapshot()
+        }
+
+    async def close(self):
+        """Despacha lo pendiente y espera los batches en curso"""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
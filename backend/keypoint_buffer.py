@@ -0,0 +1,133 @@
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+_FLOAT32 = np.dtype(np.float32)
+
+
+class KeypointRingBuffer:
+    """
+    Buffer circular preasignado de keypoints (frames × 42 × 2, float32)
+
+    Cada frame se escribe in-place junto con su timestamp y una máscara de
+    presencia (False = frame sin manos). El almacenamiento está duplicado
+    (2 × capacidad): cada frame se escribe en su posición y en su espejo, así
+    que los últimos N frames siempre son un bloque contiguo y se devuelven
+    como vista, sin copias ni np.array sobre listas.
+
+    Las vistas devueltas apuntan al buffer: son válidas hasta que se escriben
+    más frames que la capacidad o se llama a clear().
+    """
+
+    def __init__(self, capacity: int, num_keypoints: int = 42, num_coords: int = 2):
+        if capacity <= 0:
+            raise ValueError("La capacidad debe ser positiva")
+        self.capacity = capacity
+        self._keypoints = np.zeros((2 * capacity, num_keypoints, num_coords), dtype=np.float32)
+        self._timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self._present = np.zeros(2 * capacity, dtype=bool)
+
+        # Escritura por memoryview: evita el overhead de __setitem__ de numpy por frame
+        self._frame_nbytes = num_keypoints * num_coords * 4
+        self._keypoints_bytes = memoryview(self._keypoints).cast("B")
+        self._timestamps_view = memoryview(self._timestamps)
+        self._present_view = memoryview(self._present)
+        self._empty_frame = bytes(self._frame_nbytes)
+        self.clear()
+
+    def clear(self):
+        """Vacía el buffer (no libera ni re-asigna memoria)"""
+        self._next = 0            # Próxima posición de escritura (0..capacity-1)
+        self._size = 0            # Frames almacenados (<= capacity)
+        self.total_written = 0    # Frames escritos desde el último clear()
+        self.present_written = 0  # De ellos, con manos
+
+    def append(self, keypoints: Optional[np.ndarray], timestamp: Optional[float] = None):
+        """
+        Escribe un frame en el buffer
+
+        Args:
+            keypoints: Array (42, 2) o None si el frame no tiene manos
+            timestamp: Marca de tiempo del frame (default: time.time())
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        slot = self._next
+        mirror = slot + self.capacity
+        present = keypoints is not None
+
+        if present:
+            if keypoints.dtype is not _FLOAT32:
+                keypoints = np.ascontiguousarray(keypoints, dtype=np.float32)
+            try:
+                frame = memoryview(keypoints).cast("B")
+            except TypeError:
+                # Vista no contigua (p. ej. un slice con stride)
+                frame = memoryview(np.ascontiguousarray(keypoints)).cast("B")
+            self.present_written += 1
+        else:
+            frame = self._empty_frame
+
+        nbytes = self._frame_nbytes
+        self._keypoints_bytes[slot * nbytes:(slot + 1) * nbytes] = frame
+        self._keypoints_bytes[mirror * nbytes:(mirror + 1) * nbytes] = frame
+        self._timestamps_view[slot] = self._timestamps_view[mirror] = timestamp
+        self._present_view[slot] = self._present_view[mirror] = present
+
+        self._next = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.total_written += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _window(self, n: Optional[int]) -> slice:
+        """Slice del almacenamiento espejo con los últimos n frames en orden cronológico"""
+        n = self._size if n is None else min(n, self._size)
+        end = self._next + self.capacity
+        return slice(end - n, end)
+
+    def latest(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Últimos n frames (default: todos los almacenados) como vistas
+
+        Returns:
+            Tuple (keypoints (n, 42, 2), timestamps (n,), present (n,))
+        """
+        window = self._window(n)
+        return self._keypoints[window], self._timestamps[window], self._present[window]
+
+    def latest_keypoints(self, n: Optional[int] = None) -> np.ndarray:
+        """Vista de los keypoints de los últimos n frames"""
+        return self._keypoints[self._window(n)]
+
+    def present_count(self, n: Optional[int] = None) -> int:
+        """Frames con manos entre los últimos n"""
+        return int(np.count_nonzero(self._present[self._window(n)]))
+
+    def present_keypoints(self, n: Optional[int] = None, limit: Optional[int] = None) -> np.ndarray:
+        """
+        Keypoints de los frames con manos entre los últimos n
+
+        Es una vista si todos los frames de la ventana tienen manos; si no, una copia
+        de los frames presentes.
+
+        Args:
+            n: Ventana de frames a considerar (default: todos los almacenados)
+            limit: Devolver como máximo los primeros `limit` frames con manos
+        """
+        window = self._window(n)
+        keypoints = self._keypoints[window]
+        present = self._present[window]
+        if not present.all():
+            keypoints = keypoints[present]
+        return keypoints if limit is None else keypoints[:limit]
+
+    def get_stats(self):
+        return {
+            "capacity": self.capacity,
+            "frames": self._size,
+            "present_frames": self.present_count(),
+            "total_written": self.total_written
+        }
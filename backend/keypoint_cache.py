@@ -0,0 +1,197 @@
+"""
+Caché en disco de keypoints extraídos de videos
+
+La clave es el hash del contenido del video (no su nombre ni su ruta) más una
+huella de los parámetros de extracción: el mismo archivo subido dos veces, o
+re-procesado por el modo batch, no vuelve a decodificarse ni a pasar por
+MediaPipe. Cambiar el detector, el tamaño de entrada o la cantidad de frames
+muestreados cambia la huella e invalida las entradas anteriores.
+
+La clave supone que la extracción depende solo del archivo y de esos
+parámetros: `extract_video_keypoints` reinicia el tracking de MediaPipe al
+empezar cada clip, así una entrada escrita por un worker del modo batch
+(extractor reutilizado) es igual a la de un upload (extractor nuevo).
+
+Cada entrada es un `.npy` con la secuencia (frames, 42, 2) en float32, que se
+abre con mmap, y un `.json` con los metadatos de la extracción. La fecha de
+modificación del `.json` marca el último uso (LRU). Las escrituras son
+atómicas (archivo temporal + rename), por lo que varios procesos (workers del
+modo batch y el servidor) pueden compartir el directorio.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config import KEYPOINT_CACHE_CONFIG, FRAME_DECODER_CONFIG, UPLOAD_CONFIG
+
+# 2: las entradas de la versión 1 pueden venir de workers batch sin reinicio de tracking entre clips
+CACHE_FORMAT_VERSION = 2
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def new_content_hash():
+    """Hash incremental del contenido (para hashear mientras se copia un upload)"""
+    return hashlib.blake2b(digest_size=20)
+
+
+def hash_file(path) -> str:
+    """Hash del contenido de un archivo, leído por bloques"""
+    digest = new_content_hash()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extraction_fingerprint(sample_frames: int) -> str:
+    """Huella de los parámetros que determinan la secuencia extraída"""
+    from keypoint_extractor import HAND_DETECTOR_OPTIONS
+
+    params = {
+        "version": CACHE_FORMAT_VERSION,
+        "detector": HAND_DETECTOR_OPTIONS,
+        "target_size": [FRAME_DECODER_CONFIG["target_width"], FRAME_DECODER_CONFIG["target_height"]],
+        "sample_frames": sample_frames
+    }
+    encoded = json.dumps(params, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+class KeypointCache:
+    """
+    Caché LRU en disco de extracciones de video con tope de tamaño
+
+    El índice en memoria (tamaño y último uso de cada entrada) se reconstruye
+    desde el directorio al iniciar; las entradas escritas por otro proceso se
+    descubren al leerlas. Thread-safe: el endpoint de upload lo usa desde los
+    hilos del executor.
+    """
+
+    def __init__(self, directory=None, max_mb: Optional[float] = None):
+        self.directory = Path(directory or KEYPOINT_CACHE_CONFIG["directory"])
+        self.max_bytes = int((max_mb if max_mb is not None else KEYPOINT_CACHE_CONFIG["max_mb"]) * 1024 * 1024)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._scan()
+
+    def _paths(self, key: str):
+        return self.directory / f"{key}.json", self.directory / f"{key}.npy"
+
+    def _entry_size(self, key: str) -> int:
+        size = 0
+        for path in self._paths(key):
+            try:
+                size += path.stat().st_size
+            except FileNotFoundError:
+                pass  # Entrada sin .npy (video sin manos) o desalojada por otro proceso
+        return size
+
+    def _scan(self):
+        for meta_path in self.directory.glob("*.json"):
+            key = meta_path.stem
+            try:
+                self._entries[key] = {"size": self._entry_size(key), "used": meta_path.stat().st_mtime}
+            except FileNotFoundError:
+                continue  # Desalojada por otro proceso durante el escaneo
+
+    def key_for(self, content_hash: str, sample_frames: int = UPLOAD_CONFIG["sample_frames"]) -> str:
+        return f"{content_hash}-{extraction_fingerprint(sample_frames)}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Extracción guardada para la clave, o None
+
+        Returns:
+            Diccionario con el mismo formato que `extract_video_keypoints`; la
+            secuencia de keypoints es un memmap de solo lectura
+        """
+        meta_path, array_path = self._paths(key)
+        try:
+            extraction = json.loads(meta_path.read_text(encoding="utf-8"))
+            if extraction.pop("has_keypoints"):
+                extraction["keypoints"] = np.load(array_path, mmap_mode="r")
+            else:
+                extraction["keypoints"] = None
+            os.utime(meta_path)  # Último uso (LRU)
+        except (FileNotFoundError, ValueError, KeyError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            entry = self._entries.get(key)
+            if entry is None:  # Escrita por otro proceso
+                entry = self._entries[key] = {"size": self._entry_size(key)}
+            entry["used"] = time.time()
+        return extraction
+
+    def put(self, key: str, extraction: Dict[str, Any]):
+        """Guarda una extracción (escritura atómica) y desaloja hasta respetar el tope"""
+        meta_path, array_path = self._paths(key)
+        keypoints = extraction.get("keypoints")
+        metadata = {name: value for name, value in extraction.items() if name not in ("keypoints", "timing_ms")}
+        metadata["has_keypoints"] = keypoints is not None
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+        # El .npy se escribe antes que el .json: una entrada visible siempre está completa
+        if keypoints is not None:
+            tmp_array = array_path.with_name(array_path.name + suffix)
+            with open(tmp_array, "wb") as f:
+                np.save(f, np.ascontiguousarray(keypoints, dtype=np.float32))
+            os.replace(tmp_array, array_path)
+        tmp_meta = meta_path.with_name(meta_path.name + suffix)
+        tmp_meta.write_text(json.dumps(metadata, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_meta, meta_path)
+
+        with self._lock:
+            self._entries[key] = {"size": self._entry_size(key), "used": time.time()}
+            self.writes += 1
+            self._evict()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._entries.values())
+        for key in sorted(self._entries, key=lambda k: self._entries[k]["used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._entries.pop(key)["size"]
+            for path in self._paths(key):
+                try:
+                    path.unlink()  # Un memmap abierto sobre el .npy sigue siendo válido (POSIX)
+                except FileNotFoundError:
+                    pass
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_mb": round(sum(entry["size"] for entry in self._entries.values()) / (1024 * 1024), 2),
+                "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions
+            }
+
+
+def get_keypoint_cache() -> Optional[KeypointCache]:
+    """Caché configurada en KEYPOINT_CACHE_CONFIG, o None si está deshabilitada"""
+    if not KEYPOINT_CACHE_CONFIG["enabled"]:
+        return None
+    return KeypointCache()
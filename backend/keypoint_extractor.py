@@ -2,10 +2,80 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import base64
-from PIL import Image
-import io
 import time
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
+
+from config import FRAME_DECODER_CONFIG, ANNOTATION_CONFIG, CAPTURE_CONFIG
+from keypoint_buffer import KeypointRingBuffer
+from metrics import REGISTRY
+
+ANNOTATION_MODES = ("off", "on_demand", "debug_stream")
+
+# Parámetros del detector de manos (también forman parte de la clave de la caché de keypoints)
+HAND_DETECTOR_OPTIONS = {
+    "static_image_mode": False,
+    "max_num_hands": 2,               # Máximo 2 manos
+    "min_detection_confidence": 0.5,  # Balance entre robustez y precisión
+    "min_tracking_confidence": 0.5,   # Tracking estable sin ser demasiado estricto
+    "model_complexity": 1             # Modelo de complejidad media para mejor rendimiento
+}
+
+# Métricas del camino de un frame (compartidas por los extractores de todas las sesiones)
+BASE64_DECODE_MS = REGISTRY.histogram("frame_base64_decode_ms", description="Decodificación base64 del frame (protocolo JSON) en ms")
+FRAME_DECODE_MS = REGISTRY.histogram("frame_decode_ms", description="Decodificación JPEG + letterbox + RGB del frame en ms")
+MEDIAPIPE_MS = REGISTRY.histogram("mediapipe_ms", description="hands.process + extracción de keypoints en ms")
+FRAME_PROCESS_MS = REGISTRY.histogram("frame_process_ms", description="Procesamiento completo de un frame comprimido en ms")
+FRAMES_PROCESSED = REGISTRY.counter("frames_processed_total", "Frames procesados por el extractor")
+FRAMES_WITH_HANDS = REGISTRY.counter("frames_with_hands_total", "Frames con ambas manos detectadas")
+RECORDINGS = REGISTRY.counter("recordings_total", "Grabaciones iniciadas")
+ERRORS = REGISTRY.counter("errors_total", "Errores por etapa", ("stage",))
+
+# Marcadores SOF de JPEG (contienen el tamaño de la imagen); C4, C8 y CC no son SOF
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Factores de reducción que libjpeg puede aplicar durante la decodificación
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2)
+)
+
+# La orientación EXIF se ignora en ambos decodificadores para que el tamaño
+# leído de la cabecera coincida con el frame decodificado
+_DECODE_FLAGS = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+
+
+def read_jpeg_size(data) -> Optional[Tuple[int, int]]:
+    """
+    Lee (ancho, alto) de la cabecera SOF de un JPEG sin decodificarlo
+    
+    Returns:
+        Tuple (width, height) o None si los datos no son un JPEG reconocible
+    """
+    size = len(data)
+    if size < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    
+    i = 2
+    while i + 9 < size:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Bytes de relleno entre segmentos
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Marcadores sin longitud
+            i += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height = (data[i + 5] << 8) | data[i + 6]
+            width = (data[i + 7] << 8) | data[i + 8]
+            return width, height
+        i += 2 + ((data[i + 2] << 8) | data[i + 3])
+    return None
+
 
 class HandKeypointExtractor:
     """
@@ -13,26 +83,20 @@ class HandKeypointExtractor:
     Extrae 42 keypoints (21 por cada mano) en tiempo real
     """
     
-    def __init__(self):
+    def __init__(self, frame_decoder: Optional[str] = None):
         # Configuración de MediaPipe
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
         
         # Configurar detector de manos optimizado para fondos complejos y simples
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,  # Máximo 2 manos
-            min_detection_confidence=0.5,  # Balance entre robustez y precisión
-            min_tracking_confidence=0.5,   # Tracking estable sin ser demasiado estricto
-            model_complexity=1             # Modelo de complejidad media para mejor rendimiento
-        )
+        self.hands = self.mp_hands.Hands(**HAND_DETECTOR_OPTIONS)
         
         # Estado del extractor
         self.is_recording = False
         self.countdown_active = False
         self.is_paused = False  # Nueva pausa después de predicción
-        self.keypoints_buffer = []
+        self.keypoint_buffer = KeypointRingBuffer(CAPTURE_CONFIG["buffer_capacity"])
         self.recording_start_time = None
         self.pause_start_time = None
         self.recording_duration = 2.8  # 2.8 segundos - buffer para asegurar 50 frames
@@ -51,23 +115,53 @@ class HandKeypointExtractor:
         # Modo de procesamiento (camera o upload)
         self.processing_mode = "camera"  # Default: camera
         
-        # Configuración de resize optimizado
-        self.target_width = 640
-        self.target_height = 480
+        # Decodificador de frames: "fused" (JPEG → RGB 640x480 en un paso) o "legacy"
+        self.frame_decoder = frame_decoder or FRAME_DECODER_CONFIG["decoder"]
+        if self.frame_decoder not in ("fused", "legacy"):
+            raise ValueError(f"Decodificador de frames desconocido: {self.frame_decoder}")
+        self._init_frame_buffers()
         
-    def _resize_frame_optimized(self, frame: np.ndarray) -> np.ndarray:
-        """
-        Redimensiona el frame a 640x480 manteniendo aspect ratio
-        y añadiendo padding negro si es necesario
+        # Anotaciones: se dibujan solo cuando un cliente las pide, a partir de
+        # los landmarks y el frame del último procesamiento (sin copias por frame)
+        self.annotation_mode = ANNOTATION_CONFIG["mode"]
+        self._last_hand_landmarks = None
+        self._last_display_frame = None
+        self._last_display_is_rgb = False
+        
+    def _init_frame_buffers(self):
+        """Buffers reutilizados entre frames (decodificación y keypoints)"""
+        self.target_width = FRAME_DECODER_CONFIG["target_width"]
+        self.target_height = FRAME_DECODER_CONFIG["target_height"]
+        
+        # Layout de letterbox por tamaño de entrada: (new_width, new_height, x_offset, y_offset)
+        self._letterbox_layouts: Dict[Tuple[int, int], Tuple[int, int, int, int]] = {}
+        
+        # Buffer RGB reutilizable del decodificador fused y layout con el que se pintó
+        self._rgb_buffer = np.zeros((self.target_height, self.target_width, 3), dtype=np.uint8)
+        self._rgb_buffer_layout = None
+        
+        # Keypoints del frame actual: (42, 2) y su vista por mano (2, 21, 2)
+        self._keypoints = np.zeros((42, 2), dtype=np.float32)
+        self._keypoints_by_hand = self._keypoints.reshape(2, 21, 2)
+        self._last_hands = None
+        self._last_hand_order = None
+        self._last_handedness = None
+        
+    def _letterbox_layout(self, width: int, height: int) -> Tuple[int, int, int, int]:
         """
-        h, w = frame.shape[:2]
+        Calcula (y cachea) cómo encajar un frame de width x height en 640x480
+        manteniendo aspect ratio
         
-        # Si ya es 640x480, no hacer nada
-        if w == self.target_width and h == self.target_height:
-            return frame
+        Returns:
+            Tuple (new_width, new_height, x_offset, y_offset)
+        """
+        key = (width, height)
+        layout = self._letterbox_layouts.get(key)
+        if layout is not None:
+            return layout
         
         # Calcular aspect ratio y dimensiones de resize
-        aspect_ratio = w / h
+        aspect_ratio = width / height
         target_aspect = self.target_width / self.target_height
         
         if aspect_ratio > target_aspect:
@@ -79,20 +173,80 @@ class HandKeypointExtractor:
             new_height = self.target_height
             new_width = int(self.target_height * aspect_ratio)
         
+        # Calcular posición para centrar
+        y_offset = (self.target_height - new_height) // 2
+        x_offset = (self.target_width - new_width) // 2
+        
+        layout = (new_width, new_height, x_offset, y_offset)
+        self._letterbox_layouts[key] = layout
+        return layout
+        
+    def _resize_frame_optimized(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Redimensiona el frame a 640x480 manteniendo aspect ratio
+        y añadiendo padding negro si es necesario
+        """
+        h, w = frame.shape[:2]
+        
+        # Si ya es 640x480, no hacer nada
+        if w == self.target_width and h == self.target_height:
+            return frame
+        
+        new_width, new_height, x_offset, y_offset = self._letterbox_layout(w, h)
+        
         # Resize manteniendo aspect ratio
         resized_frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
         
         # Crear frame de destino con fondo negro
         result_frame = np.zeros((self.target_height, self.target_width, 3), dtype=np.uint8)
         
-        # Calcular posición para centrar
-        y_offset = (self.target_height - new_height) // 2
-        x_offset = (self.target_width - new_width) // 2
-        
         # Colocar frame redimensionado en el centro
         result_frame[y_offset:y_offset + new_height, x_offset:x_offset + new_width] = resized_frame
         
         return result_frame
+    
+    def _decode_frame_rgb(self, image_data) -> np.ndarray:
+        """
+        Decodificador fused: bytes comprimidos → buffer RGB 640x480 reutilizable
+        
+        - Si el JPEG es más grande que el destino, libjpeg lo decodifica ya reducido (1/2, 1/4, 1/8)
+        - El resize escribe directamente en la región del letterbox y la conversión
+          BGR→RGB se hace en la misma pasada sobre el buffer de salida
+        
+        El buffer se sobrescribe en el siguiente frame: quien necesite conservarlo debe copiarlo.
+        """
+        buffer = np.frombuffer(image_data, dtype=np.uint8)
+        
+        # Elegir la mayor reducción que siga cubriendo el tamaño final del letterbox
+        flags = _DECODE_FLAGS
+        source_size = read_jpeg_size(memoryview(image_data))
+        if source_size is not None:
+            src_w, src_h = source_size
+            new_width, new_height, _, _ = self._letterbox_layout(src_w, src_h)
+            for factor, reduced_flag in _REDUCED_DECODE_FLAGS:
+                if src_w // factor >= new_width and src_h // factor >= new_height:
+                    flags = reduced_flag | cv2.IMREAD_IGNORE_ORIENTATION
+                    break
+        
+        decoded = cv2.imdecode(buffer, flags)
+        if decoded is None:
+            raise ValueError("No se pudo decodificar la imagen")
+        
+        h, w = decoded.shape[:2]
+        layout = self._letterbox_layout(w, h)
+        new_width, new_height, x_offset, y_offset = layout
+        
+        # El padding negro solo se repinta cuando cambia el layout
+        if layout != self._rgb_buffer_layout:
+            self._rgb_buffer.fill(0)
+            self._rgb_buffer_layout = layout
+        
+        region = self._rgb_buffer[y_offset:y_offset + new_height, x_offset:x_offset + new_width]
+        if (w, h) != (new_width, new_height):
+            decoded = cv2.resize(decoded, (new_width, new_height), interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(decoded, cv2.COLOR_BGR2RGB, dst=region)
+        
+        return self._rgb_buffer
 
     def detect_hands_in_frame(self, frame: np.ndarray) -> Tuple[bool, Optional[np.ndarray], str]:
         """
@@ -113,11 +267,26 @@ class HandKeypointExtractor:
         # Convertir BGR a RGB
         rgb_frame = cv2.cvtColor(optimized_frame, cv2.COLOR_BGR2RGB)
         
+        return self._detect_hands(rgb_frame, optimized_frame, display_is_rgb=False)
+    
+    def detect_hands_in_rgb(self, rgb_frame: np.ndarray) -> Tuple[bool, Optional[np.ndarray], str]:
+        """
+        Igual que detect_hands_in_frame pero sobre un frame RGB 640x480 ya preparado
+        (salida del decodificador fused), sin resize ni conversión de color
+        """
+        return self._detect_hands(rgb_frame, rgb_frame, display_is_rgb=True)
+    
+    def _detect_hands(self, rgb_frame: np.ndarray, display_frame: np.ndarray,
+                      display_is_rgb: bool) -> Tuple[bool, Optional[np.ndarray], str]:
+        """Ejecuta MediaPipe sobre el frame RGB y aplica la lógica de estabilidad"""
         # Procesar frame con MediaPipe
+        start = time.perf_counter()
         results = self.hands.process(rgb_frame)
         
-        # Crear copia del frame optimizado para anotaciones
-        annotated_frame = optimized_frame.copy()
+        # Guardar referencias para anotar bajo demanda (render_annotated_frame)
+        self._last_hand_landmarks = results.multi_hand_landmarks
+        self._last_display_frame = display_frame
+        self._last_display_is_rgb = display_is_rgb
         
         # Debug: imprimir información de detección (solo cambios importantes)
         num_hands = len(results.multi_hand_landmarks) if results.multi_hand_landmarks else 0
@@ -134,6 +303,7 @@ class HandKeypointExtractor:
             
             # Extraer keypoints de ambas manos
             keypoints = self._extract_keypoints(results)
+            MEDIAPIPE_MS.observe((time.perf_counter() - start) * 1000)
             
             if keypoints is not None:
                 # Solo log durante detección inicial para modo camera
@@ -144,9 +314,6 @@ class HandKeypointExtractor:
                         print(f"✅ 42 KEYPOINTS EXTRAÍDOS: {keypoints.shape}")
                         self.previous_log_state = keypoints_state
                 
-                # Dibujar anotaciones básicas
-                self._draw_annotations(annotated_frame, results)
-                
                 # Incrementar contador de frames consecutivos buenos
                 self.consecutive_good_frames += 1
                 
@@ -171,7 +338,7 @@ class HandKeypointExtractor:
             else:
                 pass  # Error extrayendo keypoints - silencioso
         else:
-            pass  # Se requieren 2 manos - silencioso
+            MEDIAPIPE_MS.observe((time.perf_counter() - start) * 1000)  # Se requieren 2 manos - silencioso
         
         # Reset contador si no hay detección buena
         if self.consecutive_good_frames > 0:
@@ -181,42 +348,77 @@ class HandKeypointExtractor:
     def _extract_keypoints(self, results) -> Optional[np.ndarray]:
         """
         Extrae 42 keypoints de ambas manos detectadas
+        
+        Los landmarks se copian directamente a un buffer float32 (42, 2) preasignado y
+        las manos se ordenan con operaciones de arrays. El array retornado se reutiliza
+        en el siguiente frame: quien lo conserve debe copiarlo (los buffers de grabación
+        ya lo hacen). z, visibility y handedness quedan en get_landmark_channels().
+        Los errores se propagan: process_base64_frame / process_frame_bytes los registran.
         """
-        try:
-            keypoints = np.zeros((42, 2), dtype=np.float32)
-            
-            # Organizar manos por posición (izquierda/derecha en la imagen)
-            hands_data = []
-            for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                hand_keypoints = []
-                for landmark in hand_landmarks.landmark:
-                    x = landmark.x  # Normalizado (0-1)
-                    y = landmark.y  # Normalizado (0-1)
-                    hand_keypoints.append([x, y])
-                hands_data.append((i, hand_keypoints))
-            
-            # Ordenar por posición X (izquierda a derecha)
-            hands_data.sort(key=lambda x: np.mean([kp[0] for kp in x[1]]))
-            
-            # Llenar keypoints: primera mano (izq) 0-20, segunda mano (der) 21-41
-            for hand_idx, (_, hand_keypoints) in enumerate(hands_data):
-                if hand_idx < 2:  # Solo primeras 2 manos
-                    start_idx = hand_idx * 21
-                    end_idx = start_idx + 21
-                    keypoints[start_idx:end_idx] = np.array(hand_keypoints)
-            
-            return keypoints
+        hands = results.multi_hand_landmarks[:2]  # Solo primeras 2 manos
+        num_hands = len(hands)
+        
+        # Llenar keypoints: primera mano 0-20, segunda mano 21-41
+        keypoints_by_hand = self._keypoints_by_hand
+        for index, hand in enumerate(hands):
+            landmarks = hand.landmark
+            keypoints_by_hand[index, :, 0] = np.fromiter((lm.x for lm in landmarks), dtype=np.float32, count=21)
+            keypoints_by_hand[index, :, 1] = np.fromiter((lm.y for lm in landmarks), dtype=np.float32, count=21)
+        keypoints_by_hand[num_hands:] = 0.0
+        
+        # Ordenar por posición X media (izquierda a derecha); con empate se conserva el orden
+        if num_hands == 2 and keypoints_by_hand[1, :, 0].sum() < keypoints_by_hand[0, :, 0].sum():
+            order = (1, 0)
+            keypoints_by_hand[[0, 1]] = keypoints_by_hand[[1, 0]]
+        else:
+            order = tuple(range(num_hands))
+        
+        # Los canales opcionales se resuelven solo si alguien los pide
+        self._last_hands = hands
+        self._last_hand_order = order
+        self._last_handedness = results.multi_handedness
+        
+        return self._keypoints
+    
+    def get_landmark_channels(self) -> Dict[str, Any]:
+        """
+        Canales opcionales del último frame con keypoints, en el mismo orden que los 42 keypoints
+        
+        Returns:
+            Diccionario con 'z' (42,), 'visibility' (42,) y 'handedness'
+            (lista de (label, score) por mano, de izquierda a derecha en la imagen)
+        """
+        channels = {
+            'z': np.zeros((2, 21), dtype=np.float32),
+            'visibility': np.zeros((2, 21), dtype=np.float32)
+        }
+        handedness = []
+        
+        if self._last_hands is not None:
+            order = self._last_hand_order
+            num_hands = len(order)
+            for name, values in channels.items():
+                values[:num_hands] = [
+                    [getattr(lm, name) for lm in self._last_hands[idx].landmark] for idx in order
+                ]
             
-        except Exception as e:
-            # Error silencioso para no llenar logs
-            return None
+            if self._last_handedness:
+                for idx in order:
+                    classification = self._last_handedness[idx].classification[0]
+                    handedness.append((classification.label, float(classification.score)))
+        
+        return {
+            'z': channels['z'].reshape(42),
+            'visibility': channels['visibility'].reshape(42),
+            'handedness': handedness
+        }
     
-    def _draw_annotations(self, frame, results):
+    def _draw_annotations(self, frame, multi_hand_landmarks):
         """
         Dibuja anotaciones de manos en el frame
         """
         try:
-            for hand_landmarks in results.multi_hand_landmarks:
+            for hand_landmarks in multi_hand_landmarks:
                 self.mp_drawing.draw_landmarks(
                     frame,
                     hand_landmarks,
@@ -228,6 +430,45 @@ class HandKeypointExtractor:
             # Error silencioso
             pass
     
+    def set_annotation_mode(self, mode: str):
+        """Cambia el modo de anotación: off, on_demand o debug_stream"""
+        if mode not in ANNOTATION_MODES:
+            raise ValueError(f"Modo de anotación desconocido: {mode}")
+        self.annotation_mode = mode
+    
+    def render_annotated_frame(self) -> Optional[np.ndarray]:
+        """
+        Genera el frame anotado (BGR 640x480) a partir del último frame procesado
+        
+        La copia y el dibujo solo ocurren aquí, cuando alguien pide el overlay.
+        Debe llamarse antes de procesar el siguiente frame: el decodificador fused
+        reutiliza su buffer.
+        """
+        if self._last_display_frame is None:
+            return None
+        
+        if self._last_display_is_rgb:
+            # cvtColor produce la copia BGR sobre la que se dibuja
+            annotated_frame = cv2.cvtColor(self._last_display_frame, cv2.COLOR_RGB2BGR)
+        else:
+            annotated_frame = self._last_display_frame.copy()
+        
+        if self._last_hand_landmarks:
+            self._draw_annotations(annotated_frame, self._last_hand_landmarks)
+        return annotated_frame
+    
+    def encode_annotated_frame(self, jpeg_quality: Optional[int] = None) -> Optional[str]:
+        """Frame anotado como JPEG en base64, listo para enviarse por WebSocket"""
+        annotated_frame = self.render_annotated_frame()
+        if annotated_frame is None:
+            return None
+        
+        quality = jpeg_quality or ANNOTATION_CONFIG["jpeg_quality"]
+        success, encoded = cv2.imencode('.jpg', annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not success:
+            return None
+        return base64.b64encode(encoded).decode('ascii')
+    
     async def start_countdown(self) -> bool:
         """
         Inicia cuenta regresiva de 3 segundos
@@ -263,8 +504,9 @@ class HandKeypointExtractor:
             return False
             
         self.is_recording = True
-        self.keypoints_buffer = []
+        self.keypoint_buffer.clear()
         self.recording_start_time = time.time()
+        RECORDINGS.inc()
         # Solo log una vez al iniciar
         recording_state = "recording:started"
         if self.previous_log_state != recording_state:
@@ -272,10 +514,10 @@ class HandKeypointExtractor:
             self.previous_log_state = recording_state
         return True
     
-    def add_keypoints_to_buffer(self, keypoints: np.ndarray):
-        """Añade keypoints al buffer durante la grabación"""
-        if self.is_recording and keypoints is not None:
-            self.keypoints_buffer.append(keypoints.copy())
+    def add_keypoints_to_buffer(self, keypoints: Optional[np.ndarray]):
+        """Escribe el frame en el buffer durante la grabación (None = frame sin manos)"""
+        if self.is_recording:
+            self.keypoint_buffer.append(keypoints)
     
     def should_stop_recording(self) -> bool:
         """Verifica si debe terminar la grabación"""
@@ -294,17 +536,15 @@ class HandKeypointExtractor:
             
         self.is_recording = False
         
-        if len(self.keypoints_buffer) == 0:
+        if self.keypoint_buffer.present_written == 0:
             # No se capturaron keypoints - silencioso
             return None
         
-        # Convertir buffer a numpy array
-        keypoints_sequence = np.array(self.keypoints_buffer)
+        # Frames con manos del buffer; es una vista si no faltó ninguno.
+        # El buffer se limpia recién en la siguiente start_recording()
+        keypoints_sequence = self.keypoint_buffer.present_keypoints()
         # Log silencioso - el main.py ya maneja este log
-        # print(f"✅ Grabación terminada: {len(self.keypoints_buffer)} frames capturados")
-        
-        # Limpiar buffer
-        self.keypoints_buffer = []
+        # print(f"✅ Grabación terminada: {len(keypoints_sequence)} frames capturados")
         
         return keypoints_sequence
     
@@ -313,7 +553,7 @@ class HandKeypointExtractor:
         self.is_recording = False
         self.countdown_active = False
         self.is_paused = False
-        self.keypoints_buffer = []
+        self.keypoint_buffer.clear()
         self.previous_log_state = None  # Reset state tracking
         # print("❌ Grabación cancelada")  # Comentado
     
@@ -360,19 +600,56 @@ class HandKeypointExtractor:
     
     def process_base64_frame(self, base64_data: str) -> Tuple[bool, Optional[np.ndarray], str]:
         """
-        Procesa un frame codificado en base64
+        Procesa un frame codificado en base64 (protocolo JSON)
         
         Returns:
             Tuple (hands_detected, keypoints, status_message)
         """
+        start = time.perf_counter()
         try:
-            # Decodificar base64
             image_data = base64.b64decode(base64_data)
-            image = Image.open(io.BytesIO(image_data))
-            frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            
-            # Detectar manos
-            hands_detected, keypoints, detection_status = self.detect_hands_in_frame(frame)
+        except Exception as e:
+            # Error silencioso
+            ERRORS.inc(stage="base64")
+            return False, None, f"error:{str(e)}"
+        BASE64_DECODE_MS.observe((time.perf_counter() - start) * 1000)
+        
+        return self.process_frame_bytes(image_data)
+    
+    def _decode_frame(self, image_data) -> np.ndarray:
+        """
+        Decodifica una imagen comprimida (JPEG/PNG) a un frame BGR
+        
+        Acepta bytes o memoryview: np.frombuffer no copia los datos
+        """
+        buffer = np.frombuffer(image_data, dtype=np.uint8)
+        frame = cv2.imdecode(buffer, _DECODE_FLAGS)
+        if frame is None:
+            raise ValueError("No se pudo decodificar la imagen")
+        return frame
+    
+    def process_frame_bytes(self, image_data) -> Tuple[bool, Optional[np.ndarray], str]:
+        """
+        Procesa un frame comprimido (bytes o memoryview de un mensaje binario)
+        
+        Returns:
+            Tuple (hands_detected, keypoints, status_message)
+        """
+        start = time.perf_counter()
+        try:
+            # Decodificar y detectar manos
+            if self.frame_decoder == "fused":
+                rgb_frame = self._decode_frame_rgb(image_data)
+                FRAME_DECODE_MS.observe((time.perf_counter() - start) * 1000)
+                hands_detected, keypoints, detection_status = self.detect_hands_in_rgb(rgb_frame)
+            else:
+                frame = self._decode_frame(image_data)
+                FRAME_DECODE_MS.observe((time.perf_counter() - start) * 1000)
+                hands_detected, keypoints, detection_status = self.detect_hands_in_frame(frame)
+            FRAMES_PROCESSED.inc()
+            if hands_detected:
+                FRAMES_WITH_HANDS.inc()
+            FRAME_PROCESS_MS.observe((time.perf_counter() - start) * 1000)
             
             # Verificar si estamos en pausa
             if self.is_paused:
@@ -399,6 +676,7 @@ class HandKeypointExtractor:
             else:
                 # Si estamos grabando pero no detectamos manos, seguir grabando
                 if self.is_recording:
+                    self.add_keypoints_to_buffer(None)
                     progress = self.get_recording_progress()
                     return False, None, f"recording_no_hands:{progress:.2f}"
                 else:
@@ -407,6 +685,7 @@ class HandKeypointExtractor:
                     
         except Exception as e:
             # Error silencioso
+            ERRORS.inc(stage="frame")
             return False, None, f"error:{str(e)}"
     
     def get_status_message(self, hands_detected: bool) -> str:
@@ -425,8 +704,38 @@ class HandKeypointExtractor:
         else:
             return "👋 Muestra ambas manos frente a la cámara"
     
+    def reset_tracking(self):
+        """
+        Olvida las manos seguidas hasta ahora (nuevo clip): reinicia el grafo de
+        MediaPipe, que en modo tracking arrastra las manos del frame anterior, y
+        el estado por frame. Un extractor reutilizado queda igual que uno nuevo
+        """
+        self.hands.reset()
+        self.consecutive_good_frames = 0
+        self.previous_log_state = None
+        self._last_hand_landmarks = None
+        self._last_display_frame = None
+    
     def cleanup(self):
         """Limpia recursos del extractor"""
         if self.hands:
             self.hands.close()
-        self.cancel_recording()
\ No newline at end of file
+        self.cancel_recording()
+
+
+def warm_up_hand_detector() -> float:
+    """
+    Crea un detector y procesa un frame vacío: carga los modelos TFLite de
+    MediaPipe para que la primera sesión no pague la inicialización
+
+    Returns:
+        Tiempo de calentamiento en ms
+    """
+    start = time.perf_counter()
+    hands = mp.solutions.hands.Hands(**HAND_DETECTOR_OPTIONS)
+    try:
+        height, width = FRAME_DECODER_CONFIG["target_height"], FRAME_DECODER_CONFIG["target_width"]
+        hands.process(np.zeros((height, width, 3), dtype=np.uint8))
+    finally:
+        hands.close()
+    return (time.perf_counter() - start) * 1000
@@ -0,0 +1,380 @@
+"""
+Generador de carga para /ws
+
+Abre N sesiones WebSocket concurrentes y reproduce secuencias de frames JPEG
+grabadas a un fps configurable, con el mismo protocolo que app.js: frames
+binarios de cámara (cabecera + JPEG) o `type: frame` en JSON, y el flujo de
+video upload `reset_video_upload` → frames `source: upload` →
+`video_upload_finished`.
+
+Mide por cliente la latencia de respuesta de cada frame (por número de
+secuencia), el tiempo hasta cada predicción y los frames que el servidor
+descartó (`dropped_frames`). Corre contra un servidor ya levantado (--url) o
+contra la app en el mismo proceso (--in-process, uvicorn en un hilo).
+
+Uso:
+    python load_generator.py --clients 20 --fps 15 --duration 30 --frames grabaciones/
+    python load_generator.py --in-process --clients 4 --mode upload --frames clip.mp4
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from config import SERVER_CONFIG, PROCESSING_CONFIG
+from frame_protocol import FRAME_HEADER, FRAME_PROTOCOL_VERSION, FRAME_SOURCE_CODES
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v"}
+LOAD_MODES = ("camera", "upload")
+TRANSPORTS = ("binary", "json")
+
+
+# ===== FIXTURES =====
+def encode_frame(frame: np.ndarray, max_width: int = 640, quality: int = 70) -> bytes:
+    """JPEG como lo envía el navegador: ancho máximo del canvas y calidad de captura"""
+    height, width = frame.shape[:2]
+    if width > max_width:
+        frame = cv2.resize(frame, (max_width, int(height * max_width / width)), interpolation=cv2.INTER_AREA)
+    return cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def _read_video_frames(path: Path, max_width: int, quality: int) -> List[bytes]:
+    capture = cv2.VideoCapture(str(path))
+    frames = []
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(encode_frame(frame, max_width, quality))
+    finally:
+        capture.release()
+    return frames
+
+
+def load_frame_sequences(paths: List[str], max_width: int = 640, quality: int = 70) -> List[List[bytes]]:
+    """
+    Secuencias a reproducir: cada video es una secuencia y cada directorio con
+    imágenes también (ordenadas por nombre); los subdirectorios se recorren.
+    Sin rutas, una secuencia sintética (sin manos) de 50 frames.
+    """
+    sequences = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            images = sorted(item for item in path.iterdir() if item.suffix.lower() in IMAGE_EXTENSIONS)
+            if images:
+                sequences.append([item.read_bytes() for item in images])
+            for item in sorted(path.iterdir()):
+                if item.is_dir() or item.suffix.lower() in VIDEO_EXTENSIONS:
+                    sequences.extend(load_frame_sequences([str(item)], max_width, quality))
+        elif path.suffix.lower() in VIDEO_EXTENSIONS:
+            frames = _read_video_frames(path, max_width, quality)
+            if frames:
+                sequences.append(frames)
+    if not paths:
+        from pipeline_benchmark import synthetic_frames
+        sequences.append(synthetic_frames(count=50, width=640, height=480))
+    return sequences
+
+
+def summarize_ms(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"n": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"n": len(values), "mean": round(float(np.mean(values)), 2), "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2), "p99": round(float(p99), 2), "max": round(float(np.max(values)), 2)}
+
+
+# ===== CLIENTE =====
+class LoadClient:
+    """Una sesión WebSocket simulada: envía frames con ritmo fijo y registra las respuestas"""
+
+    def __init__(self, index: int, url: str, sequences: List[List[bytes]], fps: float,
+                 transport: str = "binary", settings: Optional[Dict[str, Any]] = None):
+        self.index = index
+        self.url = url
+        # Cada cliente empieza en una secuencia distinta para no sincronizar los gestos
+        self.sequences = sequences[index % len(sequences):] + sequences[:index % len(sequences)]
+        self.interval = 1 / fps if fps > 0 else 0.0
+        self.transport = transport
+        self.settings = settings or {
+            "confidenceThreshold": PROCESSING_CONFIG["default_confidence_threshold"],
+            "predictionCount": PROCESSING_CONFIG["default_prediction_count"]
+        }
+
+        self.sequence = 0
+        self._sent_at: Dict[int, float] = {}
+        self._clip_started = 0.0
+        self._events: Dict[str, asyncio.Event] = {}
+
+        self.connect_ms: Optional[float] = None
+        self.frames_sent = 0
+        self.responses = 0
+        self.latencies_ms: List[float] = []
+        self.prediction_ms: List[float] = []
+        self.server_dropped = 0
+        self.errors: List[str] = []
+
+    def _frame_message(self, jpeg: bytes, source: str):
+        sequence = self.sequence
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        if self.transport == "binary":
+            header = FRAME_HEADER.pack(FRAME_PROTOCOL_VERSION, FRAME_SOURCE_CODES[source], 0, sequence)
+            return sequence, header + jpeg
+        return sequence, json.dumps({"type": "frame", "data": base64.b64encode(jpeg).decode("ascii"),
+                                     "source": source, "sequence": sequence, "settings": self.settings})
+
+    async def _send_frame(self, ws, jpeg: bytes, source: str):
+        sequence, message = self._frame_message(jpeg, source)
+        self._sent_at[sequence] = time.perf_counter()
+        await ws.send(message)
+        self.frames_sent += 1
+
+    def _event(self, name: str) -> asyncio.Event:
+        return self._events.setdefault(name, asyncio.Event())
+
+    async def _receive(self, ws):
+        async for raw in ws:
+            now = time.perf_counter()
+            data = json.loads(raw)
+            sent_at = self._sent_at.pop(data.get("sequence"), None)
+            if sent_at is not None:
+                self.responses += 1
+                self.latencies_ms.append((now - sent_at) * 1000)
+                # Los frames enviados antes que este y sin respuesta fueron reemplazados en el servidor
+                for sequence in [s for s in self._sent_at if s < data["sequence"]]:
+                    del self._sent_at[sequence]
+            self.server_dropped = data.get("dropped_frames", self.server_dropped)
+            if data.get("main_prediction"):
+                self.prediction_ms.append((now - self._clip_started) * 1000)
+            if data.get("error"):
+                self.errors.append(str(data["error"]))
+            if data.get("type"):
+                self._event(data["type"]).set()
+
+    async def _wait(self, name: str, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._event(name).wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.errors.append(f"timeout esperando {name}")
+            return False
+        finally:
+            self._events.pop(name, None)
+
+    async def _pace(self, start: float, index: int):
+        delay = start + index * self.interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _run_camera(self, ws, deadline: float):
+        """Stream de cámara: las secuencias se repiten hasta el deadline"""
+        start = time.perf_counter()
+        sent = 0
+        while True:
+            for frames in self.sequences:
+                self._clip_started = time.perf_counter()
+                for jpeg in frames:
+                    if time.perf_counter() >= deadline:
+                        return
+                    await self._pace(start, sent)
+                    await self._send_frame(ws, jpeg, "camera")
+                    sent += 1
+
+    async def _run_upload(self, ws, deadline: float, timeout: float = 30.0):
+        """Video upload por WebSocket: reset → frames del clip → video_upload_finished, un clip por vez"""
+        while time.perf_counter() < deadline:
+            for frames in self.sequences:
+                if time.perf_counter() >= deadline:
+                    return
+                self._clip_started = time.perf_counter()
+                await ws.send(json.dumps({"type": "reset_video_upload"}))
+                if not await self._wait("video_upload_reset", timeout):
+                    return
+                start = time.perf_counter()
+                for index, jpeg in enumerate(frames):
+                    await self._pace(start, index)
+                    await self._send_frame(ws, jpeg, "upload")
+                await ws.send(json.dumps({"type": "video_upload_finished", "total_frames": len(frames),
+                                          "settings": self.settings}))
+                if not await self._wait("camera_restored", timeout):
+                    return
+
+    async def run(self, mode: str, duration: float, drain_s: float = 2.0):
+        import websockets
+
+        connect_start = time.perf_counter()
+        try:
+            async with websockets.connect(self.url, max_size=None) as ws:
+                self.connect_ms = (time.perf_counter() - connect_start) * 1000
+                if self.transport == "binary":
+                    await ws.send(json.dumps({"type": "settings", "settings": self.settings}))
+                receiver = asyncio.create_task(self._receive(ws))
+                deadline = time.perf_counter() + duration
+                try:
+                    if mode == "upload":
+                        await self._run_upload(ws, deadline)
+                    else:
+                        await self._run_camera(ws, deadline)
+                    await asyncio.sleep(drain_s)  # Respuestas de los últimos frames
+                finally:
+                    receiver.cancel()
+        except Exception as e:  # Conexión rechazada o cerrada por el servidor
+            self.errors.append(f"{type(e).__name__}: {e}")
+
+
+# ===== EJECUCIÓN =====
+def start_in_process_server(host: str = "127.0.0.1"):
+    """
+    Levanta main.app con uvicorn en un hilo y un puerto libre; devuelve (server, hilo, url)
+
+    Espera a que el servidor esté listo (tracking y modelo cargados) para no
+    medir el arranque en segundo plano como latencia.
+    """
+    import uvicorn
+    from main import app, startup
+
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", ws="websockets"))
+    thread = threading.Thread(target=server.run, name="lsp-load-server", daemon=True)
+    thread.start()
+    while not startup.is_ready():
+        if not thread.is_alive() or "failed" in (startup.state("tracking"), startup.state("model")):
+            server.should_exit = True
+            thread.join()
+            raise RuntimeError("El servidor en proceso no pudo iniciar (¿modelo disponible?)")
+        time.sleep(0.05)
+    print(f"🚀 Servidor en proceso listo en {startup.time_to_ready():.2f}s (aceptando conexiones a {startup.accepting_s:.2f}s)")
+    return server, thread, f"ws://{host}:{port}/ws"
+
+
+async def run_load(url: str, sequences: List[List[bytes]], clients: int = 10, fps: float = 15.0,
+                   duration: float = 30.0, mode: str = "camera", transport: str = "binary",
+                   ramp_up: float = 1.0) -> Dict[str, Any]:
+    """
+    Ejecuta la carga y agrega las métricas de todos los clientes
+
+    Returns:
+        Reporte con latencias por frame, tiempos hasta la predicción, descartes y errores
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Modo inválido: {mode}. Opciones: {', '.join(LOAD_MODES)}")
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Transporte inválido: {transport}. Opciones: {', '.join(TRANSPORTS)}")
+
+    load_clients = [LoadClient(index, url, sequences, fps, transport) for index in range(clients)]
+
+    async def start_client(client: LoadClient):
+        # Arranque escalonado: evita que todas las sesiones manden su primer frame a la vez
+        await asyncio.sleep(ramp_up * client.index / max(clients, 1))
+        await client.run(mode, duration)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(start_client(client) for client in load_clients))
+    elapsed = time.perf_counter() - start
+
+    frames_sent = sum(client.frames_sent for client in load_clients)
+    responses = sum(client.responses for client in load_clients)
+    errors = [error for client in load_clients for error in client.errors]
+    return {
+        "url": url,
+        "mode": mode,
+        "transport": transport,
+        "clients": clients,
+        "target_fps": fps,
+        "duration_s": duration,
+        "elapsed_s": round(elapsed, 2),
+        "frames_sent": frames_sent,
+        "responses": responses,
+        "server_dropped": sum(client.server_dropped for client in load_clients),
+        "unanswered": frames_sent - responses,
+        "sent_fps": round(frames_sent / elapsed, 1),
+        "response_fps": round(responses / elapsed, 1),
+        "connect_ms": summarize_ms([c.connect_ms for c in load_clients if c.connect_ms is not None]),
+        "latency_ms": summarize_ms([ms for client in load_clients for ms in client.latencies_ms]),
+        "prediction_ms": summarize_ms([ms for client in load_clients for ms in client.prediction_ms]),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:10]
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    latency, prediction = report["latency_ms"], report["prediction_ms"]
+    print(f"\n📊 CARGA: {report['clients']} clientes × {report['target_fps']} fps ({report['mode']}, "
+          f"{report['transport']}) durante {report['elapsed_s']}s")
+    print(f"   Frames enviados: {report['frames_sent']} ({report['sent_fps']}/s) | respuestas: "
+          f"{report['responses']} ({report['response_fps']}/s)")
+    print(f"   Descartados por el servidor: {report['server_dropped']} | sin respuesta (incluye descartados): "
+          f"{report['unanswered']}")
+    if latency["n"]:
+        print(f"   Latencia por frame: p50 {latency['p50']}ms | p95 {latency['p95']}ms | "
+              f"p99 {latency['p99']}ms | máx {latency['max']}ms")
+    if prediction["n"]:
+        print(f"   Predicciones: {prediction['n']} | tiempo desde el inicio del clip: "
+              f"p50 {prediction['p50']}ms | p95 {prediction['p95']}ms")
+    if report["errors"]:
+        print(f"   ❌ Errores: {report['errors']} (p. ej. {report['error_samples'][:3]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga WebSocket para LSP-AYNI")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default=f"ws://localhost:{SERVER_CONFIG['port']}/ws", help="Servidor a probar")
+    target.add_argument("--in-process", action="store_true", help="Levantar main.app en este proceso")
+    parser.add_argument("--frames", nargs="*", default=[], metavar="RUTA",
+                        help="Videos o directorios de JPEG a reproducir (default: secuencia sintética)")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--fps", type=float, default=15.0, help="Frames por segundo por cliente (0 = sin pausa)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de envío por cliente")
+    parser.add_argument("--mode", choices=LOAD_MODES, default="camera")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="binary",
+                        help="Frames binarios (app.js actual) o base64 en JSON")
+    parser.add_argument("--ramp-up", type=float, default=1.0, help="Segundos para conectar a todos los clientes")
+    parser.add_argument("--max-width", type=int, default=640, help="Ancho máximo de los frames enviados")
+    parser.add_argument("--quality", type=int, default=70, help="Calidad JPEG de los frames enviados")
+    parser.add_argument("--output", type=Path, help="Guardar el reporte en JSON")
+    args = parser.parse_args()
+
+    sequences = load_frame_sequences(args.frames, args.max_width, args.quality)
+    if not sequences:
+        print("❌ No se encontraron frames en las rutas indicadas")
+        return 1
+    print(f"🎞️ {len(sequences)} secuencias, {sum(map(len, sequences))} frames")
+
+    server = None
+    url = args.url
+    if args.in_process:
+        server, thread, url = start_in_process_server()
+        print(f"🚀 Servidor en proceso: {url}")
+
+    try:
+        report = asyncio.run(run_load(url, sequences, args.clients, args.fps, args.duration,
+                                      args.mode, args.transport, args.ramp_up))
+    finally:
+        if server is not None:
+            # Apagado ordenado (shutdown de la app) antes de que el intérprete termine
+            server.should_exit = True
+            thread.join(timeout=10)
+
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 Reporte: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,10 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File, Form
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 import asyncio
 import json
 import logging
+import tempfile
 import time
 from typing import Dict, Any, Optional
 import uvicorn
@@ -15,11 +16,22 @@ import numpy as np
 # Agregar el directorio backend al path para imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from keypoint_extractor import HandKeypointExtractor
-from model_processor import SignLanguageModel, ModelPreprocessor
+# Sin imports pesados a nivel de módulo: mediapipe (que arrastra TensorFlow) y el
+# modelo se importan en segundo plano después de que el servidor acepta conexiones
+from readiness import StartupTracker, FirstByteMiddleware
+from recognition_session import RecognitionSession, SessionRegistry
+from stage_executors import StageExecutor
+from inference_batcher import InferenceBatcher
+from frame_ingest import FrameIngest, IngestedFrame
+from frame_protocol import parse_binary_frame
+from keypoint_cache import KeypointCache, get_keypoint_cache, new_content_hash
+from prediction_cache import create_prediction_cache
+from metrics import REGISTRY
+from motion_gate import GATE_WINDOWS
 from config import (
-    MODEL_CONFIG, SERVER_CONFIG, LOGGING_CONFIG, 
-    ensure_directories, check_model_files
+    MODEL_CONFIG, SERVER_CONFIG, LOGGING_CONFIG, EXECUTOR_CONFIG, INFERENCE_CONFIG, INGEST_CONFIG,
+    PROCESSING_CONFIG, UPLOAD_CONFIG, STARTUP_CONFIG,
+    ensure_directories, check_model_files, get_model_files
 )
 
 # Configurar logging
@@ -37,70 +49,46 @@ app = FastAPI(
 )
 
 # Variables globales
-keypoint_extractor = None
 sign_model = None
 
-class VideoUploadProcessor:
-    """Procesa frames de video upload y acumula keypoints"""
-    
-    def __init__(self):
-        self.reset()
-    
-    def reset(self):
-        self.keypoints_buffer = []
-        self.total_frames = 0
-        self.frames_with_hands = 0
-        self.target_frames = 50
-    
-    def add_frame(self, keypoints):
-        """Añade keypoints de un frame"""
-        self.total_frames += 1
-        if keypoints is not None:
-            self.keypoints_buffer.append(keypoints.copy())
-            self.frames_with_hands += 1
-    
-    def is_ready_for_prediction(self):
-        """Verifica si tenemos suficientes frames para predicción"""
-        return len(self.keypoints_buffer) >= self.target_frames  # 50 frames para auto-predicción
-    
-    def get_keypoints_sequence(self):
-        """Retorna la secuencia de keypoints para el modelo"""
-        if len(self.keypoints_buffer) >= 21:  # Permitir mínimo 21 frames
-            # Tomar hasta 50 frames o los que tengamos
-            frames_to_use = min(len(self.keypoints_buffer), self.target_frames)
-            keypoints_array = np.array(self.keypoints_buffer[:frames_to_use])
-            
-            # Si tenemos menos de 30 frames, advertir pero permitir predicción
-            if len(self.keypoints_buffer) < 30:
-                print(f"⚠️ VIDEO UPLOAD: Predicción con solo {len(self.keypoints_buffer)} frames (recomendado: 30+)")
-            
-            return keypoints_array
-        return None
-    
-    def get_progress(self):
-        """Retorna el progreso de extracción"""
-        return {
-            'total_frames': self.total_frames,
-            'frames_with_hands': self.frames_with_hands,
-            'target_frames': self.target_frames,
-            'progress_percent': (self.frames_with_hands / self.target_frames) * 100
-        }
-    
-    def should_process_final(self, total_video_frames):
-        """Verifica si debe procesar al final del video"""
-        return (self.total_frames >= total_video_frames and 
-                len(self.keypoints_buffer) >= 21 and  # Reducido a 21 mínimo
-                not self.is_ready_for_prediction())
+# Estado de arranque (tracking y modelo cargan en segundo plano) y tiempos desde el inicio del proceso
+startup = StartupTracker()
+app.add_middleware(FirstByteMiddleware, tracker=startup)
+background_tasks: set = set()
+
+# Registro de sesiones: cada conexión WebSocket tiene su propio estado
+session_registry = SessionRegistry()
+
+# Ejecutores para MediaPipe e inferencia: el event loop queda libre mientras corren
+frame_executor = StageExecutor("frames", EXECUTOR_CONFIG["frame_workers"])
+inference_executor = StageExecutor("inference", EXECUTOR_CONFIG["inference_workers"])
 
-# Instancia global para video upload
-video_upload_processor = VideoUploadProcessor()
+# Scheduler de micro-batching delante del modelo (se crea al cargar el modelo)
+inference_batcher: Optional[InferenceBatcher] = None
 
-# Estado anterior para evitar log spam
-previous_main_log_state = None
+# Caché en disco de keypoints de videos subidos (se crea en el startup, porque crea su
+# directorio; None si está deshabilitada o la app se usa sin su evento de startup)
+keypoint_cache: Optional[KeypointCache] = None
 
-# Control de flujos mutuamente excluyentes
-is_processing_video_upload = False
-video_upload_timeout_task = None
+# Métricas del servidor (/metrics); las del extractor y el modelo se registran en sus módulos
+WEBSOCKET_SEND_MS = REGISTRY.histogram("websocket_send_ms", description="Serialización + envío de un mensaje WebSocket en ms")
+MESSAGES_SENT = REGISTRY.counter("websocket_messages_sent_total", "Mensajes enviados por WebSocket")
+ERRORS = REGISTRY.counter("errors_total", "Errores por etapa", ("stage",))
+
+def _hands_detected_ratio() -> Optional[float]:
+    processed_total = REGISTRY.get("frames_processed_total")  # Se registra al importar el extractor
+    processed = processed_total.value() if processed_total else 0
+    return REGISTRY.get("frames_with_hands_total").value() / processed if processed else None
+
+REGISTRY.gauge("sessions_active", lambda: len(session_registry), "Sesiones WebSocket activas")
+REGISTRY.gauge("hands_detected_ratio", _hands_detected_ratio, "Fracción de frames procesados con ambas manos")
+REGISTRY.gauge("executor_frames_queued", lambda: frame_executor.queued, "Tareas en cola del pool de frames (MediaPipe)")
+REGISTRY.gauge("executor_inference_queued", lambda: inference_executor.queued, "Tareas en cola del worker de inferencia")
+REGISTRY.gauge("ready", lambda: float(startup.is_ready()), "1 si el tracking y el modelo están cargados")
+REGISTRY.gauge("startup_time_to_first_byte_seconds", lambda: startup.first_byte_s,
+               "Segundos desde el inicio del proceso hasta la primera respuesta")
+REGISTRY.gauge("startup_time_to_ready_seconds", startup.time_to_ready,
+               "Segundos desde el inicio del proceso hasta tener tracking y modelo listos")
 
 class ConnectionManager:
     """Manejador de conexiones WebSocket"""
@@ -119,69 +107,132 @@ class ConnectionManager:
         logger.info(f"Conexión WebSocket cerrada. Total: {len(self.active_connections)}")
         
     async def send_message(self, websocket: WebSocket, message: dict):
+        start = time.perf_counter()
         try:
             await websocket.send_text(json.dumps(message))
+            WEBSOCKET_SEND_MS.observe((time.perf_counter() - start) * 1000)
+            MESSAGES_SENT.inc()
         except Exception as e:
             logger.error(f"Error enviando mensaje WebSocket: {e}")
+            ERRORS.inc(stage="websocket_send")
             self.disconnect(websocket)
 
 manager = ConnectionManager()
 
 @app.on_event("startup")
 async def startup_event():
-    """Inicialización de la aplicación"""
-    global keypoint_extractor, sign_model
+    """
+    Inicialización de la aplicación
     
+    No bloquea: el servidor acepta conexiones enseguida (/health/live responde) y
+    MediaPipe y el modelo se cargan en una tarea en segundo plano.
+    """
+    global keypoint_cache
     logger.info("🚀 Iniciando LSP-AYNI API Server...")
     
     # Crear directorios necesarios
     ensure_directories()
+    keypoint_cache = get_keypoint_cache()
+    
+    # Los extractores de keypoints se crean por sesión al conectarse cada cliente;
+    # mediapipe y el modelo se importan y calientan en segundo plano
+    startup.schedule()
+    task = asyncio.create_task(load_components())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    
+    startup.mark_accepting()
+    logger.info(f"🌐 Aceptando conexiones a {startup.accepting_s:.2f}s del inicio del proceso")
+
+def warm_up_tracking() -> float:
+    """Importa mediapipe y calienta el detector de manos (en el pool de frames)"""
+    from keypoint_extractor import warm_up_hand_detector
+    return warm_up_hand_detector() if STARTUP_CONFIG["warm_up_tracking"] else 0.0
+
+def load_sign_model():
+    """
+    Construye, carga y calienta el modelo (en el worker de inferencia)
     
-    # Inicializar extractor de keypoints
+    Raises:
+        RuntimeError: Si faltan los archivos del modelo o no se pudo cargar
+    """
+    from model_processor import SignLanguageModel
+    
+    if not check_model_files():
+        raise RuntimeError("Archivos del modelo no encontrados")
+    
+    model_files = get_model_files()
+    model = SignLanguageModel(
+        model_path=str(model_files["model_path"]),
+        encoder_path=str(model_files["encoder_path"]),
+        info_path=str(model_files["info_path"]),
+        backend=MODEL_CONFIG["backend"],
+        jit_compile=INFERENCE_CONFIG["jit_compile"],
+        warmup_batch_sizes=INFERENCE_CONFIG["warmup_batch_sizes"],
+        result_mode=INFERENCE_CONFIG["result_mode"],
+        prediction_cache=create_prediction_cache()
+    )
+    if not model.load_model_components():
+        raise RuntimeError("Modelo no pudo ser cargado")
+    return model
+
+async def load_components():
+    """Carga en segundo plano: primero el tracking (habilita sesiones), después el modelo"""
+    global sign_model, inference_batcher
+    
+    startup.mark_loading("tracking")
     try:
-        keypoint_extractor = HandKeypointExtractor()
-        logger.info("✅ Extractor de keypoints inicializado")
+        warm_up_ms = await frame_executor.run(warm_up_tracking)
+        startup.mark_ready("tracking")
+        logger.info(f"✋ Tracking de MediaPipe listo a {startup.snapshot()['components']['tracking']['ready_s']:.2f}s "
+                    f"(calentamiento {warm_up_ms:.0f} ms)")
     except Exception as e:
-        logger.error(f"❌ Error inicializando extractor: {e}")
-        keypoint_extractor = None
+        logger.error(f"❌ Error inicializando MediaPipe: {e}")
+        startup.mark_failed("tracking", str(e))
     
-    # Intentar cargar modelo
+    startup.mark_loading("model")
     try:
-        # Verificar si existen los archivos del modelo
-        model_files_exist = check_model_files()
-        
-        if model_files_exist:
-            sign_model = SignLanguageModel(
-                model_path=str(MODEL_CONFIG["model_path"]),
-                encoder_path=str(MODEL_CONFIG["encoder_path"]),
-                info_path=str(MODEL_CONFIG["info_path"])
-            )
-            
-            if sign_model.load_model_components():
-                logger.info("✅ Modelo de IA cargado exitosamente")
-            else:
-                logger.error("❌ Error cargando modelo - Servidor no puede funcionar sin modelo")
-                raise Exception("Modelo no pudo ser cargado")
-        else:
-            logger.error("❌ Archivos del modelo no encontrados - Servidor no puede funcionar sin modelo")
-            raise Exception("Archivos del modelo no encontrados")
-            
+        # En el worker de inferencia: el mismo hilo que después ejecuta los forward
+        sign_model = await inference_executor.run(load_sign_model)
+        inference_batcher = InferenceBatcher(
+            sign_model.predict_batch,
+            inference_executor,
+            max_batch_size=INFERENCE_CONFIG["max_batch_size"],
+            max_wait_ms=INFERENCE_CONFIG["max_wait_ms"]
+        )
+        # Histogramas propios de cada componente en /metrics
+        for histogram in (sign_model.forward_latency, inference_batcher.batch_size_histogram,
+                          inference_batcher.wait_time_histogram):
+            REGISTRY.register(histogram)
+        startup.mark_ready("model")
+        logger.info("✅ Modelo de IA cargado exitosamente")
     except Exception as e:
-        logger.error(f"❌ Error configurando modelo: {e}")
-        raise e
+        logger.error(f"❌ Error configurando modelo - el servidor no estará listo: {e}")
+        startup.mark_failed("model", str(e))
+        return
     
-    logger.info("🤖 Servidor iniciado con modelo de IA completo")
+    if startup.is_ready():
+        first_byte = startup.first_byte_s
+        logger.info(f"🤖 Servidor listo en {startup.time_to_ready():.2f}s "
+                    f"(primer byte: {f'{first_byte:.2f}s' if first_byte is not None else 'sin solicitudes aún'})")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Limpieza al cerrar la aplicación"""
-    global keypoint_extractor
-    
     logger.info("🛑 Cerrando LSP-AYNI API Server...")
     
-    if keypoint_extractor:
-        keypoint_extractor.cleanup()
-        logger.info("✅ Extractor de keypoints limpiado")
+    for task in list(background_tasks):
+        task.cancel()
+    
+    if len(session_registry) > 0:
+        await session_registry.close_all()
+        logger.info("✅ Sesiones de reconocimiento cerradas")
+    
+    if inference_batcher:
+        await inference_batcher.close()
+    
+    frame_executor.shutdown(wait=False)
+    inference_executor.shutdown(wait=False)
 
 # Servir archivos estáticos
 static_dir = Path(__file__).parent.parent / "static"
@@ -205,19 +256,43 @@ async def read_root():
         logger.error(f"Error sirviendo página principal: {e}")
         return HTMLResponse(content="<h1>Error del servidor</h1>")
 
+@app.get("/health/live")
+async def health_live():
+    """Liveness: el proceso responde (no depende de MediaPipe ni del modelo)"""
+    return {"status": "alive", "uptime_s": startup.snapshot()["uptime_s"]}
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: 200 cuando el tracking y el modelo están listos, 503 mientras cargan o si fallaron"""
+    snapshot = startup.snapshot()
+    snapshot["status"] = "ready" if snapshot["ready"] else "not_ready"
+    return JSONResponse(content=snapshot, status_code=200 if snapshot["ready"] else 503)
+
 @app.get("/test")
 async def test_endpoint():
     """Endpoint de prueba para verificar estado del servidor"""
-    global sign_model, keypoint_extractor
+    global sign_model
     
     status = {
         "server": "LSP-AYNI API",
         "status": "running",
         "timestamp": time.time(),
         "components": {
-            "keypoint_extractor": keypoint_extractor is not None,
             "sign_model": sign_model is not None and sign_model.is_ready() if sign_model else False
-        }
+        },
+        "startup": startup.snapshot(),
+        "sessions": {
+            "active": len(session_registry),
+            "details": [session.get_status() for session in session_registry]
+        },
+        "executors": {
+            "frames": frame_executor.get_stats(),
+            "inference": inference_executor.get_stats()
+        },
+        "inference_batcher": inference_batcher.get_stats() if inference_batcher else None,
+        "inference": sign_model.get_inference_stats() if sign_model else None,
+        "motion_gate": get_motion_gate_totals(),
+        "keypoint_cache": keypoint_cache.get_stats() if keypoint_cache else None
     }
     
     if sign_model:
@@ -225,6 +300,18 @@ async def test_endpoint():
     
     return JSONResponse(content=status)
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Métricas por etapa en formato de texto de Prometheus"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+def get_motion_gate_totals() -> dict:
+    """Ventanas ejecutadas vs. descartadas por el gate de movimiento (todo el proceso)"""
+    return {
+        "executed_windows": GATE_WINDOWS.value(decision="executed"),
+        "gated_windows": GATE_WINDOWS.value(decision="gated")
+    }
+
 @app.get("/api/model/info")
 async def get_model_info():
     """Información del modelo cargado"""
@@ -235,34 +322,126 @@ async def get_model_info():
     else:
         raise HTTPException(status_code=503, detail="Modelo no disponible")
 
-async def process_frame_with_model(base64_data: str, settings: dict) -> dict:
+@app.post("/api/video/predict")
+async def predict_video(
+    file: UploadFile = File(...),
+    confidence_threshold: float = Form(PROCESSING_CONFIG["default_confidence_threshold"], alias="confidenceThreshold"),
+    prediction_count: int = Form(PROCESSING_CONFIG["default_prediction_count"], alias="predictionCount")
+):
+    """
+    Predicción sobre un video completo subido como archivo
+    
+    El servidor decodifica el video con OpenCV, muestrea 50 frames por timestamp,
+    extrae keypoints y predice en un solo job (sin frames JPEG por WebSocket).
+    """
+    if prediction_count < 1:
+        raise HTTPException(status_code=400, detail=f"predictionCount inválido: {prediction_count} (mínimo 1)")
+    if startup.state("model") in ("pending", "loading"):
+        raise HTTPException(status_code=503, detail="Modelo cargándose, reintenta en unos segundos",
+                            headers={"Retry-After": str(STARTUP_CONFIG["retry_after_s"])})
+    if not sign_model or not sign_model.is_ready() or not inference_batcher:
+        raise HTTPException(status_code=503, detail="Modelo no disponible")
+    
+    from video_processing import extract_video_keypoints
+    
+    max_bytes = UPLOAD_CONFIG["max_upload_mb"] * 1024 * 1024
+    suffix = Path(file.filename or "").suffix or ".mp4"
+    temp_file = tempfile.NamedTemporaryFile(prefix="lsp_upload_", suffix=suffix, delete=False)
+    temp_path = Path(temp_file.name)
+    
+    try:
+        # OpenCV necesita una ruta: copiar el archivo subido por bloques (y hashearlo para la caché)
+        size = 0
+        content_hash = new_content_hash()
+        with temp_file:
+            while chunk := await file.read(UPLOAD_CONFIG["chunk_size"]):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Video demasiado grande (máximo {UPLOAD_CONFIG['max_upload_mb']} MB)")
+                content_hash.update(chunk)
+                temp_file.write(chunk)
+        
+        try:
+            extraction = await frame_executor.run(
+                extract_video_keypoints, temp_path, cache=keypoint_cache, content_hash=content_hash.hexdigest()
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        keypoints_sequence = extraction.pop("keypoints")
+        print(f"🎬 VIDEO HTTP: {file.filename} - {extraction['frames_with_hands']}/{extraction['frames_sampled']} "
+              f"frames con manos en {extraction['timing_ms']['total']:.0f} ms{' (caché)' if extraction['cached'] else ''}")
+        
+        if keypoints_sequence is None:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Video con muy pocas detecciones de manos: {extraction['frames_with_hands']}/21 frames mínimos requeridos"
+            )
+        
+        inference_start = time.perf_counter()
+        prediction_result = await process_keypoints_with_model(keypoints_sequence, {
+            "confidenceThreshold": confidence_threshold,
+            "predictionCount": min(prediction_count, PROCESSING_CONFIG["max_prediction_count"])
+        })
+        if "error" in prediction_result:
+            raise HTTPException(status_code=500, detail=prediction_result["error"])
+        extraction["timing_ms"]["inference"] = round((time.perf_counter() - inference_start) * 1000, 1)
+        
+        prediction_result.update(extraction)
+        prediction_result.update({
+            "source": "upload",
+            "hands_detected": True,
+            "frame_count": keypoints_sequence.shape[0],
+            "upload_bytes": size,
+            "timestamp": time.time()
+        })
+        return JSONResponse(content=prediction_result)
+    finally:
+        await file.close()
+        temp_path.unlink(missing_ok=True)
+
+async def extract_frame_keypoints(session: RecognitionSession, frame_data):
+    """
+    Decodifica el frame y extrae keypoints en el pool de frames
+    
+    Args:
+        session: Sesión de reconocimiento del cliente
+        frame_data: Frame en base64 (str, protocolo JSON) o JPEG crudo (bytes/memoryview, protocolo binario)
+        
+    Returns:
+        Tuple (hands_detected, keypoints, status)
+    """
+    keypoint_extractor = session.keypoint_extractor
+    if isinstance(frame_data, str):
+        process = keypoint_extractor.process_base64_frame
+    else:
+        process = keypoint_extractor.process_frame_bytes
+    return await session.run_extractor(frame_executor, process, frame_data)
+
+async def process_frame_with_model(session: RecognitionSession, frame_data, settings: dict) -> dict:
     """
     Procesa un frame usando el modelo de IA real
     
     Args:
-        base64_data: Frame en base64
+        session: Sesión de reconocimiento del cliente
+        frame_data: Frame en base64 o JPEG crudo
         settings: Configuración del cliente
         
     Returns:
         Diccionario con resultados del procesamiento
     """
-    global keypoint_extractor, sign_model
-    
-    if not keypoint_extractor:
-        return {"error": "Extractor de keypoints no disponible"}
+    keypoint_extractor = session.keypoint_extractor
     
-    # Procesar frame
-    hands_detected, keypoints, status = keypoint_extractor.process_base64_frame(base64_data)
+    # Procesar frame (decodificación + MediaPipe en el pool de frames)
+    hands_detected, keypoints, status = await extract_frame_keypoints(session, frame_data)
     
     # Debug: Log solo en transiciones importantes (no durante countdown/recording)
-    global previous_main_log_state
-    
     # Solo log cuando se inicia el countdown o la grabación
     if status == "hands_detected" and not keypoint_extractor.is_recording and not keypoint_extractor.countdown_active:
-        if previous_main_log_state != "hands_detected_initial":
+        if session.previous_log_state != "hands_detected_initial":
             print(f"🔍 MAIN DEBUG: hands_detected={hands_detected}, status='{status}'")
             print(f"🔍 MAIN DEBUG: is_recording={keypoint_extractor.is_recording}, countdown_active={keypoint_extractor.countdown_active}, is_paused={keypoint_extractor.is_paused}")
-            previous_main_log_state = "hands_detected_initial"
+            session.previous_log_state = "hands_detected_initial"
     
     response = {
         "hands_detected": hands_detected,
@@ -286,10 +465,10 @@ async def process_frame_with_model(base64_data: str, settings: dict) -> dict:
     elif status == "hands_detected" and not keypoint_extractor.is_recording and not keypoint_extractor.countdown_active and not keypoint_extractor.is_paused:
         # Iniciar countdown cuando se detecten ambas manos (solo si no estamos en pausa)
         start_state = f"starting_countdown:{status}"
-        if previous_main_log_state != start_state:
+        if session.previous_log_state != start_state:
             print(f"🚀 MAIN DEBUG: ¡INICIANDO COUNTDOWN! Status: {status}")
-            previous_main_log_state = start_state
-        asyncio.create_task(start_recording_sequence())
+            session.previous_log_state = start_state
+        session.start_recording_sequence(start_recording_sequence(session))
         response["status"] = "🔥 Iniciando secuencia de grabación..."
         
     elif status.startswith("countdown:") and keypoint_extractor.countdown_active:
@@ -301,9 +480,9 @@ async def process_frame_with_model(base64_data: str, settings: dict) -> dict:
             response["status"] = f"🔥 Iniciando grabación en {remaining} segundos..."
             # Solo log una vez por cada segundo del countdown
             countdown_log_state = f"countdown_log:{remaining}"
-            if previous_main_log_state != countdown_log_state:
+            if session.previous_log_state != countdown_log_state:
                 print(f"⏰ COUNTDOWN: {remaining} segundos restantes")
-                previous_main_log_state = countdown_log_state
+                session.previous_log_state = countdown_log_state
             #print(f"📤 ENVIANDO AL FRONTEND: countdown_active=True, countdown_remaining={remaining}")
         
     elif status.startswith("recording:"):
@@ -311,19 +490,24 @@ async def process_frame_with_model(base64_data: str, settings: dict) -> dict:
         response["recording_progress"] = progress
         
         # Log solo al inicio de la grabación
-        if previous_main_log_state != "recording_active" and progress < 0.05:
+        if session.previous_log_state != "recording_active" and progress < 0.05:
             print(f"🎥 RECORDING: Grabando...")
-            previous_main_log_state = "recording_active"
+            session.previous_log_state = "recording_active"
+        
+        # Salida temprana: evaluar la secuencia parcial cada N frames
+        stop_early = False
+        if session.early_exit.check_due(keypoint_extractor.keypoint_buffer.present_written):
+            stop_early = await score_partial_recording(session)
         
         # Verificar si debe terminar la grabación
-        if keypoint_extractor.should_stop_recording():
+        if stop_early or keypoint_extractor.should_stop_recording():
             captured_keypoints = keypoint_extractor.stop_recording()
             if captured_keypoints is not None:
                 frame_count = captured_keypoints.shape[0] if len(captured_keypoints.shape) > 0 else 0
                 
                 # Log al completar la grabación
                 print(f"✅ GRABACIÓN COMPLETADA: {frame_count} frames")
-                previous_main_log_state = "recording_completed"
+                session.previous_log_state = "recording_completed"
                 
                 # Validar frame count mínimo (21 frames para entrada del modelo)
                 if frame_count < 21:
@@ -339,6 +523,11 @@ async def process_frame_with_model(base64_data: str, settings: dict) -> dict:
                     prediction_result = await process_keypoints_with_model(captured_keypoints, settings)
                     # Agregar frame count a la respuesta exitosa
                     prediction_result["frame_count"] = frame_count
+                    if session.early_exit.enabled:
+                        prediction_result["early_exit"] = session.early_exit.finish(
+                            prediction_result.get("main_prediction"), frame_count,
+                            time.time() - keypoint_extractor.recording_start_time
+                        )
                     response.update(prediction_result)
                 
                 # Iniciar pausa después de la predicción o error
@@ -346,39 +535,118 @@ async def process_frame_with_model(base64_data: str, settings: dict) -> dict:
     
     return response
 
-async def start_recording_sequence():
-    """Inicia la secuencia de countdown + grabación"""
-    global keypoint_extractor
+async def score_partial_recording(session: RecognitionSession) -> bool:
+    """
+    Evalúa la secuencia parcial de la grabación en curso (salida temprana)
+    
+    Returns:
+        True si la predicción parcial es lo bastante clara para terminar la grabación
+    """
+    if not sign_model or not sign_model.is_ready() or not inference_batcher:
+        return False
     
-    if keypoint_extractor:
-        # Countdown de 3 segundos
-        countdown_success = await keypoint_extractor.start_countdown()
+    keypoint_extractor = session.keypoint_extractor
+    buffer = keypoint_extractor.keypoint_buffer
+    present_frames = buffer.present_written
+    # Copia: la grabación sigue escribiendo en el buffer mientras corre la inferencia
+    partial_sequence = buffer.present_keypoints().copy()
+    
+    try:
+        result = await inference_batcher.predict(partial_sequence, top_k=2)
+    except Exception as e:
+        logger.warning(f"Evaluación parcial fallida [{session.session_id}]: {e}")
+        return False
+    if result is None:
+        # predict_batch devuelve None para las filas que fallaron (el error ya quedó en el log)
+        return False
+    
+    elapsed = time.time() - keypoint_extractor.recording_start_time
+    stop = session.early_exit.observe(result, present_frames, elapsed)
+    if stop:
+        print(f"⚡ SALIDA TEMPRANA [{session.session_id}]: {result['main_prediction']} "
+              f"({result['confidence']:.2f}) con {present_frames} frames en {elapsed:.2f}s")
+    return stop
+
+async def process_frame_continuous(session: RecognitionSession, frame_data, settings: dict) -> dict:
+    """
+    Procesa un frame de cámara en modo continuo (ventana deslizante)
+    
+    Cada frame entra a la ventana de la sesión; cada K frames se evalúa la ventana
+    más reciente y la predicción solo se envía cuando es estable entre ventanas.
+    
+    Args:
+        session: Sesión de reconocimiento del cliente
+        frame_data: Frame en base64 o JPEG crudo
+        settings: Configuración del cliente
         
-        if countdown_success:
-            # Iniciar grabación
-            keypoint_extractor.start_recording()
+    Returns:
+        Diccionario con resultados del procesamiento
+    """
+    recognizer = session.continuous_recognizer
+    
+    hands_detected, keypoints, status = await extract_frame_keypoints(session, frame_data)
+    recognizer.add_frame(keypoints if hands_detected else None)
+    
+    response = {
+        "hands_detected": hands_detected,
+        "status": "🔁 Reconocimiento continuo..." if hands_detected else "👋 Muestra ambas manos frente a la cámara",
+        "source": "camera",
+        "recognition_mode": "continuous",
+        "timestamp": time.time()
+    }
+    
+    if recognizer.window_ready():
+        window = recognizer.take_window()
+        prediction_result = await process_keypoints_with_model(window, settings)
+        
+        if "error" in prediction_result:
+            logger.warning(f"Ventana continua descartada [{session.session_id}]: {prediction_result['error']}")
+        else:
+            response["window_prediction"] = {
+                "label": prediction_result["main_prediction"],
+                "confidence": prediction_result["confidence"]
+            }
+            emitted = recognizer.observe(prediction_result)
+            if emitted:
+                print(f"🔁 CONTINUO [{session.session_id}]: {emitted['main_prediction']} ({emitted['confidence']:.2f})")
+                emitted["frame_count"] = window.shape[0]
+                response.update(emitted)
+    
+    response["window"] = recognizer.get_progress()
+    return response
+
+async def start_recording_sequence(session: RecognitionSession):
+    """Inicia la secuencia de countdown + grabación"""
+    keypoint_extractor = session.keypoint_extractor
+    
+    # Countdown de 3 segundos
+    countdown_success = await keypoint_extractor.start_countdown()
+    
+    if countdown_success:
+        # Iniciar grabación
+        keypoint_extractor.start_recording()
+        session.early_exit.reset()
 
-async def process_video_upload_frame(base64_data: str, settings: dict) -> dict:
+async def process_video_upload_frame(session: RecognitionSession, frame_data, settings: dict) -> dict:
     """
     Procesa un frame de video upload de manera directa
     
     Args:
-        base64_data: Frame en base64
+        session: Sesión de reconocimiento del cliente
+        frame_data: Frame en base64 o JPEG crudo
         settings: Configuración del cliente
         
     Returns:
         Diccionario con resultados del procesamiento
     """
-    global keypoint_extractor, sign_model, video_upload_processor
-    
-    if not keypoint_extractor:
-        return {"error": "Extractor de keypoints no disponible"}
+    keypoint_extractor = session.keypoint_extractor
+    video_upload_processor = session.video_upload_processor
     
     # Cambiar a modo upload para suprimir logs de cámara
     keypoint_extractor.processing_mode = "upload"
     
     # Procesar frame directamente (sin countdown ni grabación)
-    hands_detected, keypoints, status = keypoint_extractor.process_base64_frame(base64_data)
+    hands_detected, keypoints, status = await extract_frame_keypoints(session, frame_data)
     
     # Restaurar modo camera para próximos frames de cámara
     keypoint_extractor.processing_mode = "camera"
@@ -426,12 +694,8 @@ async def process_video_upload_frame(base64_data: str, settings: dict) -> dict:
             video_upload_processor.reset()
             
             # IMPORTANTE: Restaurar funcionalidad de cámara al completar automáticamente
-            global is_processing_video_upload, video_upload_timeout_task
-            is_processing_video_upload = False
-            
-            # Cancelar timeout de seguridad
-            if video_upload_timeout_task and not video_upload_timeout_task.done():
-                video_upload_timeout_task.cancel()
+            # (también cancela el timeout de seguridad)
+            session.finish_video_upload()
             
             print("📷 CÁMARA: Restaurada funcionalidad - Video upload auto-completado")
         else:
@@ -452,12 +716,20 @@ async def process_keypoints_with_model(keypoints, settings: dict) -> dict:
     """
     global sign_model
     
-    if not sign_model or not sign_model.is_ready():
+    # Mientras el modelo carga en segundo plano, la predicción espera (con tope)
+    if not startup.is_ready("model") and not await startup.wait("model", STARTUP_CONFIG["model_wait_s"]):
+        if startup.state("model") == "loading":
+            return {"error": "Modelo cargándose, reintenta en unos segundos"}
+        return {"error": "Modelo no disponible"}
+    
+    if not sign_model or not sign_model.is_ready() or not inference_batcher:
         return {"error": "Modelo no disponible"}
     
     try:
-        # Realizar predicción
-        result = sign_model.predict(keypoints, top_k=settings.get('predictionCount', 3))
+        # Realizar predicción: el batcher la agrupa con las de otras sesiones
+        result = await inference_batcher.predict(
+            keypoints, top_k=settings.get('predictionCount', 3)
+        )
         
         if result:
             # Filtrar por umbral de confianza
@@ -480,58 +752,189 @@ async def process_keypoints_with_model(keypoints, settings: dict) -> dict:
         logger.error(f"Error procesando con modelo: {e}")
         return {"error": f"Error en procesamiento: {str(e)}"}
 
-async def reset_video_upload_after_timeout():
+async def reset_video_upload_after_timeout(session: RecognitionSession):
     """Reset video upload después de timeout de seguridad"""
     await asyncio.sleep(30)  # 30 segundos timeout
-    global is_processing_video_upload, video_upload_processor
-    if is_processing_video_upload:
-        print("⏰ VIDEO UPLOAD: Timeout alcanzado - Restaurando funcionalidad de cámara")
-        is_processing_video_upload = False
-        video_upload_processor.reset()
+    if session.is_processing_video_upload:
+        print(f"⏰ VIDEO UPLOAD [{session.session_id}]: Timeout alcanzado - Restaurando funcionalidad de cámara")
+        session.is_processing_video_upload = False
+        session.video_upload_processor.reset()
+
+async def handle_frame(session: RecognitionSession, frame_data, source: str, settings: dict) -> dict:
+    """
+    Enruta un frame a video upload o cámara según el origen y el estado de la sesión
+    
+    Args:
+        session: Sesión de reconocimiento del cliente
+        frame_data: Frame en base64 o JPEG crudo
+        source: "camera" o "upload"
+        settings: Configuración del cliente
+        
+    Returns:
+        Respuesta para el cliente
+    """
+    if source == "upload":
+        # Solo procesar video upload si no hay cámara activa
+        if not session.is_processing_video_upload:
+            # Iniciar modo video upload
+            session.is_processing_video_upload = True
+            print("🎬 VIDEO UPLOAD: Iniciando procesamiento de video - Pausando cámara")
+        
+        # Procesamiento directo para video upload (sin countdown/grabación)
+        result = await process_video_upload_frame(session, frame_data, settings)
+    elif session.is_processing_video_upload:
+        # Solo procesar cámara si no hay video upload activo:
+        # rechazar frames de cámara durante video upload
+        return {
+            "hands_detected": False,
+            "status": "📹 Procesando video upload - Cámara pausada temporalmente",
+            "camera_paused": True,
+            "source": "camera_blocked",  # Identificar como cámara bloqueada
+            "timestamp": time.time()
+        }
+    elif session.recognition_mode == "continuous":
+        # Ventana deslizante: predicciones sin countdown ni pausa
+        result = await process_frame_continuous(session, frame_data, settings)
+    else:
+        # Procesamiento normal para cámara (con countdown/grabación)
+        result = await process_frame_with_model(session, frame_data, settings)
+    
+    # En modo debug_stream cada respuesta lleva el frame anotado
+    if session.keypoint_extractor.annotation_mode == "debug_stream":
+        overlay = await session.run_extractor(frame_executor, session.keypoint_extractor.encode_annotated_frame)
+        if overlay:
+            result["overlay"] = overlay
+    
+    return result
+
+async def send_overlay(session: RecognitionSession):
+    """Dibuja y envía el overlay del último frame procesado (corre en el worker de ingesta)"""
+    overlay = await session.run_extractor(frame_executor, session.keypoint_extractor.encode_annotated_frame)
+    await manager.send_message(session.websocket, {
+        "type": "overlay",
+        "data": overlay,
+        "timestamp": time.time()
+    })
+
+def is_droppable_frame(session: RecognitionSession, source: str) -> bool:
+    """Un frame de cámara puede reemplazarse por uno más nuevo salvo en video upload o grabación"""
+    if not INGEST_CONFIG["latest_frame_wins"]:
+        return False
+    if source == "upload" or session.is_processing_video_upload:
+        return False
+    if INGEST_CONFIG["keep_all_while_recording"] and session.keypoint_extractor.is_recording:
+        return False
+    return True
+
+async def process_ingested_frame(session: RecognitionSession, frame: IngestedFrame):
+    """Worker de la sesión: procesa el frame y envía la respuesta"""
+    start = time.perf_counter()
+    result = await handle_frame(session, frame.data, frame.source, session.settings)
+    
+    if frame.source == "camera" and not session.is_processing_video_upload:
+        # Recomendación de fps/resolución/calidad según latencia y carga del servidor
+        rate_controller = session.rate_controller
+        rate_controller.observe((time.perf_counter() - start) * 1000)
+        extractor = session.keypoint_extractor
+        hands_detected = result.get("hands_detected", False)
+        capturing = (extractor.is_recording or extractor.countdown_active or
+                     (session.recognition_mode == "continuous" and hands_detected))
+        hint = rate_controller.update(capturing, hands_detected)
+        if hint:
+            result["rate_hint"] = hint
+    
+    if frame.sequence is not None:
+        result["sequence"] = frame.sequence
+    result["dropped_frames"] = session.frame_ingest.dropped
+    await manager.send_message(session.websocket, result)
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """Endpoint principal de WebSocket para comunicación en tiempo real"""
-    global video_upload_processor, is_processing_video_upload, video_upload_timeout_task
     await manager.connect(websocket)
     
+    # La conexión se acepta enseguida; la sesión necesita el tracking de MediaPipe
+    # (sin carga en segundo plano, la sesión importa mediapipe al crearse)
+    if not await startup.wait("tracking", STARTUP_CONFIG["tracking_wait_s"]) and startup.scheduled:
+        await manager.send_message(websocket, {"error": "Tracking de manos no disponible"})
+        manager.disconnect(websocket)
+        await websocket.close(code=1013)  # Try Again Later
+        return
+    
+    # Sesión propia para este cliente (extractor, buffer de upload y timers)
+    session = session_registry.create(websocket)
+    video_upload_processor = session.video_upload_processor
+    
+    # El bucle de recepción solo encola frames; el worker de la sesión los procesa
+    session.frame_ingest = FrameIngest(lambda frame: process_ingested_frame(session, frame), session.session_id)
+    session.frame_ingest.start()
+    
     try:
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            raw_message = await websocket.receive()
+            if raw_message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(raw_message.get("code", 1000))
+            
+            if raw_message.get("bytes") is not None:
+                # Frame binario: cabecera + JPEG crudo, sin base64 ni JSON
+                try:
+                    source, sequence, jpeg_data = parse_binary_frame(raw_message["bytes"])
+                except ValueError as e:
+                    await manager.send_message(websocket, {"error": f"Frame binario inválido: {e}"})
+                    continue
+                
+                session.frame_ingest.submit(jpeg_data, source, sequence, is_droppable_frame(session, source))
+                continue
+            
+            message = json.loads(raw_message["text"])
             
             if message.get("type") == "frame":
-                # Procesar frame recibido
-                base64_data = message.get("data", "")
-                settings = message.get("settings", {})
+                # Frame en base64 dentro de JSON (clientes antiguos)
+                settings = message.get("settings")
+                if settings is not None:
+                    try:
+                        session.update_settings(settings)
+                    except ValueError as e:
+                        await manager.send_message(websocket, {"error": str(e)})
                 source = message.get("source", "camera")  # Default: camera
+                # "sequence" opcional: se devuelve en la respuesta igual que en el protocolo binario
+                session.frame_ingest.submit(message.get("data", ""), source, message.get("sequence"),
+                                            droppable=is_droppable_frame(session, source))
                 
-                if source == "upload":
-                    # Solo procesar video upload si no hay cámara activa
-                    if not is_processing_video_upload:
-                        # Iniciar modo video upload
-                        is_processing_video_upload = True
-                        print("🎬 VIDEO UPLOAD: Iniciando procesamiento de video - Pausando cámara")
-                    
-                    # Procesamiento directo para video upload (sin countdown/grabación)
-                    result = await process_video_upload_frame(base64_data, settings)
-                else:
-                    # Solo procesar cámara si no hay video upload activo
-                    if is_processing_video_upload:
-                        # Rechazar frames de cámara durante video upload
-                        result = {
-                            "hands_detected": False,
-                            "status": "📹 Procesando video upload - Cámara pausada temporalmente",
-                            "camera_paused": True,
-                            "source": "camera_blocked",  # Identificar como cámara bloqueada
-                            "timestamp": time.time()
-                        }
-                    else:
-                        # Procesamiento normal para cámara (con countdown/grabación)
-                        result = await process_frame_with_model(base64_data, settings)
+            elif message.get("type") == "settings":
+                # Configuración del cliente usada por los frames binarios
+                try:
+                    session.update_settings(message.get("settings", {}))
+                    await manager.send_message(websocket, {
+                        "type": "recognition_mode",
+                        "mode": session.recognition_mode
+                    })
+                except ValueError as e:
+                    # Cualquier campo inválido (modo, predictionCount): la configuración anterior se mantiene
+                    await manager.send_message(websocket, {"type": "settings", "error": str(e)})
                 
-                # Enviar respuesta
-                await manager.send_message(websocket, result)
+            elif message.get("type") == "annotation_mode":
+                # Activar/desactivar overlays de landmarks para esta sesión
+                try:
+                    session.keypoint_extractor.set_annotation_mode(message.get("mode", "off"))
+                    await manager.send_message(websocket, {
+                        "type": "annotation_mode",
+                        "mode": session.keypoint_extractor.annotation_mode
+                    })
+                except ValueError as e:
+                    await manager.send_message(websocket, {"type": "annotation_mode", "error": str(e)})
+                
+            elif message.get("type") == "request_overlay":
+                # Overlay bajo demanda: se dibuja a partir del último frame procesado
+                if session.keypoint_extractor.annotation_mode == "off":
+                    await manager.send_message(websocket, {
+                        "type": "overlay",
+                        "error": "Anotaciones desactivadas - envía annotation_mode primero"
+                    })
+                else:
+                    # En el worker de la sesión: el overlay usa el buffer del último frame
+                    # procesado, que el siguiente frame sobrescribe
+                    session.frame_ingest.submit_job(lambda: send_overlay(session))
                 
             elif message.get("type") == "ping":
                 # Responder ping para mantener conexión
@@ -540,14 +943,10 @@ async def websocket_endpoint(websocket: WebSocket):
             elif message.get("type") == "reset_video_upload":
                 # Reset del procesador de video upload
                 video_upload_processor.reset()
-                is_processing_video_upload = True  # Activar modo video upload
+                session.is_processing_video_upload = True  # Activar modo video upload
                 
-                # Cancelar timeout anterior si existe
-                if video_upload_timeout_task and not video_upload_timeout_task.done():
-                    video_upload_timeout_task.cancel()
-                
-                # Iniciar nuevo timeout de seguridad
-                video_upload_timeout_task = asyncio.create_task(reset_video_upload_after_timeout())
+                # Iniciar nuevo timeout de seguridad (cancela el anterior si existe)
+                session.start_video_upload_timeout(reset_video_upload_after_timeout(session))
                 
                 print("🔄 VIDEO UPLOAD: Procesador reseteado para nuevo video - Pausando cámara")
                 await manager.send_message(websocket, {
@@ -557,11 +956,13 @@ async def websocket_endpoint(websocket: WebSocket):
                 
             elif message.get("type") == "video_upload_finished":
                 # Procesar video upload final si tiene frames suficientes
+                # (después de los frames del video que aún estén en cola)
+                await session.frame_ingest.drain()
                 total_frames = message.get("total_frames", 50)
-                print(f"🎬 VIDEO UPLOAD: Recibido mensaje de finalización - {len(video_upload_processor.keypoints_buffer)} frames válidos de {total_frames} total")
+                print(f"🎬 VIDEO UPLOAD: Recibido mensaje de finalización - {video_upload_processor.frames_with_hands} frames válidos de {total_frames} total")
                 
                 if video_upload_processor.should_process_final(total_frames):
-                    print(f"🎯 VIDEO UPLOAD: Finalizando con {len(video_upload_processor.keypoints_buffer)} frames válidos")
+                    print(f"🎯 VIDEO UPLOAD: Finalizando con {video_upload_processor.frames_with_hands} frames válidos")
                     
                     keypoints_sequence = video_upload_processor.get_keypoints_sequence()
                     if keypoints_sequence is not None:
@@ -582,21 +983,18 @@ async def websocket_endpoint(websocket: WebSocket):
                             "source": "upload",
                             "error": "No se pudieron obtener suficientes keypoints válidos del video"
                         })
-                elif len(video_upload_processor.keypoints_buffer) < 30:
+                elif video_upload_processor.frames_with_hands < 30:
                     await manager.send_message(websocket, {
                         "source": "upload",
-                        "error": f"Video con muy pocas detecciones de manos: {len(video_upload_processor.keypoints_buffer)}/30 frames mínimos requeridos"
+                        "error": f"Video con muy pocas detecciones de manos: {video_upload_processor.frames_with_hands}/30 frames mínimos requeridos"
                     })
                 else:
                     # Ya se procesó durante la extracción
                     print("🎯 VIDEO UPLOAD: Ya procesado durante extracción")
                 
                 # IMPORTANTE: Restaurar funcionalidad de cámara al finalizar video upload
-                is_processing_video_upload = False
-                
-                # Cancelar timeout de seguridad
-                if video_upload_timeout_task and not video_upload_timeout_task.done():
-                    video_upload_timeout_task.cancel()
+                # (también cancela el timeout de seguridad)
+                session.finish_video_upload()
                 
                 print("📷 CÁMARA: Restaurada funcionalidad - Video upload completado")
                 
@@ -607,19 +1005,14 @@ async def websocket_endpoint(websocket: WebSocket):
                 })
                 
     except WebSocketDisconnect:
-        # Restaurar estado al desconectar
-        is_processing_video_upload = False
-        if video_upload_timeout_task and not video_upload_timeout_task.done():
-            video_upload_timeout_task.cancel()
         manager.disconnect(websocket)
         logger.info("Cliente WebSocket desconectado")
     except Exception as e:
-        # Restaurar estado en caso de error
-        is_processing_video_upload = False
-        if video_upload_timeout_task and not video_upload_timeout_task.done():
-            video_upload_timeout_task.cancel()
         logger.error(f"Error en WebSocket: {e}")
         manager.disconnect(websocket)
+    finally:
+        # Cancelar tareas de la sesión y liberar su grafo de MediaPipe
+        await session_registry.remove(session.session_id)
 
 if __name__ == "__main__":
     logger.info("🚀 Iniciando servidor LSP-AYNI...")
@@ -0,0 +1,226 @@
+import bisect
+import math
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Buckets de latencia por frame (ms): decodificación, MediaPipe, envío por WebSocket
+FRAME_LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 20, 35, 50, 75, 100, 200, 500)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+class Histogram:
+    """
+    Histograma acumulativo de buckets fijos (thread-safe)
+
+    Guarda conteos por bucket, suma y extremos; los percentiles se estiman
+    con el límite superior del bucket que los contiene.
+    """
+
+    def __init__(self, name: str, buckets: Sequence[float], description: str = ""):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # Un contador por bucket más el bucket +Inf
+            self._counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+            self.min = None
+            self.max = None
+
+    def observe(self, value: float):
+        """Registra una observación"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def _percentile(self, counts, fraction: float) -> float:
+        target = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            cumulative += bucket_count
+            if cumulative >= target and bucket_count:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado del histograma serializable a JSON"""
+        with self._lock:
+            counts = list(self._counts)
+            if not self.count:
+                return {"count": 0, "sum": 0.0, "mean": 0.0, "min": None, "max": None,
+                        "p50": 0.0, "p95": 0.0, "p99": 0.0, "buckets": {}}
+
+            bucket_labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+            cumulative = 0
+            buckets = {}
+            for label, bucket_count in zip(bucket_labels, counts):
+                cumulative += bucket_count
+                buckets[label] = cumulative
+
+            return {
+                "count": self.count,
+                "sum": round(self.sum, 4),
+                "mean": round(self.sum / self.count, 4),
+                "min": self.min,
+                "max": self.max,
+                "p50": self._percentile(counts, 0.50),
+                "p95": self._percentile(counts, 0.95),
+                "p99": self._percentile(counts, 0.99),
+                "buckets": buckets  # Conteos acumulados (le)
+            }
+
+    def prometheus_lines(self, name: str) -> List[str]:
+        """Exposición en formato de texto de Prometheus (buckets acumulados le, _sum y _count)"""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self.sum, self.count
+        lines = [f"# HELP {name} {self.description or self.name}", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, bucket_count in zip(list(self.buckets) + [math.inf], counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{name}_sum {_format_value(total)}")
+        lines.append(f"{name}_count {count}")
+        return lines
+
+
+class Counter:
+    """
+    Contador monótono, opcionalmente con etiquetas (thread-safe)
+
+    Cada combinación de valores de etiquetas es una serie distinta.
+    """
+
+    def __init__(self, name: str, description: str = "", labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Valor de una serie; sin etiquetas, la suma de todas"""
+        with self._lock:
+            if not labels:
+                return sum(self._values.values())
+            return self._values.get(tuple(str(labels.get(label, "")) for label in self.labelnames), 0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {",".join(key) or "total": value for key, value in self._values.items()}
+
+    def prometheus_lines(self, name: str) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = [f"# HELP {name} {self.description or self.name}", f"# TYPE {name} counter"]
+        if not values and not self.labelnames:
+            values = {(): 0}
+        for key, value in sorted(values.items()):
+            lines.append(f"{name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """Valor instantáneo leído de una función al exportar (sesiones activas, colas, ratios)"""
+
+    def __init__(self, name: str, func: Callable[[], Optional[float]], description: str = ""):
+        self.name = name
+        self.description = description
+        self.func = func
+
+    def prometheus_lines(self, name: str) -> List[str]:
+        value = self.func()
+        lines = [f"# HELP {name} {self.description or self.name}", f"# TYPE {name} gauge"]
+        if value is not None:
+            lines.append(f"{name} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Métricas del proceso exportadas por /metrics
+
+    `counter()` e `histogram()` devuelven la métrica existente si el nombre ya
+    está registrado, así varios módulos pueden compartir una (p. ej. errors_total).
+    `register()` agrega instancias propias de un componente (el histograma de
+    forward del modelo); si el nombre existe, la nueva reemplaza a la anterior.
+    """
+
+    def __init__(self, prefix: str = "lsp_"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+
+    def _get_or_create(self, name: str, factory: Callable[[], Any]):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def counter(self, name: str, description: str = "", labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, description, labelnames))
+
+    def histogram(self, name: str, buckets: Sequence[float] = FRAME_LATENCY_BUCKETS_MS,
+                  description: str = "") -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, buckets, description))
+
+    def gauge(self, name: str, func: Callable[[], Optional[float]], description: str = "") -> Gauge:
+        gauge = Gauge(name, func, description)
+        self.register(gauge)
+        return gauge
+
+    def register(self, metric, name: Optional[str] = None):
+        with self._lock:
+            self._metrics[name or metric.name] = metric
+        return metric
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus (text/plain; version=0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines: List[str] = []
+        for name, metric in metrics:
+            lines.extend(metric.prometheus_lines(self.prefix + name))
+        return "\n".join(lines) + "\n"
+
+
+# Registro global del proceso
+REGISTRY = MetricsRegistry()
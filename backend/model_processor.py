@@ -1,10 +1,69 @@
 import numpy as np
 import pickle
-import tensorflow as tf
 from pathlib import Path
-from sklearn.preprocessing import LabelEncoder
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, List
 import logging
+import time
+
+from metrics import Histogram, REGISTRY
+from inference_backends import create_backend
+from motion_gate import sequence_motion_energy
+from prediction_cache import PredictionCache
+
+PREDICT_MS = REGISTRY.histogram("predict_ms", [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000],
+                                "SignLanguageModel.predict_batch (preprocesamiento + forward + resultados) en ms")
+PREDICTIONS = REGISTRY.counter("predictions_total", "Predicciones completadas")
+ERRORS = REGISTRY.counter("errors_total", "Errores por etapa", ("stage",))
+
+class SequenceResampler:
+    """
+    Remuestreo lineal vectorizado de secuencias de keypoints en el eje temporal
+    
+    Equivalente a aplicar np.interp a cada keypoint/coordenada, pero con tablas de
+    índices y pesos precalculadas por par (frames origen, frames destino) y en float32.
+    Acepta una dimensión de batch: (frames, kp, coords) o (batch, frames, kp, coords).
+    """
+    
+    def __init__(self):
+        self._tables: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+    
+    def _get_table(self, source_frames: int, target_frames: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Índices de los frames vecinos y peso del segundo para cada frame destino"""
+        key = (source_frames, target_frames)
+        table = self._tables.get(key)
+        if table is None:
+            positions = np.linspace(0, source_frames - 1, target_frames)
+            lower = np.floor(positions).astype(np.intp)
+            upper = np.minimum(lower + 1, source_frames - 1)
+            weights = (positions - lower).astype(np.float32).reshape(target_frames, 1, 1)
+            table = (lower, upper, weights)
+            self._tables[key] = table
+        return table
+    
+    def resample(self, keypoints: np.ndarray, target_frames: int) -> np.ndarray:
+        """
+        Args:
+            keypoints: Array (frames, kp, coords) o (batch, frames, kp, coords)
+            target_frames: Número de frames de salida
+            
+        Returns:
+            Array float32 con target_frames en el eje temporal
+        """
+        keypoints = np.asarray(keypoints, dtype=np.float32)
+        source_frames = keypoints.shape[-3]
+        if source_frames == target_frames:
+            return keypoints
+        
+        lower, upper, weights = self._get_table(source_frames, target_frames)
+        start = np.take(keypoints, lower, axis=-3)
+        end = np.take(keypoints, upper, axis=-3)
+        
+        # start + (end - start) * w, reutilizando los buffers temporales
+        np.subtract(end, start, out=end)
+        np.multiply(end, weights, out=end)
+        np.add(start, end, out=start)
+        return start
+
 
 class ModelPreprocessor:
     """
@@ -14,6 +73,7 @@ class ModelPreprocessor:
     
     def __init__(self, target_frames: int = 50):
         self.target_frames = target_frames
+        self.resampler = SequenceResampler()
         self.logger = logging.getLogger(__name__)
         
     def normalize_sequence_length(self, keypoints: np.ndarray, target_frames: int = None) -> np.ndarray:
@@ -22,34 +82,17 @@ class ModelPreprocessor:
         
         Args:
             keypoints: Array de keypoints de forma (frames, keypoints, coords)
+                       o (batch, frames, keypoints, coords)
             target_frames: Número objetivo de frames (default: self.target_frames)
             
         Returns:
-            Array normalizado de forma (target_frames, keypoints, coords)
+            Array float32 normalizado de forma (target_frames, keypoints, coords)
+            (con la dimensión de batch delante si la entrada la tenía)
         """
         if target_frames is None:
             target_frames = self.target_frames
-            
-        current_frames = keypoints.shape[0]
-        
-        if current_frames == target_frames:
-            return keypoints
         
-        # Interpolación lineal para cada keypoint y coordenada
-        old_indices = np.linspace(0, current_frames - 1, current_frames)
-        new_indices = np.linspace(0, current_frames - 1, target_frames)
-        
-        normalized = np.zeros((target_frames, keypoints.shape[1], keypoints.shape[2]))
-        
-        for kp in range(keypoints.shape[1]):
-            for coord in range(keypoints.shape[2]):
-                normalized[:, kp, coord] = np.interp(
-                    new_indices, 
-                    old_indices, 
-                    keypoints[:, kp, coord]
-                )
-        
-        return normalized
+        return self.resampler.resample(keypoints, target_frames)
     
     def normalize_keypoints(self, keypoints: np.ndarray) -> np.ndarray:
         """
@@ -169,6 +212,12 @@ class ModelPreprocessor:
                 'min': float(np.min(frame_variance)),
                 'max': float(np.max(frame_variance))
             }
+            # Desplazamiento medio por frame (la métrica que usa MotionGate en el stream)
+            motion_energy = sequence_motion_energy(keypoints)
+            quality_metrics['motion_energy'] = {
+                'mean': float(np.mean(motion_energy)),
+                'max': float(np.max(motion_energy))
+            }
         
         # Verificar si las coordenadas están en rango esperado (0-1 para MediaPipe)
         in_range = np.all((keypoints >= 0) & (keypoints <= 1))
@@ -182,7 +231,10 @@ class SignLanguageModel:
     Wrapper para el modelo de reconocimiento de señas PUCP-GLOSAS
     """
     
-    def __init__(self, model_path: str, encoder_path: str, info_path: str):
+    def __init__(self, model_path: str, encoder_path: str, info_path: str,
+                 backend: str = "keras", jit_compile: bool = False,
+                 warmup_batch_sizes: Tuple[int, ...] = (1,), result_mode: str = "full",
+                 prediction_cache: Optional[PredictionCache] = None):
         self.model_path = Path(model_path)
         self.encoder_path = Path(encoder_path)
         self.info_path = Path(info_path)
@@ -192,6 +244,26 @@ class SignLanguageModel:
         self.model_info = None
         self.preprocessor = ModelPreprocessor()
         
+        # "full": incluye raw_probabilities y processing_info en cada resultado
+        # "lean": solo el top-k (las extras se piden por llamada)
+        if result_mode not in ("full", "lean"):
+            raise ValueError(f"result_mode inválido: {result_mode}")
+        self.result_mode = result_mode
+        self._class_names: Optional[np.ndarray] = None
+        
+        # Backend de inferencia ("keras" | "tflite"), ver inference_backends.py
+        self.backend = backend
+        self.jit_compile = jit_compile
+        self.warmup_batch_sizes = tuple(sorted(set(warmup_batch_sizes)))
+        self.warmup_times_ms: Dict[int, Dict[str, float]] = {}
+        self.forward_latency = Histogram(
+            "model_forward_ms", [1, 2, 5, 10, 20, 50, 100, 200, 500],
+            "Latencia del forward pass del modelo (ms)"
+        )
+        
+        # Probabilidades por entrada preprocesada cuantizada (None = sin caché)
+        self.prediction_cache = prediction_cache
+        
         self.logger = logging.getLogger(__name__)
         
     def load_model_components(self) -> bool:
@@ -202,9 +274,11 @@ class SignLanguageModel:
             True si se cargó exitosamente
         """
         try:
-            # Cargar modelo
-            self.logger.info(f"Cargando modelo desde: {self.model_path}")
-            self.model = tf.keras.models.load_model(self.model_path)
+            # Cargar modelo con el backend configurado
+            self.logger.info(f"Cargando modelo ({self.backend}) desde: {self.model_path}")
+            model = create_backend(self.backend, str(self.model_path), jit_compile=self.jit_compile)
+            model.load()
+            self.model = model
             self.logger.info("✅ Modelo cargado exitosamente")
             
             # Cargar label encoder
@@ -213,12 +287,19 @@ class SignLanguageModel:
                 self.label_encoder = pickle.load(f)
             self.logger.info("✅ Label encoder cargado exitosamente")
             
+            # Nombres de clase como str de Python, indexables con el top-k de cada fila
+            self._class_names = np.array([str(name) for name in self.label_encoder.classes_], dtype=object)
+            
             # Cargar información del modelo
             self.logger.info(f"Cargando info del modelo desde: {self.info_path}")
             with open(self.info_path, 'rb') as f:
                 self.model_info = pickle.load(f)
             self.logger.info("✅ Info del modelo cargada exitosamente")
             
+            # La caché se invalida sola si cambian los archivos del modelo o del encoder
+            if self.prediction_cache is not None:
+                self.prediction_cache.bind([self.model_path, self.encoder_path])
+            
             # Verificar consistencia
             if self.model_info:
                 expected_classes = self.model_info.get('num_classes', 0)
@@ -230,83 +311,237 @@ class SignLanguageModel:
                         f"esperado {expected_classes}, encontrado {actual_classes}"
                     )
             
+            # Calentar el camino de inferencia antes del primer request
+            self.warmup()
+            
             return True
             
         except Exception as e:
             self.logger.error(f"Error cargando componentes del modelo: {e}")
             return False
     
-    def predict(self, keypoints: np.ndarray, top_k: int = 5) -> Optional[Dict[str, Any]]:
+    def predict(self, keypoints: np.ndarray, top_k: int = 5,
+                include_probabilities: Optional[bool] = None,
+                include_debug: Optional[bool] = None) -> Optional[Dict[str, Any]]:
         """
         Realiza predicción sobre keypoints
         
         Args:
             keypoints: Array de keypoints raw (frames, 42, 2)
             top_k: Número de predicciones top a retornar
+            include_probabilities: Añadir raw_probabilities (default: según result_mode)
+            include_debug: Añadir processing_info (default: según result_mode)
             
         Returns:
             Diccionario con resultados de predicción o None si hay error
         """
+        return self.predict_batch([keypoints], [top_k], include_probabilities, include_debug)[0]
+    
+    def predict_batch(self, keypoints_list: List[np.ndarray], top_k_list: Optional[List[int]] = None,
+                      include_probabilities: Optional[bool] = None,
+                      include_debug: Optional[bool] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Realiza predicciones de varias secuencias en un solo forward pass
+        
+        Args:
+            keypoints_list: Lista de arrays de keypoints raw (frames, 42, 2)
+            top_k_list: Número de predicciones top por secuencia (default: 5)
+            include_probabilities: Añadir raw_probabilities (default: según result_mode)
+            include_debug: Añadir processing_info (default: según result_mode)
+            
+        Returns:
+            Lista con un diccionario de resultados (o None si hubo error) por secuencia
+        """
+        if top_k_list is None:
+            top_k_list = [5] * len(keypoints_list)
+        full_mode = self.result_mode == "full"
+        if include_probabilities is None:
+            include_probabilities = full_mode
+        if include_debug is None:
+            include_debug = full_mode
+        results: List[Optional[Dict[str, Any]]] = [None] * len(keypoints_list)
+        start = time.perf_counter()
+        
         try:
             if self.model is None or self.label_encoder is None:
                 self.logger.error("Modelo no cargado. Llama load_model_components() primero")
-                return None
-            
-            # Preprocesar datos
-            processed_data = self.preprocessor.preprocess_sequence(keypoints)
-            if processed_data is None:
-                self.logger.error("Error en preprocesamiento de datos")
-                return None
+                return results
+            
+            # Preprocesar cada secuencia; las inválidas no entran al batch
+            processed = []
+            valid_indices = []
+            for i, keypoints in enumerate(keypoints_list):
+                processed_data = self.preprocessor.preprocess_sequence(keypoints)
+                if processed_data is None:
+                    self.logger.error(f"Error en preprocesamiento de datos (secuencia {i})")
+                    ERRORS.inc(stage="preprocess")
+                    continue
+                processed.append(processed_data[0])
+                valid_indices.append(i)
+            
+            if not processed:
+                return results
+            
+            batch = np.stack(processed).astype(np.float32, copy=False)
+            self.logger.info(f"Realizando predicción sobre batch de forma: {batch.shape}")
+            
+            # Un solo forward pass para las secuencias que no están en la caché
+            predictions = self._predict_probabilities(batch)
+            
+            built = self._build_results(
+                predictions,
+                [top_k_list[i] for i in valid_indices],
+                include_probabilities=include_probabilities,
+                input_shapes=[keypoints_list[i].shape for i in valid_indices] if include_debug else None,
+                processed_shape=(1,) + batch.shape[1:]
+            )
+            for i, result in zip(valid_indices, built):
+                results[i] = result
+            PREDICTIONS.inc(len(built))
+            PREDICT_MS.observe((time.perf_counter() - start) * 1000)
             
-            self.logger.info(f"Realizando predicción sobre datos de forma: {processed_data.shape}")
+            return results
             
-            # Realizar predicción
-            predictions = self.model.predict(processed_data, verbose=0)
+        except Exception as e:
+            self.logger.error(f"Error en predicción: {e}")
+            ERRORS.inc(stage="predict")
+            return [None] * len(keypoints_list)
+    
+    def _predict_probabilities(self, batch: np.ndarray) -> np.ndarray:
+        """Probabilidades del batch preprocesado, consultando la caché de predicciones"""
+        if self.prediction_cache is None:
+            return self._forward(batch)
+        
+        keys = [self.prediction_cache.key_for(row) for row in batch]
+        probabilities = [self.prediction_cache.get(key) for key in keys]
+        missing = [i for i, row in enumerate(probabilities) if row is None]
+        if missing:
+            for i, row in zip(missing, self._forward(batch[missing])):
+                self.prediction_cache.put(keys[i], row)
+                probabilities[i] = row
+        return np.stack(probabilities)
+    
+    def _padded_batch_size(self, batch_size: int) -> int:
+        """
+        Con formas estáticas (XLA) cada tamaño de batch es una compilación distinta:
+        se rellena al tamaño calentado más cercano
+        """
+        if not self.model.static_batch_shapes:
+            return batch_size
+        for size in self.warmup_batch_sizes:
+            if size >= batch_size:
+                return size
+        return batch_size
+    
+    def _forward(self, batch: np.ndarray) -> np.ndarray:
+        """Forward pass del batch (B, 50, 42, 2) por el backend"""
+        start = time.perf_counter()
+        
+        batch_size = batch.shape[0]
+        padded_size = self._padded_batch_size(batch_size)
+        if padded_size != batch_size:
+            padding = np.zeros((padded_size - batch_size,) + batch.shape[1:], dtype=np.float32)
+            batch = np.concatenate([batch, padding])
+        predictions = self.model.forward(batch)[:batch_size]
+        
+        self.forward_latency.observe((time.perf_counter() - start) * 1000)
+        return predictions
+    
+    def warmup(self):
+        """
+        Ejecuta batches dummy por el backend (tracing/compilación XLA o intérpretes TFLite)
+        
+        Registra el tiempo de la primera llamada (incluye tracing) y el de una llamada
+        ya caliente para cada tamaño de batch en warmup_times_ms.
+        """
+        input_shape = tuple(self.model.input_shape[1:])
+        for batch_size in self.warmup_batch_sizes:
+            dummy = np.zeros((batch_size,) + input_shape, dtype=np.float32)
             
-            # Obtener probabilidades y clases
-            probabilities = predictions[0]  # Remover dimensión de batch
+            start = time.perf_counter()
+            self.model.forward(dummy)
+            first_call = (time.perf_counter() - start) * 1000
             
-            # Obtener top K predicciones
-            top_indices = np.argsort(probabilities)[-top_k:][::-1]
+            start = time.perf_counter()
+            self.model.forward(dummy)
+            warm_call = (time.perf_counter() - start) * 1000
             
-            results = {
-                'predictions': [],
-                'main_prediction': None,
-                'confidence': 0.0,
-                'raw_probabilities': probabilities.tolist(),
-                'processing_info': {
-                    'input_shape': keypoints.shape,
-                    'processed_shape': processed_data.shape,
-                    'model_input_shape': self.model.input_shape if self.model else None
-                }
+            self.warmup_times_ms[batch_size] = {
+                "first_call_ms": round(first_call, 2),
+                "warm_call_ms": round(warm_call, 2)
+            }
+            self.logger.info(f"🔥 Warmup batch={batch_size}: primera llamada {first_call:.1f}ms, caliente {warm_call:.1f}ms")
+    
+    def get_inference_stats(self) -> Dict[str, Any]:
+        """Estado del camino de inferencia y latencia por forward pass"""
+        return {
+            "backend": self.backend,
+            "jit_compile": self.jit_compile if self.backend == "keras" else None,
+            "warmup_ms": {str(size): times for size, times in self.warmup_times_ms.items()},
+            "forward_latency_ms": self.forward_latency.snapshot(),
+            "prediction_cache": self.prediction_cache.get_stats() if self.prediction_cache else None
+        }
+    
+    def _build_results(self, probabilities: np.ndarray, top_k_list: List[int],
+                       include_probabilities: bool = False,
+                       input_shapes: Optional[List[tuple]] = None,
+                       processed_shape: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """
+        Arma los diccionarios de resultados a partir de las probabilidades del batch
+        
+        El top-k se selecciona con argpartition (O(clases)) para todas las filas a la vez
+        y solo esos k candidatos se ordenan.
+        
+        Args:
+            probabilities: Array (batch, clases)
+            top_k_list: Número de predicciones top por fila
+            include_probabilities: Añadir el vector completo como lista (raw_probabilities)
+            input_shapes: Formas de entrada por fila; si se pasan se añade processing_info
+            processed_shape: Forma de la entrada preprocesada (para processing_info)
+        """
+        num_classes = probabilities.shape[1]
+        # k fuera de rango (0, negativo o mayor que el vocabulario) se acota por fila:
+        # un valor inválido de un cliente no debe romper las filas de otras sesiones del batch
+        top_k_list = [min(max(int(top_k), 1), num_classes) for top_k in top_k_list]
+        k_max = max(top_k_list)
+        
+        if k_max < num_classes:
+            candidates = np.argpartition(probabilities, num_classes - k_max, axis=1)[:, num_classes - k_max:]
+        else:
+            candidates = np.broadcast_to(np.arange(num_classes), probabilities.shape)
+        candidate_probabilities = np.take_along_axis(probabilities, candidates, axis=1)
+        order = np.argsort(-candidate_probabilities, axis=1, kind="stable")
+        top_indices = np.take_along_axis(candidates, order, axis=1)
+        top_confidences = np.take_along_axis(candidate_probabilities, order, axis=1)
+        
+        results = []
+        for row, k in enumerate(top_k_list):
+            indices = top_indices[row, :k].tolist()
+            confidences = top_confidences[row, :k].tolist()
+            labels = self._class_names[indices].tolist()
+            
+            result = {
+                'predictions': [
+                    {'rank': rank + 1, 'label': label, 'confidence': confidence, 'class_index': idx}
+                    for rank, (label, confidence, idx) in enumerate(zip(labels, confidences, indices))
+                ],
+                'main_prediction': labels[0] if labels else None,
+                'confidence': confidences[0] if confidences else 0.0
             }
             
-            # Procesar predicciones top-k
-            for i, idx in enumerate(top_indices):
-                class_name = self.label_encoder.classes_[idx]
-                confidence = float(probabilities[idx])
-                
-                prediction = {
-                    'rank': i + 1,
-                    'label': class_name,
-                    'confidence': confidence,
-                    'class_index': int(idx)
+            if include_probabilities:
+                result['raw_probabilities'] = probabilities[row].tolist()
+            if input_shapes is not None:
+                result['processing_info'] = {
+                    'input_shape': input_shapes[row],
+                    'processed_shape': processed_shape,
+                    'model_input_shape': self.model.input_shape if self.model else None
                 }
-                
-                results['predictions'].append(prediction)
-                
-                # La primera es la predicción principal
-                if i == 0:
-                    results['main_prediction'] = class_name
-                    results['confidence'] = confidence
-            
-            self.logger.info(f"Predicción exitosa: {results['main_prediction']} ({results['confidence']:.3f})")
-            
-            return results
             
-        except Exception as e:
-            self.logger.error(f"Error en predicción: {e}")
-            return None
+            self.logger.info(f"Predicción exitosa: {result['main_prediction']} ({result['confidence']:.3f})")
+            results.append(result)
+        
+        return results
     
     def get_model_info(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,154 @@
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config import MOTION_GATE_CONFIG
+from metrics import REGISTRY
+
+# Totales del proceso (no bajan al desconectarse una sesión); los de cada gate quedan en get_stats()
+GATE_WINDOWS = REGISTRY.counter("motion_gate_windows_total",
+                                "Ventanas del reconocimiento continuo por decisión del gate", ("decision",))
+
+
+def frame_motion_energy(current: np.ndarray, previous: np.ndarray) -> float:
+    """Desplazamiento medio de los keypoints entre dos frames (coordenadas normalizadas)"""
+    return float(np.abs(current - previous).mean())
+
+
+def sequence_motion_energy(keypoints: np.ndarray) -> np.ndarray:
+    """Energía de movimiento por frame de una secuencia (frames, 42, 2) -> (frames - 1,)"""
+    if keypoints.shape[0] < 2:
+        return np.zeros(0, dtype=np.float32)
+    return np.abs(np.diff(keypoints, axis=0)).mean(axis=(1, 2))
+
+
+class MotionGate:
+    """
+    Detector de movimiento y presencia de manos sobre el stream de keypoints
+
+    Cada frame recibe una energía de movimiento (desplazamiento medio respecto
+    del frame con manos anterior). Con histéresis se segmentan intervalos
+    candidatos a seña: empiezan cuando la energía supera `start_threshold`
+    durante `onset_frames` frames y terminan tras `release_frames` frames por
+    debajo de `stop_threshold` (o sin manos). Las ventanas sin frames activos
+    no se envían al modelo.
+    """
+
+    def __init__(self, window_frames: int, config: Optional[Dict[str, Any]] = None):
+        config = {**MOTION_GATE_CONFIG, **(config or {})}
+        self.enabled = config["enabled"]
+        self.start_threshold = config["start_threshold"]
+        self.stop_threshold = config["stop_threshold"]
+        self.onset_frames = config["onset_frames"]
+        self.release_frames = config["release_frames"]
+        self.min_active_frames = config["min_active_frames"]
+        self.min_window_variance = config["min_window_variance"]
+
+        # Flags de actividad de los últimos `window_frames` frames con suma acumulada (O(1) por frame)
+        self._active_flags = deque(maxlen=window_frames)
+        self.segments = deque(maxlen=config["max_segments"])
+
+        # Métricas
+        self.executed_windows = 0
+        self.gated_windows = 0
+        self.reset()
+
+    def reset(self):
+        """Descarta el estado de segmentación (los contadores se conservan)"""
+        self._active_flags.clear()
+        self._active_in_window = 0
+        self._previous: Optional[np.ndarray] = None
+        self._frame_index = 0
+        self._above_streak = 0
+        self._below_streak = 0
+        self.active = False
+        self.segment_start: Optional[int] = None
+        self.segment_ended = False
+        self.last_energy = 0.0
+
+    def update(self, keypoints: Optional[np.ndarray]) -> bool:
+        """
+        Puntúa un frame y actualiza el segmento en curso
+
+        Args:
+            keypoints: Array (42, 2) o None si el frame no tiene manos
+
+        Returns:
+            True si el frame pertenece a un intervalo candidato
+        """
+        self.segment_ended = False
+
+        if keypoints is None:
+            energy = 0.0
+            self._previous = None
+        elif self._previous is None:
+            # Aparición de las manos: no hay desplazamiento que medir todavía
+            energy = 0.0
+            self._previous = keypoints.copy()
+        else:
+            energy = frame_motion_energy(keypoints, self._previous)
+            self._previous[...] = keypoints
+        self.last_energy = energy
+
+        if not self.active:
+            self._above_streak = self._above_streak + 1 if energy >= self.start_threshold else 0
+            if self._above_streak >= self.onset_frames:
+                self.active = True
+                self._below_streak = 0
+                self.segment_start = self._frame_index - self.onset_frames + 1
+        else:
+            still = keypoints is None or energy < self.stop_threshold
+            self._below_streak = self._below_streak + 1 if still else 0
+            if self._below_streak >= self.release_frames:
+                self.active = False
+                self._above_streak = 0
+                self.segment_ended = True
+                self.segments.append((self.segment_start, self._frame_index - self.release_frames))
+                self.segment_start = None
+
+        if len(self._active_flags) == self._active_flags.maxlen:
+            self._active_in_window -= self._active_flags[0]
+        self._active_flags.append(self.active)
+        self._active_in_window += self.active
+        self._frame_index += 1
+        return self.active
+
+    @property
+    def active_frames_in_window(self) -> int:
+        return self._active_in_window
+
+    def window_has_activity(self, window: Optional[np.ndarray] = None) -> bool:
+        """
+        True si la ventana contiene un intervalo candidato
+
+        Con `window` además exige la varianza temporal mínima de los keypoints
+        (la misma métrica `movement_variance` de `ModelPreprocessor.check_data_quality`).
+        """
+        if not self.enabled:
+            return True
+        if self._active_in_window < self.min_active_frames:
+            return False
+        if window is not None and self.min_window_variance > 0:
+            return float(np.var(window, axis=0).mean()) >= self.min_window_variance
+        return True
+
+    def record(self, executed: bool):
+        """Cuenta una ventana ejecutada o descartada por el gate"""
+        if executed:
+            self.executed_windows += 1
+        else:
+            self.gated_windows += 1
+        GATE_WINDOWS.inc(decision="executed" if executed else "gated")
+
+    def get_stats(self) -> Dict[str, Any]:
+        evaluated = self.executed_windows + self.gated_windows
+        return {
+            "enabled": self.enabled,
+            "executed_windows": self.executed_windows,
+            "gated_windows": self.gated_windows,
+            "gated_ratio": round(self.gated_windows / evaluated, 3) if evaluated else 0.0,
+            "active": self.active,
+            "last_energy": round(self.last_energy, 5),
+            "segments": list(self.segments)
+        }
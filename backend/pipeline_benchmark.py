@@ -0,0 +1,638 @@
+"""
+Benchmark de cada etapa del pipeline
+
+Mide por separado cada etapa del camino de un frame y de una predicción, con
+fixtures fijos: frames sintéticos deterministas (1280x720, JPEG calidad 85,
+semilla fija) y, opcionalmente, fixtures grabados (un video o un directorio
+con imágenes y secuencias .npy). Reporta p50/p95/p99 y throughput por etapa y
+escribe un JSON para comparar entre commits.
+
+Uso: python utils.py --bench [--bench-output bench.json] [--bench-fixtures dir|video]
+                             [--bench-compare anterior.json]
+"""
+
+import base64
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from config import FRAME_DECODER_CONFIG, MODEL_CONFIG, get_model_files
+
+BENCH_FORMAT_VERSION = 1
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+# ===== FIXTURES =====
+def synthetic_frames(count: int = 8, width: int = 1280, height: int = 720, seed: int = 0) -> List[bytes]:
+    """Frames JPEG deterministas: gradiente + ruido (comprime de forma parecida a una cámara)"""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    frames = []
+    for _ in range(count):
+        image = (gradient + rng.normal(0, 20, (height, width, 3))).clip(0, 255).astype(np.uint8)
+        frames.append(cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes())
+    return frames
+
+
+def synthetic_clip(path, seconds: float = 2.0, fps: float = 20.0, width: int = 640, height: int = 480,
+                   seed: int = 0) -> Path:
+    """Video mp4 determinista con los frames de synthetic_frames (sin manos)"""
+    path = Path(path)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    try:
+        for frame in synthetic_frames(int(seconds * fps), width, height, seed):
+            writer.write(cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_COLOR))
+    finally:
+        writer.release()
+    return path
+
+
+def synthetic_sequences(count: int = 4, seed: int = 0) -> List[np.ndarray]:
+    """Secuencias de keypoints con la longitud típica de una grabación (56 frames)"""
+    rng = np.random.default_rng(seed)
+    return [rng.random((56, 42, 2)).astype(np.float32) for _ in range(count)]
+
+
+def load_recorded_fixtures(path, max_frames: int = 32) -> Dict[str, list]:
+    """
+    Fixtures grabados: un video (se muestrean hasta max_frames) o un directorio
+    con imágenes (.jpg/.png) y secuencias de keypoints (.npy)
+    """
+    path = Path(path)
+    frames, sequences = [], []
+    if path.is_dir():
+        for item in sorted(path.iterdir()):
+            if item.suffix.lower() in IMAGE_EXTENSIONS:
+                frames.append(item.read_bytes())
+            elif item.suffix.lower() == ".npy":
+                sequences.append(np.load(item).astype(np.float32))
+    else:
+        from video_processing import probe_video, sample_frame_indices, iter_sampled_frames
+        info = probe_video(path)
+        indices = sample_frame_indices(info["frame_count"], info["fps"], min(max_frames, info["frame_count"]))
+        for _, frame in iter_sampled_frames(path, indices):
+            frames.append(cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes())
+    return {"frames": frames[:max_frames], "sequences": sequences}
+
+
+# ===== MEDICIÓN =====
+def time_stage(func: Callable, inputs: Sequence, iterations: int, warmup: int = 3) -> np.ndarray:
+    """Latencias (ms) de func sobre los inputs en ronda; las primeras `warmup` llamadas no se miden"""
+    for i in range(warmup):
+        func(inputs[i % len(inputs)])
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        item = inputs[i % len(inputs)]
+        start = time.perf_counter()
+        func(item)
+        latencies[i] = (time.perf_counter() - start) * 1000
+    return latencies
+
+
+def summarize(latencies: np.ndarray) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    mean = float(latencies.mean())
+    return {
+        "n": int(latencies.size),
+        "mean_ms": round(mean, 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "min_ms": round(float(latencies.min()), 4),
+        "max_ms": round(float(latencies.max()), 4),
+        "throughput_per_s": round(1000 / mean, 1) if mean > 0 else None
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _environment() -> Dict[str, Any]:
+    import mediapipe as mp
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "mediapipe": mp.__version__,
+        "frame_decoder": FRAME_DECODER_CONFIG["decoder"],
+        "model_backend": MODEL_CONFIG["backend"]
+    }
+
+
+# ===== ETAPAS =====
+def _frame_stages(extractor, frames: List[bytes]) -> Dict[str, tuple]:
+    """Etapas del camino de un frame: (función, inputs) por nombre"""
+    encoded = [base64.b64encode(frame).decode("ascii") for frame in frames]
+    decoded = [extractor._decode_frame(frame) for frame in frames]
+    rgb_frames = [cv2.cvtColor(extractor._resize_frame_optimized(frame), cv2.COLOR_BGR2RGB) for frame in decoded]
+
+    # _extract_keypoints necesita manos: resultados reales de los fixtures si los hay, si no sintéticos
+    hand_results = [results for results in map(extractor.hands.process, rgb_frames)
+                    if results.multi_hand_landmarks and len(results.multi_hand_landmarks) == 2]
+    if not hand_results:
+        hand_results = [synthetic_hand_results()]
+
+    return {
+        "base64_decode": (base64.b64decode, encoded),
+        "jpeg_decode": (extractor._decode_frame, frames),
+        "fused_decode": (extractor._decode_frame_rgb, frames),
+        "resize_frame": (extractor._resize_frame_optimized, decoded),
+        "hands_process": (extractor.hands.process, rgb_frames),
+        "extract_keypoints": (extractor._extract_keypoints, hand_results),
+        "process_base64_frame": (extractor.process_base64_frame, encoded)
+    }
+
+
+def load_bench_model():
+    """SignLanguageModel sin caché de predicciones (se mide el forward real); None si no hay modelo"""
+    from model_processor import SignLanguageModel
+
+    model_files = get_model_files()
+    if not all(path.exists() for path in model_files.values()):
+        return None
+    model = SignLanguageModel(
+        model_path=str(model_files["model_path"]),
+        encoder_path=str(model_files["encoder_path"]),
+        info_path=str(model_files["info_path"]),
+        backend=MODEL_CONFIG["backend"],
+        result_mode="lean"
+    )
+    return model if model.load_model_components() else None
+
+
+def run_benchmark(output_path=None, iterations: int = 200, fixtures_path=None,
+                  model=None, compare_path=None) -> Dict[str, Any]:
+    """
+    Ejecuta todas las etapas sobre cada conjunto de fixtures
+
+    Returns:
+        Reporte {"environment", "fixtures", "results": {fixture: {etapa: estadísticas}}}
+    """
+    from keypoint_extractor import HandKeypointExtractor
+    from model_processor import ModelPreprocessor
+
+    fixture_sets = {"synthetic": {"frames": synthetic_frames(), "sequences": synthetic_sequences()}}
+    if fixtures_path:
+        recorded = load_recorded_fixtures(fixtures_path)
+        recorded["sequences"] = recorded["sequences"] or fixture_sets["synthetic"]["sequences"]
+        fixture_sets["recorded"] = recorded
+
+    if model is None:
+        model = load_bench_model()
+    if model is None:
+        print("⚠️ Modelo no disponible: se omite la etapa predict")
+    preprocessor = ModelPreprocessor()
+
+    report = {
+        "version": BENCH_FORMAT_VERSION,
+        "environment": _environment(),
+        "iterations": iterations,
+        "fixtures": {},
+        "results": {}
+    }
+    for fixture_name, fixtures in fixture_sets.items():
+        frames, sequences = fixtures["frames"], fixtures["sequences"]
+        first = cv2.imdecode(np.frombuffer(frames[0], np.uint8), cv2.IMREAD_COLOR) if frames else None
+        report["fixtures"][fixture_name] = {
+            "frames": len(frames),
+            "frame_size": list(first.shape[1::-1]) if first is not None else None,
+            "sequences": len(sequences)
+        }
+        print(f"\n🧪 Fixtures '{fixture_name}': {len(frames)} frames, {len(sequences)} secuencias")
+
+        results = {}
+        if frames:
+            # Extractor nuevo por conjunto: el tracking de MediaPipe no arrastra estado entre fixtures
+            extractor = HandKeypointExtractor()
+            try:
+                for name, (func, inputs) in _frame_stages(extractor, frames).items():
+                    results[name] = summarize(time_stage(func, inputs, iterations))
+                    _print_stage(name, results[name])
+            finally:
+                extractor.cleanup()
+
+        for name, (func, inputs) in _sequence_stages(preprocessor, model, sequences).items():
+            results[name] = summarize(time_stage(func, inputs, iterations))
+            _print_stage(name, results[name])
+        report["results"][fixture_name] = results
+
+    if output_path:
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Resultados: {output_path}")
+
+    if compare_path:
+        compare_reports(json.loads(Path(compare_path).read_text(encoding="utf-8")), report)
+    return report
+
+
+def _sequence_stages(preprocessor, model, sequences: List[np.ndarray]) -> Dict[str, tuple]:
+    stages = {"preprocess_sequence": (preprocessor.preprocess_sequence, sequences)}
+    if model is not None and sequences:
+        stages["predict"] = (lambda sequence: model.predict(sequence, top_k=3), sequences)
+    return stages
+
+
+def _print_stage(name: str, stats: Dict[str, float]):
+    print(f"   {name:>20}: p50 {stats['p50_ms']:8.3f}ms | p95 {stats['p95_ms']:8.3f}ms | "
+          f"p99 {stats['p99_ms']:8.3f}ms | {stats['throughput_per_s']:>9} /s")
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Variación porcentual de p50 y p95 por etapa respecto de un reporte anterior"""
+    print(f"\n📊 Comparación con {baseline['environment'].get('commit')} "
+          f"({baseline['environment'].get('timestamp')}):")
+    deltas = {}
+    for fixture_name, results in current["results"].items():
+        previous = baseline.get("results", {}).get(fixture_name, {})
+        for name, stats in results.items():
+            if not all(previous.get(name, {}).get(metric) for metric in ("p50_ms", "p95_ms")):
+                continue
+            delta = {
+                metric: round((stats[metric] / previous[name][metric] - 1) * 100, 1)
+                for metric in ("p50_ms", "p95_ms")
+            }
+            deltas[f"{fixture_name}/{name}"] = delta
+            print(f"   {fixture_name}/{name:>20}: p50 {delta['p50_ms']:+6.1f}% | p95 {delta['p95_ms']:+6.1f}%")
+    return deltas
+
+
+# ===== MICRO-BENCHMARKS =====
+# Implementación actual vs. la original de cada etapa optimizada, con datos sintéticos
+# (python utils.py --micro-bench). Las referencias también las usan las pruebas de paridad de utils.py
+def benchmark_frame_decoders(iterations: int = 100) -> Dict[str, Dict[str, float]]:
+    """
+    Compara el decodificador fused con el camino legacy (imdecode + letterbox + BGR→RGB)
+    y con el camino original basado en PIL, sin ejecutar MediaPipe
+
+    Returns:
+        Diccionario {resolución: {decodificador: ms por frame}}
+    """
+    print("⏱️ Benchmark de decodificadores de frames...")
+
+    try:
+        from PIL import Image
+        import io
+    except ImportError:
+        Image = None
+
+    from keypoint_extractor import HandKeypointExtractor
+
+    # Solo se usan los métodos de decodificación: no hace falta el grafo de MediaPipe
+    extractor = HandKeypointExtractor.__new__(HandKeypointExtractor)
+    extractor._init_frame_buffers()
+
+    def legacy(jpeg_data):
+        frame = extractor._decode_frame(jpeg_data)
+        return cv2.cvtColor(extractor._resize_frame_optimized(frame), cv2.COLOR_BGR2RGB)
+
+    def pil(jpeg_data):
+        image = Image.open(io.BytesIO(jpeg_data))
+        frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        return cv2.cvtColor(extractor._resize_frame_optimized(frame), cv2.COLOR_BGR2RGB)
+
+    decoders = {"legacy": legacy, "fused": extractor._decode_frame_rgb}
+    if Image is not None:
+        decoders["pil"] = pil
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for width, height in ((640, 480), (1280, 720), (1920, 1080)):
+        # Imagen sintética con gradientes + ruido (comprime de forma parecida a una cámara)
+        gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+        image = (gradient + rng.normal(0, 20, (height, width, 3))).clip(0, 255).astype(np.uint8)
+        jpeg_data = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes()
+
+        label = f"{width}x{height}"
+        results[label] = {}
+        reference = legacy(jpeg_data)
+        for name, decode in decoders.items():
+            decode(jpeg_data)  # Calentamiento
+            start = time.perf_counter()
+            for _ in range(iterations):
+                output = decode(jpeg_data)
+            elapsed_ms = (time.perf_counter() - start) * 1000 / iterations
+            results[label][name] = elapsed_ms
+            diff = float(np.mean(np.abs(output.astype(np.int16) - reference.astype(np.int16))))
+            print(f"   {label} {name:>6}: {elapsed_ms:6.2f} ms/frame (diferencia media vs legacy: {diff:.2f})")
+
+    return results
+
+
+def extract_keypoints_reference(results) -> np.ndarray:
+    """Implementación original de _extract_keypoints (listas de Python), usada como referencia"""
+    keypoints = np.zeros((42, 2), dtype=np.float32)
+    hands_data = []
+    for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
+        hand_keypoints = []
+        for landmark in hand_landmarks.landmark:
+            hand_keypoints.append([landmark.x, landmark.y])
+        hands_data.append((i, hand_keypoints))
+    hands_data.sort(key=lambda x: np.mean([kp[0] for kp in x[1]]))
+    for hand_idx, (_, hand_keypoints) in enumerate(hands_data):
+        if hand_idx < 2:
+            keypoints[hand_idx * 21:(hand_idx + 1) * 21] = np.array(hand_keypoints)
+    return keypoints
+
+
+def synthetic_hand_results(seed: int = 0):
+    """
+    Resultado de hands.process() con dos manos, construido con los mismos protobuf que
+    devuelve MediaPipe (para medir _extract_keypoints sin depender de imágenes con manos)
+    """
+    from types import SimpleNamespace
+    from mediapipe.framework.formats import landmark_pb2, classification_pb2
+
+    rng = np.random.default_rng(seed)
+    hand_landmarks, handedness = [], []
+    for label in ("Right", "Left"):
+        landmarks = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in rng.random((21, 3)):
+            landmarks.landmark.add(x=float(x), y=float(y), z=float(z))
+        hand_landmarks.append(landmarks)
+        classes = classification_pb2.ClassificationList()
+        classes.classification.add(label=label, score=0.9)
+        handedness.append(classes)
+    return SimpleNamespace(multi_hand_landmarks=hand_landmarks, multi_handedness=handedness)
+
+
+def benchmark_keypoint_extraction(iterations: int = 5000) -> Dict[str, float]:
+    """
+    Micro-benchmark de _extract_keypoints (buffer preasignado) contra la implementación original,
+    con resultados sintéticos construidos con los mismos protobuf que devuelve MediaPipe
+
+    Returns:
+        Diccionario {implementación: µs por frame}
+    """
+    from keypoint_extractor import HandKeypointExtractor
+
+    print("⏱️ Benchmark de extracción de keypoints...")
+    results = synthetic_hand_results()
+
+    # Solo se necesitan los buffers de landmarks: no hace falta el grafo de MediaPipe
+    extractor = HandKeypointExtractor.__new__(HandKeypointExtractor)
+    extractor._init_frame_buffers()
+
+    reference = extract_keypoints_reference(results)
+    current = extractor._extract_keypoints(results)
+    print(f"   Paridad con la referencia: {np.array_equal(reference, current)}")
+
+    timings = {}
+    for name, extract in (("reference", extract_keypoints_reference),
+                          ("current", extractor._extract_keypoints)):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            extract(results)
+        timings[name] = (time.perf_counter() - start) * 1e6 / iterations
+        print(f"   {name:>10}: {timings[name]:6.1f} µs/frame")
+
+    return timings
+
+
+def normalize_sequence_length_reference(keypoints: np.ndarray, target_frames: int) -> np.ndarray:
+    """Remuestreo original (np.interp por keypoint y coordenada), usado como referencia"""
+    current_frames = keypoints.shape[0]
+    if current_frames == target_frames:
+        return keypoints
+    old_indices = np.linspace(0, current_frames - 1, current_frames)
+    new_indices = np.linspace(0, current_frames - 1, target_frames)
+    normalized = np.zeros((target_frames, keypoints.shape[1], keypoints.shape[2]))
+    for kp in range(keypoints.shape[1]):
+        for coord in range(keypoints.shape[2]):
+            normalized[:, kp, coord] = np.interp(new_indices, old_indices, keypoints[:, kp, coord])
+    return normalized
+
+
+def benchmark_resampler(iterations: int = 1000) -> Dict[str, float]:
+    """Remuestreo de una secuencia típica de grabación (56 frames): np.interp vs. vectorizado"""
+    from model_processor import ModelPreprocessor
+
+    print("⏱️ Benchmark de remuestreo de secuencias...")
+    preprocessor = ModelPreprocessor(target_frames=50)
+    sequence = np.random.default_rng(0).random((56, 42, 2)).astype(np.float32)
+
+    timings = {}
+    for name, resample in (("np.interp", lambda: normalize_sequence_length_reference(sequence, 50)),
+                           ("vectorizado", lambda: preprocessor.normalize_sequence_length(sequence))):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            resample()
+        timings[name] = (time.perf_counter() - start) * 1e6 / iterations
+        print(f"   {name:>11}: {timings[name]:.1f} µs/secuencia")
+
+    return timings
+
+
+def benchmark_ring_buffer(frames: int = 56, iterations: int = 2000) -> Dict[str, float]:
+    """Compara lista + np.array (implementación anterior) con el buffer circular"""
+    from keypoint_buffer import KeypointRingBuffer
+
+    rng = np.random.default_rng(0)
+    source = [keypoints for keypoints in rng.random((frames, 42, 2)).astype(np.float32)]
+
+    buffer = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        buffer = []
+        for keypoints in source:
+            buffer.append(keypoints.copy())
+    list_write = (time.perf_counter() - start) / iterations * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        sequence = np.array(buffer)
+    list_read = (time.perf_counter() - start) / iterations * 1e6
+
+    ring = KeypointRingBuffer(128)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        ring.clear()
+        for keypoints in source:
+            ring.append(keypoints, 0.0)
+    ring_write = (time.perf_counter() - start) / iterations * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        sequence_view = ring.present_keypoints()
+    ring_read = (time.perf_counter() - start) / iterations * 1e6
+
+    parity = bool(np.array_equal(sequence, sequence_view))
+    print(f"⏱️ Grabación de {frames} frames (escritura | obtener secuencia):")
+    print(f"   lista + np.array: {list_write:.1f} µs | {list_read:.1f} µs ({frames + 1} arrays nuevos)")
+    print(f"   buffer circular:  {ring_write:.1f} µs | {ring_read:.1f} µs (vista: {np.shares_memory(sequence_view, ring._keypoints)})")
+    print(f"   Paridad con la lista: {parity}")
+    return {"list_write": list_write, "list_read": list_read, "ring_write": ring_write, "ring_read": ring_read,
+            "parity": parity}
+
+
+def build_result_reference(probabilities: np.ndarray, top_k: int, class_names) -> Dict[str, Any]:
+    """Construcción original de resultados (argsort completo + raw_probabilities), usada como referencia"""
+    top_indices = np.argsort(probabilities)[-top_k:][::-1]
+    results = {
+        'predictions': [],
+        'main_prediction': None,
+        'confidence': 0.0,
+        'raw_probabilities': probabilities.tolist(),
+        'processing_info': {'input_shape': (50, 42, 2), 'processed_shape': (1, 50, 42, 2), 'model_input_shape': None}
+    }
+    for i, idx in enumerate(top_indices):
+        prediction = {'rank': i + 1, 'label': class_names[idx], 'confidence': float(probabilities[idx]), 'class_index': int(idx)}
+        results['predictions'].append(prediction)
+        if i == 0:
+            results['main_prediction'] = prediction['label']
+            results['confidence'] = prediction['confidence']
+    return results
+
+
+def benchmark_result_building(vocabulary_sizes=(100, 1000, 10000), top_k: int = 3, iterations: int = 500):
+    """Compara la construcción de resultados original con el modo lean (incluye serialización JSON)"""
+    from model_processor import SignLanguageModel
+
+    print("⏱️ Benchmark de construcción de resultados...")
+    rng = np.random.default_rng(0)
+    for num_classes in vocabulary_sizes:
+        model = SignLanguageModel("", "", "", result_mode="lean")
+        model._class_names = np.array([f"glosa_{i}" for i in range(num_classes)], dtype=object)
+        logits = rng.random(num_classes).astype(np.float32)
+        probabilities = (logits / logits.sum()).reshape(1, -1)
+
+        reference = build_result_reference(probabilities[0], top_k, model._class_names)
+        lean = model._build_results(probabilities, [top_k])[0]
+        parity = [p['class_index'] for p in reference['predictions']] == [p['class_index'] for p in lean['predictions']]
+
+        timings = {}
+        for name, build in (("original", lambda: build_result_reference(probabilities[0], top_k, model._class_names)),
+                            ("lean", lambda: model._build_results(probabilities, [top_k])[0])):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                json.dumps(build(), default=str)
+            timings[name] = (time.perf_counter() - start) / iterations * 1e6
+
+        print(f"   {num_classes:>6} clases: original {timings['original']:.1f} µs | lean {timings['lean']:.1f} µs "
+              f"(mismo top-{top_k}: {parity})")
+
+
+def benchmark_inference(model, iterations: int = 50) -> Dict[str, Dict[str, float]]:
+    """Latencia por llamada (batch=1): con Keras compara model.predict, predict_on_batch y el camino compilado"""
+    print(f"⏱️ Benchmark de inferencia (backend {model.backend}, batch=1)...")
+
+    rng = np.random.default_rng(0)
+    batch = model.preprocessor.preprocess_sequence(rng.random((50, 42, 2)).astype(np.float32)).astype(np.float32)
+
+    paths = {}
+    if model.backend == "keras":
+        keras_model = model.model.keras_model
+        paths["model.predict"] = lambda: keras_model.predict(batch, verbose=0)
+        paths["predict_on_batch"] = lambda: keras_model.predict_on_batch(batch)
+    paths[model.backend] = lambda: model._forward(batch)
+
+    timings = {}
+    for name, call in paths.items():
+        # La primera llamada queda fuera de la medición
+        timings[name] = summarize(time_stage(lambda _: call(), [None], iterations, warmup=1))
+        print(f"   {name:>16}: media {timings[name]['mean_ms']:.2f}ms | p95 {timings[name]['p95_ms']:.2f}ms")
+
+    print(f"   Warmup: {model.warmup_times_ms}")
+    return timings
+
+
+def benchmark_prediction_cache(model, iterations: int = 50) -> Dict[str, float]:
+    """predict() sin caché vs. con caché (hit) para la misma secuencia"""
+    from prediction_cache import PredictionCache
+
+    print("⏱️ Benchmark de caché de predicciones...")
+    sequence = np.random.default_rng(0).random((56, 42, 2)).astype(np.float32)
+    original_cache = model.prediction_cache
+
+    timings = {}
+    for name, cache in (("sin caché", None), ("caché (hit)", PredictionCache())):
+        model.prediction_cache = cache
+        if cache is not None:
+            cache.bind([model.model_path, model.encoder_path])
+        model.predict(sequence, top_k=3)  # Primera llamada fuera de la medición (miss)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            model.predict(sequence, top_k=3)
+        timings[name] = (time.perf_counter() - start) * 1000 / iterations
+        print(f"   {name:>12}: {timings[name]:.3f} ms/predicción")
+
+    print(f"   Stats: {model.prediction_cache.get_stats()}")
+
+    model.prediction_cache = original_cache
+    return timings
+
+
+def benchmark_motion_gate(rest_frames: int = 200, sign_frames: int = 40, cycles: int = 5, seed: int = 0):
+    """Inferencias con y sin motion gate sobre un stream sintético (reposo con jitter + señas); sirve para calibrar los umbrales"""
+    from continuous_recognizer import ContinuousRecognizer
+
+    rng = np.random.default_rng(seed)
+    base = rng.random((42, 2)).astype(np.float32)
+    stream = []
+    for _ in range(cycles):
+        for _ in range(rest_frames):
+            stream.append(base + rng.normal(0, 0.001, base.shape).astype(np.float32))
+        position = base.copy()
+        for _ in range(sign_frames):
+            position = position + rng.normal(0, 0.02, base.shape).astype(np.float32)
+            stream.append(position.copy())
+
+    results = {}
+    for enabled in (False, True):
+        recognizer = ContinuousRecognizer(motion_gate_config={"enabled": enabled})
+        start = time.perf_counter()
+        for keypoints in stream:
+            recognizer.add_frame(keypoints, 0.0)
+            if recognizer.window_ready():
+                recognizer.take_window()
+        elapsed = (time.perf_counter() - start) / len(stream) * 1e6
+        results[enabled] = (recognizer.motion_gate.get_stats(), elapsed)
+
+    ungated, _ = results[False]
+    gated, per_frame_us = results[True]
+    print(f"⏱️ Motion gate, stream sintético: {len(stream)} frames ({cycles} señas de {sign_frames} frames)")
+    print(f"   Sin gate: {ungated['executed_windows']} inferencias")
+    print(f"   Con gate: {gated['executed_windows']} inferencias, {gated['gated_windows']} ventanas descartadas "
+          f"({per_frame_us:.1f} µs/frame)")
+    print(f"   Segmentos detectados: {gated['segments']}")
+
+
+
+def run_micro_benchmarks(model=None):
+    """
+    Todos los micro-benchmarks; los de inferencia y caché solo corren si hay
+    un modelo (el indicado o el de MODEL_CONFIG)
+    """
+    benchmark_frame_decoders()
+    benchmark_keypoint_extraction()
+    benchmark_resampler()
+    benchmark_ring_buffer()
+    benchmark_result_building()
+    benchmark_motion_gate()
+
+    model = model or load_bench_model()
+    if model is None:
+        print("⚠️ Sin archivos de modelo: se omiten los benchmarks de inferencia y caché")
+        return
+    benchmark_inference(model)
+    benchmark_prediction_cache(model)
+
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else "bench_results.json", iterations=100)
@@ -0,0 +1,144 @@
+"""
+Caché de predicciones por secuencia preprocesada
+
+Uploads repetidos, reintentos tras una desconexión y re-ejecuciones del modo
+batch le llegan al modelo con el mismo tensor (o casi): la clave es el hash de
+la entrada (50, 42, 2) ya normalizada con z-score y cuantizada a
+`quantization_step`, así diferencias de redondeo no producen misses. Se guarda
+el vector de probabilidades (no el resultado armado), por lo que top-k y los
+campos opcionales se siguen eligiendo por llamada.
+
+Memoria acotada (máximo de entradas, desalojo LRU) y TTL por entrada. La
+caché vigila la huella de los archivos del modelo (ruta, tamaño, mtime) y se
+vacía sola si cambian.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from config import PREDICTION_CACHE_CONFIG
+
+
+def file_fingerprint(paths: Iterable) -> Tuple:
+    """Huella (ruta, tamaño, mtime) de los archivos; los que no existen cuentan como None"""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append((str(path), stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            fingerprint.append((str(path), None, None))
+    return tuple(fingerprint)
+
+
+class PredictionCache:
+    """
+    Caché LRU + TTL de probabilidades por entrada cuantizada (thread-safe)
+    """
+
+    def __init__(self, max_entries: int = PREDICTION_CACHE_CONFIG["max_entries"],
+                 ttl_s: Optional[float] = PREDICTION_CACHE_CONFIG["ttl_s"],
+                 quantization_step: float = PREDICTION_CACHE_CONFIG["quantization_step"],
+                 fingerprint_check_s: float = PREDICTION_CACHE_CONFIG["fingerprint_check_s"]):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.quantization_step = quantization_step
+        self.fingerprint_check_s = fingerprint_check_s
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._watched_paths: Tuple = ()
+        self._fingerprint: Optional[Tuple] = None
+        self._checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def bind(self, paths: Iterable):
+        """Asocia la caché a los archivos del modelo cargado (vacía lo anterior)"""
+        with self._lock:
+            self._watched_paths = tuple(str(path) for path in paths)
+            self._fingerprint = file_fingerprint(self._watched_paths)
+            self._checked_at = time.monotonic()
+            self._entries.clear()
+
+    def _check_fingerprint(self, now: float):
+        """Vacía la caché si los archivos del modelo cambiaron (a lo sumo cada fingerprint_check_s)"""
+        if now - self._checked_at < self.fingerprint_check_s:
+            return
+        self._checked_at = now
+        fingerprint = file_fingerprint(self._watched_paths)
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+
+    def key_for(self, processed: np.ndarray) -> bytes:
+        """Hash de la secuencia preprocesada cuantizada a quantization_step"""
+        quantized = np.rint(processed / self.quantization_step).astype(np.int32)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(quantized.shape).encode())
+        digest.update(quantized.tobytes())
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Probabilidades guardadas para la clave, o None"""
+        now = time.monotonic()
+        with self._lock:
+            self._check_fingerprint(now)
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_s is not None and now - entry[1] > self.ttl_s:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: bytes, probabilities: np.ndarray):
+        with self._lock:
+            self._entries[key] = (np.array(probabilities, dtype=np.float32), time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            memory = sum(probabilities.nbytes for probabilities, _ in self._entries.values())
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_kb": round(memory / 1024, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+def create_prediction_cache() -> Optional[PredictionCache]:
+    """Caché configurada en PREDICTION_CACHE_CONFIG, o None si está deshabilitada"""
+    if not PREDICTION_CACHE_CONFIG["enabled"]:
+        return None
+    return PredictionCache()
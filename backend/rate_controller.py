@@ -0,0 +1,133 @@
+import os
+import time
+from typing import Any, Dict, Optional
+
+from config import RATE_CONTROL_CONFIG, PROCESSING_CONFIG, CAPTURE_CONFIG
+
+_cpu_load_cache = {"value": None, "at": 0.0}
+
+
+def get_cpu_load(max_age: float = 1.0) -> Optional[float]:
+    """Carga del sistema por núcleo (loadavg de 1 min / CPUs); None si no está disponible"""
+    now = time.monotonic()
+    if now - _cpu_load_cache["at"] >= max_age:
+        try:
+            _cpu_load_cache["value"] = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            _cpu_load_cache["value"] = None  # Windows
+        _cpu_load_cache["at"] = now
+    return _cpu_load_cache["value"]
+
+
+class RateController:
+    """
+    Recomendaciones de captura por sesión (fps, resolución y calidad JPEG)
+
+    Mide la latencia de procesamiento de cada frame (EWMA) y la holgura de CPU
+    del servidor. Durante la grabación apunta a `target_fps` de CAPTURE_CONFIG
+    (50 frames en 2.5s) bajando primero calidad y resolución; con manos pero sin
+    grabar respeta `PROCESSING_CONFIG["frame_rate_ms"]`; sin manos estrangula al
+    mínimo. Las recomendaciones solo se envían cuando cambian.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = {**RATE_CONTROL_CONFIG, **(config or {})}
+        self.enabled = config["enabled"]
+        self.ewma_alpha = config["ewma_alpha"]
+        self.warmup_frames = config["warmup_frames"]
+        self.fps_step = config["fps_step"]
+        self.recover_ratio = config["recover_ratio"]
+        self.idle_after_frames = config["idle_after_frames"]
+        self.idle_fps = config["idle_fps"]
+        self.min_fps = config["min_fps"]
+        self.high_cpu_load = config["high_cpu_load"]
+        self.quality_levels = config["quality_levels"]
+        self.width_levels = config["width_levels"]
+        self.recording_fps = CAPTURE_CONFIG["target_fps"]
+        self.active_fps = 1000 / PROCESSING_CONFIG["frame_rate_ms"]
+
+        self.latency_ms: Optional[float] = None
+        self._frames_observed = 0
+        self._degraded = False
+        self._frames_without_hands = 0
+        self._last_hint: Optional[Dict[str, Any]] = None
+        self.hints_sent = 0
+
+    def observe(self, latency_ms: float):
+        """Registra la latencia de procesamiento de un frame"""
+        self._frames_observed += 1
+        if self._frames_observed <= self.warmup_frames:
+            return  # Los primeros frames incluyen la inicialización del grafo de MediaPipe
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += self.ewma_alpha * (latency_ms - self.latency_ms)
+
+    def capture_state(self, recording: bool, hands_detected: bool) -> str:
+        """Estado de captura con histéresis para no oscilar cuando las manos parpadean"""
+        if recording:
+            self._frames_without_hands = 0
+            return "recording"
+        self._frames_without_hands = 0 if hands_detected else self._frames_without_hands + 1
+        return "idle" if self._frames_without_hands >= self.idle_after_frames else "active"
+
+    def recommend(self, state: str) -> Dict[str, Any]:
+        """Recomendación para el estado de captura dado"""
+        cpu_load = get_cpu_load()
+        overloaded = cpu_load is not None and cpu_load >= self.high_cpu_load
+
+        if state == "idle":
+            fps = self.idle_fps
+            level = len(self.quality_levels) - 1
+        else:
+            fps = self.recording_fps if state == "recording" else self.active_fps
+            level = 1 if overloaded else 0
+
+            # Latencia por encima del presupuesto por frame: primero bajar calidad/resolución.
+            # Histéresis: se recupera recién con la latencia bajo recover_ratio del presupuesto
+            if self.latency_ms is not None:
+                budget_ms = 1000 / fps
+                if self.latency_ms > budget_ms:
+                    self._degraded = True
+                elif self.latency_ms < budget_ms * self.recover_ratio:
+                    self._degraded = False
+
+            if self._degraded:
+                level = len(self.quality_levels) - 1
+                if state != "recording" or overloaded:
+                    # Escalones de fps_step: evita reenviar la recomendación por fluctuaciones de la EWMA
+                    sustainable_fps = 1000 / self.latency_ms
+                    fps = min(fps, max(self.min_fps, int(sustainable_fps // self.fps_step) * self.fps_step))
+
+        fps = min(fps, self.recording_fps)
+        return {
+            "state": state,
+            "fps": round(fps, 1),
+            "frame_interval_ms": int(round(1000 / fps)),
+            "jpeg_quality": self.quality_levels[level],
+            "max_width": self.width_levels[level]
+        }
+
+    def update(self, recording: bool, hands_detected: bool) -> Optional[Dict[str, Any]]:
+        """
+        Recalcula la recomendación tras un frame
+
+        Returns:
+            La recomendación si cambió respecto de la última enviada, o None
+        """
+        if not self.enabled:
+            return None
+        hint = self.recommend(self.capture_state(recording, hands_detected))
+        if hint == self._last_hint:
+            return None
+        self._last_hint = hint
+        self.hints_sent += 1
+        return hint
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": round(self.latency_ms, 2) if self.latency_ms is not None else None,
+            "cpu_load": get_cpu_load(),
+            "hint": self._last_hint,
+            "hints_sent": self.hints_sent
+        }
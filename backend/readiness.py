@@ -0,0 +1,153 @@
+"""
+Estado de arranque del servidor
+
+El servidor acepta conexiones apenas se importa `main` (sin TensorFlow ni
+MediaPipe); los componentes pesados se cargan después en segundo plano:
+
+- "tracking": import de mediapipe + calentamiento del detector de manos. Las
+  conexiones WebSocket nuevas esperan solo esto.
+- "model": carga y warmup del modelo. Las predicciones esperan esto.
+
+Los tiempos se miden desde el inicio del proceso: time-to-first-byte (primera
+respuesta HTTP o aceptación de WebSocket) y time-to-ready de cada componente.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+
+
+def process_start_time() -> float:
+    """Inicio del proceso (epoch) según /proc; si no está disponible, el momento del import"""
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            # El nombre del proceso va entre paréntesis y puede contener espacios
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])  # Campo 22 (starttime), contado desde el campo 3
+        with open("/proc/uptime", encoding="ascii") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+class StartupTracker:
+    """
+    Estado de los componentes que cargan en segundo plano
+
+    Los métodos mark_* se llaman desde el event loop; wait() permite que un
+    handler espere un componente con timeout.
+    """
+
+    def __init__(self, components=("tracking", "model"), started_at: Optional[float] = None):
+        self.started_at = started_at if started_at is not None else process_start_time()
+        self.scheduled = False
+        self.first_byte_s: Optional[float] = None
+        self.accepting_s: Optional[float] = None
+        self._components = {
+            name: {"state": "pending", "ready_s": None, "load_ms": None, "error": None}
+            for name in components
+        }
+        self._loading_since: Dict[str, float] = {}
+        self._events = {name: asyncio.Event() for name in components}
+
+    def _elapsed(self) -> float:
+        return round(time.time() - self.started_at, 3)
+
+    def schedule(self):
+        """Hay una carga en segundo plano en curso: wait() espera a los componentes pendientes"""
+        self.scheduled = True
+
+    def mark_accepting(self):
+        """El servidor terminó su startup y acepta conexiones"""
+        self.accepting_s = self._elapsed()
+
+    def mark_first_byte(self):
+        if self.first_byte_s is None:
+            self.first_byte_s = self._elapsed()
+
+    def mark_loading(self, name: str):
+        self._components[name]["state"] = "loading"
+        self._loading_since[name] = time.perf_counter()
+
+    def mark_ready(self, name: str):
+        component = self._components[name]
+        component["state"] = "ready"
+        component["ready_s"] = self._elapsed()
+        component["load_ms"] = self._load_ms(name)
+        self._events[name].set()
+
+    def mark_failed(self, name: str, error: str):
+        component = self._components[name]
+        component["state"] = "failed"
+        component["error"] = error
+        component["load_ms"] = self._load_ms(name)
+        self._events[name].set()  # Los que esperan no deben quedarse colgados
+
+    def _load_ms(self, name: str) -> Optional[float]:
+        since = self._loading_since.get(name)
+        return round((time.perf_counter() - since) * 1000, 1) if since is not None else None
+
+    def state(self, name: str) -> str:
+        return self._components[name]["state"]
+
+    def is_ready(self, name: Optional[str] = None) -> bool:
+        """Un componente listo, o todos si no se indica ninguno"""
+        names = [name] if name else self._components
+        return all(self._components[n]["state"] == "ready" for n in names)
+
+    async def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que el componente termine de cargar; True si quedó listo
+
+        Sin carga programada (la app se usó sin su evento de startup) no hay
+        nada que esperar y devuelve False de inmediato.
+        """
+        state = self._components[name]["state"]
+        if state not in ("pending", "loading") or (state == "pending" and not self.scheduled):
+            return self.is_ready(name)
+        try:
+            await asyncio.wait_for(self._events[name].wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.is_ready(name)
+
+    def time_to_ready(self) -> Optional[float]:
+        """Segundos desde el inicio del proceso hasta que todos los componentes quedaron listos"""
+        if not self.is_ready():
+            return None
+        return max(component["ready_s"] for component in self._components.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.is_ready(),
+            "uptime_s": self._elapsed(),
+            "accepting_s": self.accepting_s,
+            "time_to_first_byte_s": self.first_byte_s,
+            "time_to_ready_s": self.time_to_ready(),
+            "components": {name: dict(component) for name, component in self._components.items()}
+        }
+
+
+class FirstByteMiddleware:
+    """
+    Middleware ASGI que registra la primera respuesta del proceso (HTTP o
+    aceptación de WebSocket); después de eso no intercepta nada
+    """
+
+    def __init__(self, app, tracker: StartupTracker):
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope, receive, send):
+        if self.tracker.first_byte_s is not None or scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_mark(message):
+            if message["type"] in ("http.response.start", "websocket.accept"):
+                self.tracker.mark_first_byte()
+            await send(message)
+
+        await self.app(scope, receive, send_with_mark)
@@ -0,0 +1,247 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+from config import CAPTURE_CONFIG, CONTINUOUS_CONFIG, PROCESSING_CONFIG
+from continuous_recognizer import ContinuousRecognizer, RECOGNITION_MODES
+from early_exit import EarlyExitPolicy
+from rate_controller import RateController
+from keypoint_buffer import KeypointRingBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class VideoUploadProcessor:
+    """Procesa frames de video upload y acumula keypoints"""
+
+    def __init__(self):
+        self.keypoint_buffer = KeypointRingBuffer(CAPTURE_CONFIG["buffer_capacity"])
+        self.target_frames = 50
+        self.reset()
+
+    def reset(self):
+        self.keypoint_buffer.clear()
+
+    @property
+    def total_frames(self) -> int:
+        return self.keypoint_buffer.total_written
+
+    @property
+    def frames_with_hands(self) -> int:
+        return self.keypoint_buffer.present_written
+
+    def add_frame(self, keypoints):
+        """Escribe los keypoints de un frame (None si no se detectaron manos)"""
+        self.keypoint_buffer.append(keypoints)
+
+    def is_ready_for_prediction(self):
+        """Verifica si tenemos suficientes frames para predicción"""
+        return self.frames_with_hands >= self.target_frames  # 50 frames para auto-predicción
+
+    def get_keypoints_sequence(self):
+        """Retorna la secuencia de keypoints para el modelo"""
+        if self.frames_with_hands >= 21:  # Permitir mínimo 21 frames
+            # Tomar hasta 50 frames con manos o los que tengamos
+            keypoints_array = self.keypoint_buffer.present_keypoints(limit=self.target_frames)
+
+            # Si tenemos menos de 30 frames, advertir pero permitir predicción
+            if self.frames_with_hands < 30:
+                print(f"⚠️ VIDEO UPLOAD: Predicción con solo {self.frames_with_hands} frames (recomendado: 30+)")
+
+            return keypoints_array
+        return None
+
+    def get_progress(self):
+        """Retorna el progreso de extracción"""
+        return {
+            'total_frames': self.total_frames,
+            'frames_with_hands': self.frames_with_hands,
+            'target_frames': self.target_frames,
+            'progress_percent': (self.frames_with_hands / self.target_frames) * 100
+        }
+
+    def should_process_final(self, total_video_frames):
+        """Verifica si debe procesar al final del video"""
+        return (self.total_frames >= total_video_frames and
+                self.frames_with_hands >= 21 and  # Reducido a 21 mínimo
+                not self.is_ready_for_prediction())
+
+
+class RecognitionSession:
+    """
+    Estado de reconocimiento de una conexión WebSocket
+
+    Cada cliente tiene su propio extractor (grafo de tracking de MediaPipe),
+    su propio buffer de video upload y sus propias tareas de countdown/timeout,
+    de modo que varias personas pueden usar el servidor sin interferir entre sí.
+    """
+
+    def __init__(self, session_id: str, websocket=None):
+        self.session_id = session_id
+        self.websocket = websocket
+        self.created_at = time.time()
+
+        # Extractor propio: el tracking de MediaPipe depende de los frames previos
+        # (import diferido: mediapipe arrastra TensorFlow y el servidor arranca sin esperarlo)
+        from keypoint_extractor import HandKeypointExtractor
+        self.keypoint_extractor = HandKeypointExtractor()
+        self.video_upload_processor = VideoUploadProcessor()
+
+        # Última configuración enviada por el cliente (usada por los frames binarios)
+        self.settings: Dict = {}
+
+        # Modo de reconocimiento de cámara: countdown + grabación o ventana deslizante
+        self.recognition_mode = CONTINUOUS_CONFIG["default_mode"]
+        self.continuous_recognizer = ContinuousRecognizer()
+        self.early_exit = EarlyExitPolicy()
+        self.rate_controller = RateController()
+
+        # Control de flujos mutuamente excluyentes (cámara vs video upload)
+        self.is_processing_video_upload = False
+        self.video_upload_timeout_task: Optional[asyncio.Task] = None
+        self.recording_sequence_task: Optional[asyncio.Task] = None
+
+        # Cola de frames entrantes con su worker (la asigna main.py al conectar)
+        self.frame_ingest = None
+
+        # Llamadas al extractor en curso en el pool de frames: close() las espera
+        # antes de cerrar el grafo de MediaPipe
+        self._extractor_calls: Set[asyncio.Future] = set()
+
+        # Estado anterior para evitar log spam
+        self.previous_log_state = None
+
+    def update_settings(self, settings: Dict):
+        """Guarda la configuración del cliente y aplica el modo de reconocimiento"""
+        prediction_count = settings.get("predictionCount")
+        max_count = PROCESSING_CONFIG["max_prediction_count"]
+        if prediction_count is not None and (isinstance(prediction_count, bool) or not isinstance(prediction_count, int)
+                                             or not 1 <= prediction_count <= max_count):
+            raise ValueError(f"predictionCount inválido: {prediction_count} (debe estar entre 1 y {max_count})")
+        mode = settings.get("recognitionMode")
+        if mode and mode not in RECOGNITION_MODES:
+            raise ValueError(f"Modo de reconocimiento inválido: {mode}")
+        # Todo validado: una configuración rechazada deja la anterior intacta
+        self.settings = settings
+        if mode and mode != self.recognition_mode:
+            self.set_recognition_mode(mode)
+
+    def set_recognition_mode(self, mode: str):
+        """Cambia de modo descartando la grabación o ventana en curso"""
+        if mode not in RECOGNITION_MODES:
+            raise ValueError(f"Modo de reconocimiento inválido: {mode}")
+        if self.recording_sequence_task and not self.recording_sequence_task.done():
+            self.recording_sequence_task.cancel()
+        self.recording_sequence_task = None
+        self.keypoint_extractor.cancel_recording()
+        self.continuous_recognizer.reset()
+        self.recognition_mode = mode
+        self.previous_log_state = None
+        logger.info(f"Sesión {self.session_id}: modo de reconocimiento '{mode}'")
+
+    def start_recording_sequence(self, coroutine) -> asyncio.Task:
+        """Lanza la secuencia countdown + grabación como tarea de la sesión"""
+        self.recording_sequence_task = asyncio.create_task(coroutine)
+        return self.recording_sequence_task
+
+    def start_video_upload_timeout(self, coroutine) -> asyncio.Task:
+        """Reemplaza el timeout de seguridad del video upload"""
+        self.cancel_video_upload_timeout()
+        self.video_upload_timeout_task = asyncio.create_task(coroutine)
+        return self.video_upload_timeout_task
+
+    def cancel_video_upload_timeout(self):
+        """Cancela el timeout de seguridad del video upload si existe"""
+        if self.video_upload_timeout_task and not self.video_upload_timeout_task.done():
+            self.video_upload_timeout_task.cancel()
+        self.video_upload_timeout_task = None
+
+    def finish_video_upload(self):
+        """Restaura la funcionalidad de cámara al terminar un video upload"""
+        self.is_processing_video_upload = False
+        self.cancel_video_upload_timeout()
+
+    def get_status(self) -> Dict:
+        """Resumen del estado de la sesión para diagnóstico"""
+        extractor = self.keypoint_extractor
+        status = {
+            "session_id": self.session_id,
+            "age_seconds": round(time.time() - self.created_at, 1),
+            "is_processing_video_upload": self.is_processing_video_upload,
+            "recognition_mode": self.recognition_mode,
+            "is_recording": extractor.is_recording,
+            "countdown_active": extractor.countdown_active,
+            "is_paused": extractor.is_paused
+        }
+        if self.frame_ingest is not None:
+            status["ingest"] = self.frame_ingest.get_stats()
+        status["rate_control"] = self.rate_controller.get_stats()
+        if self.recognition_mode == "continuous":
+            status["continuous"] = self.continuous_recognizer.get_stats()
+        elif self.early_exit.enabled:
+            status["early_exit"] = self.early_exit.get_stats()
+        return status
+
+    async def run_extractor(self, executor, func: Callable, *args) -> Any:
+        """
+        Ejecuta un método del extractor en el pool de frames
+
+        Si quien espera se cancela (desconexión), el hilo sigue corriendo: la
+        llamada queda registrada hasta terminar para que close() la espere.
+        """
+        call = asyncio.ensure_future(executor.run(func, *args))
+        self._extractor_calls.add(call)
+        call.add_done_callback(self._extractor_calls.discard)
+        return await asyncio.shield(call)
+
+    async def close(self):
+        """Cancela tareas pendientes y libera el grafo de MediaPipe"""
+        self.cancel_video_upload_timeout()
+        if self.recording_sequence_task and not self.recording_sequence_task.done():
+            self.recording_sequence_task.cancel()
+        self.recording_sequence_task = None
+        if self.frame_ingest is not None:
+            self.frame_ingest.close()
+        self.is_processing_video_upload = False
+        # hands.close() con un hands.process() en curso en otro hilo rompe el grafo
+        if self._extractor_calls:
+            await asyncio.gather(*self._extractor_calls, return_exceptions=True)
+        self.keypoint_extractor.cleanup()
+
+
+class SessionRegistry:
+    """Registro de sesiones de reconocimiento activas"""
+
+    def __init__(self):
+        self._sessions: Dict[str, RecognitionSession] = {}
+        self._ids = itertools.count(1)
+
+    def create(self, websocket=None) -> RecognitionSession:
+        """Crea y registra una nueva sesión"""
+        session_id = f"session-{next(self._ids)}"
+        session = RecognitionSession(session_id, websocket)
+        self._sessions[session_id] = session
+        logger.info(f"Sesión creada: {session_id}. Activas: {len(self._sessions)}")
+        return session
+
+    def get(self, session_id: str) -> Optional[RecognitionSession]:
+        return self._sessions.get(session_id)
+
+    async def remove(self, session_id: str):
+        """Elimina la sesión del registro y libera sus recursos"""
+        session = self._sessions.pop(session_id, None)
+        if session:
+            await session.close()
+            logger.info(f"Sesión cerrada: {session_id}. Activas: {len(self._sessions)}")
+
+    async def close_all(self):
+        for session_id in list(self._sessions):
+            await self.remove(session_id)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __iter__(self):
+        return iter(list(self._sessions.values()))
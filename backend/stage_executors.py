@@ -0,0 +1,85 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class StageExecutor:
+    """
+    Ejecutor de una etapa bloqueante del pipeline (decodificación/MediaPipe o inferencia)
+
+    Corre el trabajo en un pool de hilos para no congelar el event loop de asyncio
+    y lleva la cuenta de la profundidad de cola de la etapa.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"lsp-{name}"
+        )
+        self._lock = threading.Lock()
+
+        # Métricas de la etapa
+        self.queued = 0          # Tareas enviadas que aún no empiezan
+        self.active = 0          # Tareas ejecutándose
+        self.completed = 0
+        self.failed = 0
+        self.max_queued = 0
+        self.total_wait_time = 0.0   # Tiempo acumulado en cola (s)
+        self.total_run_time = 0.0    # Tiempo acumulado de ejecución (s)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Ejecuta func(*args, **kwargs) en el pool y espera su resultado sin bloquear el loop"""
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        call = functools.partial(self._execute, func, args, kwargs, submitted_at)
+        return await loop.run_in_executor(self._executor, call)
+
+    def _execute(self, func: Callable, args: tuple, kwargs: dict, submitted_at: float) -> Any:
+        started_at = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.total_wait_time += started_at - submitted_at
+
+        failed = False
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.total_run_time += time.perf_counter() - started_at
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profundidad de cola y tiempos de la etapa"""
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": round(self.total_wait_time / finished * 1000, 2) if finished else 0.0,
+                "avg_run_ms": round(self.total_run_time / finished * 1000, 2) if finished else 0.0
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -187,6 +187,159 @@ def test_keypoint_extractor():
         print(f"❌ Error probando extractor: {e}")
         return False
 
+def test_keypoint_extraction_parity():
+    """Compara _extract_keypoints con la implementación original (resultados sintéticos de MediaPipe)"""
+    print("🔍 Probando paridad de la extracción de keypoints...")
+    
+    try:
+        import numpy as np
+        from keypoint_extractor import HandKeypointExtractor
+        from pipeline_benchmark import synthetic_hand_results, extract_keypoints_reference
+        
+        # Solo se necesitan los buffers de landmarks: no hace falta el grafo de MediaPipe
+        extractor = HandKeypointExtractor.__new__(HandKeypointExtractor)
+        extractor._init_frame_buffers()
+        
+        for seed in range(5):
+            results = synthetic_hand_results(seed)
+            # Coordenadas en 0.0 (proto3 no las serializa) y manos en orden invertido
+            results.multi_hand_landmarks[0].landmark[seed].x = 0.0
+            results.multi_hand_landmarks[1].landmark[seed].y = 0.0
+            if seed % 2:
+                results.multi_hand_landmarks.reverse()
+            if not np.array_equal(extract_keypoints_reference(results), extractor._extract_keypoints(results)):
+                print(f"❌ Keypoints distintos de la referencia (semilla {seed})")
+                return False
+        
+        print("✅ Extracción de keypoints igual a la referencia")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error probando extracción: {e}")
+        return False
+
+def test_resampler_parity(tolerance: float = 1e-5):
+    """Compara el remuestreo vectorizado de secuencias con la implementación original (np.interp)"""
+    print("🔍 Probando paridad del remuestreo de secuencias...")
+    
+    try:
+        import numpy as np
+        from model_processor import ModelPreprocessor
+        from pipeline_benchmark import normalize_sequence_length_reference
+        
+        preprocessor = ModelPreprocessor(target_frames=50)
+        rng = np.random.default_rng(0)
+        max_error = 0.0
+        
+        for frames in (1, 2, 21, 30, 49, 50, 56, 120):
+            sequence = rng.random((frames, 42, 2)).astype(np.float32)
+            expected = normalize_sequence_length_reference(sequence, 50)
+            actual = preprocessor.normalize_sequence_length(sequence)
+            max_error = max(max_error, float(np.max(np.abs(actual - expected))))
+        
+        # Batch: varias secuencias del mismo largo en una sola llamada
+        batch = rng.random((16, 37, 42, 2)).astype(np.float32)
+        batched = preprocessor.normalize_sequence_length(batch)
+        for i in range(batch.shape[0]):
+            expected = normalize_sequence_length_reference(batch[i], 50)
+            max_error = max(max_error, float(np.max(np.abs(batched[i] - expected))))
+        
+        passed = max_error <= tolerance
+        print(f"{'✅' if passed else '❌'} Error máximo vs np.interp: {max_error:.2e} (tolerancia {tolerance:.0e})")
+        return passed
+        
+    except Exception as e:
+        print(f"❌ Error probando remuestreo: {e}")
+        return False
+
+def test_clip_isolation(clips=None):
+    """
+    El mismo clip debe dar los mismos keypoints con un extractor reutilizado
+    (modo batch) después de otro clip y con uno nuevo (upload HTTP)
+    """
+    print("🔍 Probando aislamiento entre clips del extractor reutilizado...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        from keypoint_extractor import HandKeypointExtractor
+        from video_processing import extract_video_keypoints
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            if not clips:
+                from pipeline_benchmark import synthetic_clip
+                print("   Sin --test-clips: clips sintéticos (sin manos, solo recorren el camino)")
+                clips = [synthetic_clip(Path(tmp) / f"clip_{seed}.mp4", seed=seed) for seed in (0, 1)]
+            clip, other = clips
+            
+            fresh = extract_video_keypoints(clip)["keypoints"]
+            extractor = HandKeypointExtractor()
+            try:
+                # Clip, otro clip, y el mismo clip otra vez: la segunda pasada no debe heredar manos
+                reused = [extract_video_keypoints(path, extractor=extractor)["keypoints"] for path in (clip, other, clip)]
+            finally:
+                extractor.cleanup()
+        
+        for name, keypoints in (("primera pasada", reused[0]), ("después de otro clip", reused[2])):
+            same = keypoints is None if fresh is None else keypoints is not None and np.array_equal(fresh, keypoints)
+            if not same:
+                print(f"❌ Keypoints distintos del extractor nuevo ({name})")
+                return False
+        
+        print(f"✅ Keypoints idénticos entre clips ({'sin secuencia' if fresh is None else fresh.shape})")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error probando aislamiento entre clips: {e}")
+        return False
+
+def test_early_exit_failed_prediction():
+    """Una predicción parcial fallida (None del batcher) no detiene la grabación ni rompe el frame"""
+    print("🔍 Probando salida temprana con predicción parcial fallida...")
+    
+    try:
+        import asyncio
+        import numpy as np
+        from types import SimpleNamespace
+        import main
+        from inference_batcher import InferenceBatcher
+        from recognition_session import RecognitionSession
+        from stage_executors import StageExecutor
+        
+        session = RecognitionSession("test-early-exit")
+        extractor = session.keypoint_extractor
+        extractor.start_recording()
+        for keypoints in np.random.default_rng(0).random((30, 42, 2)).astype(np.float32):
+            extractor.add_keypoints_to_buffer(keypoints)
+        
+        async def score():
+            executor = StageExecutor("test", 1)
+            try:
+                # predict_batch devuelve None para las filas que fallaron
+                main.inference_batcher = InferenceBatcher(lambda sequences, top_ks: [None] * len(sequences), executor)
+                return await main.score_partial_recording(session)
+            finally:
+                executor.shutdown()
+        
+        original = main.sign_model, main.inference_batcher
+        main.sign_model = SimpleNamespace(is_ready=lambda: True)
+        try:
+            stop = asyncio.run(score())
+        finally:
+            main.sign_model, main.inference_batcher = original
+            session.keypoint_extractor.cleanup()
+        
+        if stop is not False:
+            print(f"❌ score_partial_recording devolvió {stop!r} (esperado False)")
+            return False
+        
+        print("✅ Predicción parcial fallida ignorada (la grabación continúa)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error probando salida temprana: {e}")
+        return False
+
 def test_model_processor():
     """Prueba el procesador del modelo"""
     print("⚙️ Probando procesador del modelo...")
@@ -218,7 +371,7 @@ def test_model_processor():
         print(f"❌ Error probando procesador: {e}")
         return False
 
-def run_full_test():
+def run_full_test(clips=None):
     """Ejecuta todas las pruebas del sistema"""
     print("🧪 EJECUTANDO PRUEBAS COMPLETAS DEL SISTEMA")
     print("=" * 50)
@@ -229,6 +382,10 @@ def run_full_test():
         ("MediaPipe", test_mediapipe),
         ("TensorFlow", test_tensorflow),
         ("Extractor de Keypoints", test_keypoint_extractor),
+        ("Paridad de Keypoints", test_keypoint_extraction_parity),
+        ("Paridad del Remuestreo", test_resampler_parity),
+        ("Aislamiento entre Clips", lambda: test_clip_isolation(clips)),
+        ("Salida Temprana sin Predicción", test_early_exit_failed_prediction),
         ("Procesador del Modelo", test_model_processor)
     ]
     
@@ -320,6 +477,55 @@ def show_info():
     print(f"   Duración grabación: {CAPTURE_CONFIG['recording_duration']}s")
     print(f"   Duración countdown: {CAPTURE_CONFIG['countdown_duration']}s")
 
+def run_batch_recognition(args):
+    """Reconocimiento por lotes de videos archivados (ver batch_recognition.py)"""
+    from batch_recognition import run_batch
+    
+    print("🎞️ RECONOCIMIENTO POR LOTES")
+    print("=" * 50)
+    
+    summary = run_batch(
+        args.batch,
+        Path(args.output),
+        workers=args.workers,
+        top_k=args.top_k,
+        resume=not args.no_resume
+    )
+    
+    if not summary["clips"]:
+        print("✅ No hay clips pendientes")
+        return
+    
+    print("\n📊 RESUMEN:")
+    print(f"   Clips: {summary['clips']} (✅ {summary['ok']} | 👋 sin manos {summary['no_hands']} | ❌ errores {summary['error']})")
+    print(f"   Caché de keypoints: {summary['cached']} clips sin decodificar")
+    print(f"   Tiempo: {summary['elapsed_s']:.1f}s")
+    print(f"   Throughput: {summary['clips_per_s']:.2f} clips/s | {summary['frames_per_s']:.1f} frames/s "
+          f"({summary['video_frames_per_s']:.1f} frames de video/s decodificados)")
+    print(f"   Resultados: {args.output}")
+
+def run_pipeline_benchmark(args):
+    """Benchmark por etapa del pipeline (ver pipeline_benchmark.py)"""
+    from pipeline_benchmark import run_benchmark
+    
+    print("⏱️ BENCHMARK DEL PIPELINE")
+    print("=" * 50)
+    
+    run_benchmark(
+        output_path=Path(args.bench_output),
+        iterations=args.iterations,
+        fixtures_path=args.bench_fixtures,
+        compare_path=args.bench_compare
+    )
+
+def run_micro_benchmarks(args):
+    """Implementación actual vs. original de las etapas optimizadas (ver pipeline_benchmark.py)"""
+    from pipeline_benchmark import run_micro_benchmarks
+    
+    print("⏱️ MICRO-BENCHMARKS")
+    print("=" * 50)
+    run_micro_benchmarks()
+
 def main():
     """Función principal del script de utilidades"""
     parser = argparse.ArgumentParser(
@@ -329,8 +535,12 @@ def main():
 Ejemplos de uso:
   python utils.py --install-deps    # Instalar dependencias
   python utils.py --test           # Ejecutar todas las pruebas
+  python utils.py --test --test-clips a.mp4 b.mp4   # Pruebas con dos videos reales (con manos)
   python utils.py --start          # Iniciar el servidor
   python utils.py --info           # Mostrar información del sistema
+  python utils.py --batch clips/ --output resultados.jsonl   # Reconocimiento por lotes
+  python utils.py --bench --bench-compare bench_anterior.json  # Benchmark por etapa
+  python utils.py --micro-bench    # Implementación actual vs. original por etapa
         """
     )
     
@@ -338,6 +548,8 @@ Ejemplos de uso:
                        help='Instalar dependencias desde requirements.txt')
     parser.add_argument('--test', action='store_true',
                        help='Ejecutar todas las pruebas del sistema')
+    parser.add_argument('--test-clips', nargs=2, metavar='VIDEO', default=None,
+                       help='Videos con manos para la prueba de aislamiento entre clips')
     parser.add_argument('--start', action='store_true',
                        help='Iniciar el servidor')
     parser.add_argument('--info', action='store_true',
@@ -346,13 +558,37 @@ Ejemplos de uso:
                        help='Probar acceso a la cámara')
     parser.add_argument('--check-deps', action='store_true',
                        help='Verificar dependencias')
+    parser.add_argument('--batch', nargs='+', metavar='ENTRADA',
+                       help='Reconocimiento por lotes: directorios, listas .txt o videos')
+    parser.add_argument('--output', default='batch_results.jsonl',
+                       help='Salida del lote (.jsonl o .csv)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Procesos de extracción (default: CPUs - 1)')
+    parser.add_argument('--top-k', type=int, default=3,
+                       help='Predicciones por clip')
+    parser.add_argument('--no-resume', action='store_true',
+                       help='Reprocesar todo (sobrescribe la salida)')
+    parser.add_argument('--bench', action='store_true',
+                       help='Benchmark por etapa del pipeline (p50/p95/p99 y throughput)')
+    parser.add_argument('--bench-output', default='bench_results.json',
+                       help='JSON de resultados del benchmark')
+    parser.add_argument('--bench-fixtures', default=None, metavar='RUTA',
+                       help='Fixtures grabados: video o directorio con imágenes y secuencias .npy')
+    parser.add_argument('--bench-compare', default=None, metavar='JSON',
+                       help='Reporte anterior contra el que comparar')
+    parser.add_argument('--iterations', type=int, default=200,
+                       help='Mediciones por etapa')
+    parser.add_argument('--micro-bench', action='store_true',
+                       help='Micro-benchmarks: implementación actual vs. original (decodificación, keypoints, ...)')
     
     args = parser.parse_args()
+    if args.top_k < 1:
+        parser.error("--top-k debe ser al menos 1")
     
     if args.install_deps:
         install_dependencies()
     elif args.test:
-        run_full_test()
+        run_full_test(args.test_clips)
     elif args.start:
         start_server()
     elif args.info:
@@ -361,6 +597,12 @@ Ejemplos de uso:
         test_camera()
     elif args.check_deps:
         check_dependencies()
+    elif args.batch:
+        run_batch_recognition(args)
+    elif args.bench:
+        run_pipeline_benchmark(args)
+    elif args.micro_bench:
+        run_micro_benchmarks(args)
     else:
         parser.print_help()
 
@@ -0,0 +1,199 @@
+"""
+Procesamiento de videos completos en el servidor
+
+El video subido se decodifica con OpenCV y se muestrean N frames por
+timestamp (equiespaciados en la duración, como hacía el cliente al hacer seek
+sobre el <video>). Los frames se leen en una sola pasada secuencial: `grab()`
+avanza sin convertir y solo los frames muestreados se decodifican con
+`retrieve()`, sin re-encodear a JPEG ni pasar por base64.
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import UPLOAD_CONFIG
+from keypoint_cache import KeypointCache, hash_file
+from keypoint_extractor import HandKeypointExtractor
+from recognition_session import VideoUploadProcessor
+
+
+def probe_video(path) -> Dict[str, Any]:
+    """
+    Metadatos del video (fps, frames, duración, resolución)
+
+    Raises:
+        ValueError: si OpenCV no puede abrir el archivo
+    """
+    capture = cv2.VideoCapture(str(path))
+    try:
+        if not capture.isOpened():
+            raise ValueError("No se pudo abrir el video (formato no soportado o archivo dañado)")
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        if frame_count <= 0:
+            # Contenedores sin índice (p. ej. webm de MediaRecorder): contar frames
+            frame_count = 0
+            while capture.grab():
+                frame_count += 1
+        if frame_count <= 0:
+            raise ValueError("El video no contiene frames")
+        if fps <= 0:
+            fps = UPLOAD_CONFIG["fallback_fps"]
+        return {
+            "fps": fps,
+            "frame_count": frame_count,
+            "duration": frame_count / fps,
+            "width": int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        }
+    finally:
+        capture.release()
+
+
+def sample_frame_indices(frame_count: int, fps: float, count: int) -> np.ndarray:
+    """
+    Índices de los frames más cercanos a `count` timestamps equiespaciados
+
+    Cada timestamp es el centro de su intervalo (duración / count), así el
+    primer y el último frame muestreados no caen en los bordes del video.
+    Si el video tiene menos frames que `count`, hay índices repetidos.
+    """
+    duration = frame_count / fps
+    timestamps = (np.arange(count) + 0.5) * (duration / count)
+    return np.minimum((timestamps * fps).astype(np.int64), frame_count - 1)
+
+
+def iter_sampled_frames(path, indices: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Recorre el video una vez y entrega (índice, frame BGR) para cada índice pedido
+
+    Los índices deben estar ordenados; los repetidos reutilizan el mismo frame.
+    """
+    capture = cv2.VideoCapture(str(path))
+    try:
+        position = -1
+        frame = None
+        for index in indices:
+            while position < index:
+                if not capture.grab():
+                    return
+                position += 1
+                frame = None
+            if frame is None:
+                ok, frame = capture.retrieve()
+                if not ok:
+                    return
+            yield int(index), frame
+    finally:
+        capture.release()
+
+
+def extract_video_keypoints(path, sample_frames: int = UPLOAD_CONFIG["sample_frames"],
+                            extractor: Optional[HandKeypointExtractor] = None,
+                            cache: Optional[KeypointCache] = None,
+                            content_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Decodifica el video, muestrea frames por timestamp y extrae sus keypoints
+
+    Args:
+        path: Ruta del video
+        sample_frames: Frames a muestrear (default: 50, la entrada del modelo)
+        extractor: Extractor a reutilizar (p. ej. uno por worker); se reinicia su
+            tracking antes del clip. Si no se pasa, se crea uno
+        cache: Caché de keypoints a consultar antes de decodificar (y a completar después)
+        content_hash: Hash del contenido ya calculado (p. ej. durante la copia del
+            upload); si no se pasa y hay caché, se hashea el archivo
+
+    Returns:
+        Diccionario con la secuencia de keypoints (None si no alcanza el mínimo),
+        los metadatos del video, los tiempos de cada etapa y si vino de la caché
+
+    Raises:
+        ValueError: si el video no se puede abrir o su duración está fuera de rango
+    """
+    start = time.perf_counter()
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.key_for(content_hash or hash_file(path), sample_frames)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            cached["cached"] = True
+            cached["timing_ms"] = {"total": round((time.perf_counter() - start) * 1000, 1), "decode": 0.0, "extract": 0.0}
+            return cached
+
+    video_info = probe_video(path)
+    if video_info["duration"] < UPLOAD_CONFIG["min_duration_s"]:
+        raise ValueError(f"Video muy corto: {video_info['duration']:.2f}s - "
+                         f"Se necesita al menos {UPLOAD_CONFIG['min_duration_s']:.0f} segundo")
+    if video_info["duration"] > UPLOAD_CONFIG["max_duration_s"]:
+        raise ValueError(f"Video muy largo: {video_info['duration']:.1f}s "
+                         f"(máximo {UPLOAD_CONFIG['max_duration_s']}s)")
+
+    owns_extractor = extractor is None
+    if owns_extractor:
+        extractor = HandKeypointExtractor()
+    else:
+        # Las manos del clip anterior no deben sembrar el tracking de este
+        extractor.reset_tracking()
+    extractor.processing_mode = "upload"
+
+    processor = VideoUploadProcessor()
+    processor.target_frames = sample_frames
+    indices = sample_frame_indices(video_info["frame_count"], video_info["fps"], sample_frames)
+
+    decode_time = 0.0
+    extract_time = 0.0
+    try:
+        frames = iter_sampled_frames(path, indices)
+        while True:
+            decode_start = time.perf_counter()
+            sampled = next(frames, None)
+            decode_time += time.perf_counter() - decode_start
+            if sampled is None:
+                break
+
+            extract_start = time.perf_counter()
+            hands_detected, keypoints, _ = extractor.detect_hands_in_frame(sampled[1])
+            processor.add_frame(keypoints if hands_detected else None)
+            extract_time += time.perf_counter() - extract_start
+    finally:
+        if owns_extractor:
+            extractor.cleanup()
+
+    extraction = {
+        "keypoints": processor.get_keypoints_sequence(),
+        "frames_sampled": processor.total_frames,
+        "frames_with_hands": processor.frames_with_hands,
+        "video": {key: round(value, 3) if isinstance(value, float) else value for key, value in video_info.items()},
+        "cached": False
+    }
+    if cache_key is not None:
+        cache.put(cache_key, extraction)
+    extraction["timing_ms"] = {
+        "total": round((time.perf_counter() - start) * 1000, 1),
+        "decode": round(decode_time * 1000, 1),
+        "extract": round(extract_time * 1000, 1)
+    }
+    return extraction
+
+
+if __name__ == "__main__":
+    import sys
+
+    from keypoint_cache import get_keypoint_cache
+
+    if len(sys.argv) < 2:
+        print("Uso: python video_processing.py <video> [frames]")
+        sys.exit(1)
+
+    result = extract_video_keypoints(Path(sys.argv[1]), *(int(arg) for arg in sys.argv[2:3]),
+                                     cache=get_keypoint_cache())
+    sequence = result["keypoints"]
+    print(f"🎬 {sys.argv[1]}: {result['video']}")
+    print(f"   Frames muestreados: {result['frames_sampled']}, con manos: {result['frames_with_hands']}")
+    print(f"   Secuencia: {None if sequence is None else sequence.shape}")
+    print(f"   Tiempos (ms): {result['timing_ms']} | caché: {'hit' if result['cached'] else 'miss'}")
@@ -14,11 +14,26 @@ let guidanceBlockInterval = null;  // Interval para forzar ocultamiento durante
 let currentSettings = {
     confidenceThreshold: 0.6,
     predictionCount: 3,
-    frameRate: 50  // 20 FPS (1000ms ÷ 20 = 50ms) para capturar exactamente 50 frames en 2.5s
+    frameRate: 50,  // 20 FPS (1000ms ÷ 20 = 50ms) para capturar exactamente 50 frames en 2.5s
+    recognitionMode: 'countdown',  // 'countdown' (cuenta regresiva + grabación) | 'continuous' (ventana deslizante)
+    adaptiveRate: true  // Aplicar las recomendaciones de fps/resolución/calidad del servidor (rate_hint)
 };
 
+// Captura recomendada por el servidor; intervalMs null = usar currentSettings.frameRate
+const DEFAULT_JPEG_QUALITY = 0.85;
+let captureHint = { intervalMs: null, jpegQuality: DEFAULT_JPEG_QUALITY };
+// Última recomendación recibida, aunque adaptiveRate esté desactivado (el servidor solo la envía al cambiar)
+let lastRateHint = null;
+
 const maxReconnectAttempts = 5;
 
+// Protocolo de frames binarios: cabecera de 8 bytes + JPEG crudo (ver backend/frame_protocol.py)
+const FRAME_PROTOCOL_VERSION = 1;
+const FRAME_HEADER_SIZE = 8;
+const FRAME_SOURCE_CAMERA = 0;
+const FRAME_SOURCE_UPLOAD = 1;
+let frameSequence = 0;
+
 // ===== INITIALIZATION =====
 document.addEventListener('DOMContentLoaded', function() {
     initializeApp();
@@ -72,6 +87,31 @@ function setupEventListeners() {
         });
     }
     
+    const recognitionModeSelect = document.getElementById('recognitionMode');
+    if (recognitionModeSelect) {
+        recognitionModeSelect.addEventListener('change', function() {
+            currentSettings.recognitionMode = this.value;
+            hideCountdown();
+            hideRecordingIcon();
+            hidePauseOverlay();
+            saveSettings();
+        });
+    }
+    
+    const adaptiveRateSelect = document.getElementById('adaptiveRate');
+    if (adaptiveRateSelect) {
+        adaptiveRateSelect.addEventListener('change', function() {
+            currentSettings.adaptiveRate = this.value === 'on';
+            // Al activarla se aplica la última recomendación; al desactivarla se vuelve a frameRate
+            if (currentSettings.adaptiveRate && lastRateHint) {
+                applyRateHint(lastRateHint);
+            } else {
+                resetRateHint();
+            }
+            saveSettings();
+        });
+    }
+    
     // Filter buttons
     const filterButtons = document.querySelectorAll('.filter-btn');
     filterButtons.forEach(btn => {
@@ -195,46 +235,6 @@ function handleCameraError(err) {
 }
 
 // ===== WEBSOCKET MANAGEMENT =====
-function connectWebSocketForVideoUpload() {
-    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}/ws`;
-    
-    console.log('📡 VIDEO UPLOAD: Conectando al servidor...');
-    // NO actualizar status ni connection status para no interferir con UI de cámara
-    
-    ws = new WebSocket(wsUrl);
-    
-    ws.onopen = function() {
-        console.log('✅ VIDEO UPLOAD: Conectado al servidor WebSocket');
-        // NO activar isStreaming ni startStreaming para no interferir con cámara
-        reconnectAttempts = 0;
-    };
-    
-    ws.onmessage = function(event) {
-        try {
-            const data = JSON.parse(event.data);
-            handleWebSocketMessage(data);
-        } catch (err) {
-            console.error('VIDEO UPLOAD: Error parsing WebSocket message:', err);
-        }
-    };
-    
-    ws.onclose = function(event) {
-        console.log('📡 VIDEO UPLOAD: Conexión WebSocket cerrada');
-        // NO cambiar isStreaming ni updateConnectionStatus para no afectar cámara
-        
-        if (!event.wasClean) {
-            console.log('📡 VIDEO UPLOAD: Conexión perdida durante video upload');
-            // NO intentar reconectar automáticamente durante video upload
-        }
-    };
-    
-    ws.onerror = function(error) {
-        console.error('VIDEO UPLOAD: WebSocket error:', error);
-        // NO actualizar UI status para no interferir con cámara
-    };
-}
-
 function connectWebSocket() {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
     const wsUrl = `${protocol}//${window.location.host}/ws`;
@@ -249,6 +249,9 @@ function connectWebSocket() {
         updateConnectionStatus('connected');
         isStreaming = true;
         reconnectAttempts = 0;
+        lastRateHint = null;
+        resetRateHint();
+        sendSettings();
         startStreaming();
     };
     
@@ -309,6 +312,11 @@ function handleWebSocketMessage(data) {
         return;
     }
     
+    // Recomendación de captura del servidor (fps, resolución, calidad)
+    if (data.rate_hint) {
+        applyRateHint(data.rate_hint);
+    }
+    
     // Handle camera restoration after video upload
     if (data.type === 'camera_restored') {
         console.log('📷 FRONTEND: Cámara restaurada después de video upload');
@@ -482,14 +490,21 @@ function handleServerStatus(status, data) {
         if (data.recording_progress !== undefined) {
             updateRecordingProgress(data.recording_progress);
         }
+    } else if (status.includes('Reconocimiento continuo') || status.includes('🔁')) {
+        hideGuidanceMessage();
+        hideCountdown();
+        hideRecordingIcon();
+        hidePauseOverlay();
     } else if (status.includes('Predicción completada') || status.includes('✅')) {
         hideGuidanceMessage();
         hideCountdown();
         hideRecordingIcon();
         hidePauseOverlay();
         
-        // Auto-stop camera immediately after prediction completion
-        stopCamera();
+        // Auto-stop camera immediately after prediction completion (en modo continuo la cámara sigue)
+        if (data.recognition_mode !== 'continuous') {
+            stopCamera();
+        }
     }
     
     // Update the main status message
@@ -504,6 +519,20 @@ function getStatusType(status) {
 }
 
 // ===== VIDEO STREAMING =====
+function buildBinaryFrame(jpegBlob, source) {
+    // Cabecera: versión (u8), origen (u8), flags (u16), secuencia (u32) - big-endian
+    const header = new ArrayBuffer(FRAME_HEADER_SIZE);
+    const view = new DataView(header);
+    view.setUint8(0, FRAME_PROTOCOL_VERSION);
+    view.setUint8(1, source);
+    view.setUint16(2, 0);
+    view.setUint32(4, frameSequence);
+    frameSequence = (frameSequence + 1) >>> 0;
+    
+    // El Blob compuesto evita copiar el JPEG y no requiere FileReader ni base64
+    return new Blob([header, jpegBlob]);
+}
+
 function startStreaming() {
     if (isStreaming && ws && ws.readyState === WebSocket.OPEN) {
         ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
@@ -511,27 +540,41 @@ function startStreaming() {
         canvas.toBlob(function(blob) {
             if (!blob) return;
             
-            const reader = new FileReader();
-            reader.onload = function() {
-                const base64data = reader.result.split(',')[1];
-                
-                if (ws && ws.readyState === WebSocket.OPEN) {
-                    ws.send(JSON.stringify({
-                        type: 'frame',
-                        data: base64data,
-                        settings: currentSettings
-                    }));
-                }
-            };
-            reader.readAsDataURL(blob);
-        }, 'image/jpeg', 0.85);
+            if (ws && ws.readyState === WebSocket.OPEN) {
+                ws.send(buildBinaryFrame(blob, FRAME_SOURCE_CAMERA));
+            }
+        }, 'image/jpeg', captureHint.jpegQuality);
     }
     
     if (isStreaming) {
-        setTimeout(startStreaming, currentSettings.frameRate);
+        // La configuración del usuario es el máximo de fps; el servidor puede pedir menos
+        setTimeout(startStreaming, Math.max(captureHint.intervalMs || 0, currentSettings.frameRate));
     }
 }
 
+function applyRateHint(hint) {
+    lastRateHint = hint;
+    if (!currentSettings.adaptiveRate) return;
+    
+    captureHint.intervalMs = hint.frame_interval_ms;
+    captureHint.jpegQuality = hint.jpeg_quality;
+    resizeCaptureCanvas(hint.max_width);
+    console.log(`⚙️ Captura ajustada (${hint.state}): ${hint.fps} fps, calidad ${hint.jpeg_quality}, ${canvas.width}x${canvas.height}`);
+}
+
+function resetRateHint() {
+    captureHint = { intervalMs: null, jpegQuality: DEFAULT_JPEG_QUALITY };
+    resizeCaptureCanvas(Infinity);
+}
+
+function resizeCaptureCanvas(maxWidth) {
+    // Solo el canvas de captura: el video en pantalla mantiene su resolución
+    if (!video || !video.videoWidth) return;
+    const scale = Math.min(1, maxWidth / video.videoWidth);
+    canvas.width = Math.round(video.videoWidth * scale);
+    canvas.height = Math.round(video.videoHeight * scale);
+}
+
 // ===== UI UPDATES =====
 function updatePredictions(data) {
     console.log('🔍 updatePredictions llamado con:', data);
@@ -795,6 +838,17 @@ function loadSettings() {
 
 function saveSettings() {
     localStorage.setItem('aiSignLangSettings', JSON.stringify(currentSettings));
+    sendSettings();
+}
+
+function sendSettings() {
+    // Los frames binarios no llevan settings: el servidor usa los últimos recibidos
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({
+            type: 'settings',
+            settings: currentSettings
+        }));
+    }
 }
 
 function updateSettingsUI() {
@@ -802,11 +856,15 @@ function updateSettingsUI() {
     const confidenceValue = document.getElementById('confidenceValue');
     const predictionSelect = document.getElementById('predictionCount');
     const frameRateSelect = document.getElementById('frameRate');
+    const recognitionModeSelect = document.getElementById('recognitionMode');
+    const adaptiveRateSelect = document.getElementById('adaptiveRate');
     
     if (confidenceSlider) confidenceSlider.value = currentSettings.confidenceThreshold;
     if (confidenceValue) confidenceValue.textContent = currentSettings.confidenceThreshold;
     if (predictionSelect) predictionSelect.value = currentSettings.predictionCount;
     if (frameRateSelect) frameRateSelect.value = currentSettings.frameRate;
+    if (recognitionModeSelect) recognitionModeSelect.value = currentSettings.recognitionMode;
+    if (adaptiveRateSelect) adaptiveRateSelect.value = currentSettings.adaptiveRate ? 'on' : 'off';
 }
 
 function toggleSettings() {
@@ -1471,46 +1529,11 @@ async function handleVideoUpload(event) {
         startGuidanceBlocking();
         
         showLoadingOverlay('Procesando video...');
-        updateStatus('📹 Procesando video subido...', 'info');
-        
-        // Reset video upload processor on server
-        if (ws && ws.readyState === WebSocket.OPEN) {
-            console.log('🔄 VIDEO UPLOAD: Enviando reset al servidor');
-            ws.send(JSON.stringify({
-                type: 'reset_video_upload',
-                source: 'upload_init'  // Identificar como inicialización de upload
-            }));
-        }
-        
-        // Create video element for processing
-        const videoElement = document.createElement('video');
-        videoElement.src = URL.createObjectURL(file);
-        videoElement.muted = true;
+        updateStatus('📤 Subiendo video al servidor...', 'info');
         
-        videoElement.onloadedmetadata = async function() {
-            try {
-                await processVideoFrames(videoElement);
-            } catch (err) {
-                console.error('Error processing video:', err);
-                updateStatus('❌ Error procesando video: ' + err.message, 'error');
-                showErrorModal('Error de Video', 'No se pudo procesar el video. Asegúrate de que sea un formato válido.');
-            } finally {
-                isProcessingVideoUpload = false;
-                stopGuidanceBlocking();  // Terminar bloqueo activo
-                cleanupVideoUploadConnection();  // Limpiar conexión si es necesario
-                hideLoadingOverlay();
-                URL.revokeObjectURL(videoElement.src);
-            }
-        };
-        
-        videoElement.onerror = function() {
-            isProcessingVideoUpload = false;
-            stopGuidanceBlocking();  // Terminar bloqueo activo
-            cleanupVideoUploadConnection();  // Limpiar conexión si es necesario
-            hideLoadingOverlay();
-            updateStatus('❌ Error cargando video', 'error');
-            showErrorModal('Error de Video', 'No se pudo cargar el video. Verifica que sea un formato compatible.');
-        };
+        // El servidor decodifica el video, muestrea los 50 frames y predice en un solo job
+        const data = await uploadVideoForPrediction(file);
+        handleVideoUploadResponse(data);
         
     } catch (err) {
         console.error('Error uploading video:', err);
@@ -1520,122 +1543,28 @@ async function handleVideoUpload(event) {
         hideLoadingOverlay();
         updateStatus('❌ Error subiendo video', 'error');
         showErrorModal('Error', 'Error al procesar el archivo de video.');
+    } finally {
+        // Permitir subir el mismo archivo otra vez
+        event.target.value = '';
     }
 }
 
-async function processVideoFrames(videoElement) {
-    return new Promise((resolve, reject) => {
-        // Nota: No pausamos la cámara para evitar interferir con el flujo
-        const wasStreaming = isStreaming;
-        
-        // Connect to WebSocket if not connected - MODO VIDEO UPLOAD
-        if (!ws || ws.readyState !== WebSocket.OPEN) {
-            console.log('📡 VIDEO UPLOAD: Estableciendo conexión WebSocket independiente');
-            connectWebSocketForVideoUpload();
-            
-            // Wait for connection
-            const checkConnection = setInterval(() => {
-                if (ws && ws.readyState === WebSocket.OPEN) {
-                    clearInterval(checkConnection);
-                    console.log('✅ VIDEO UPLOAD: Conexión WebSocket establecida');
-                    startVideoFrameExtraction(videoElement, resolve, reject, wasStreaming);
-                }
-            }, 100);
-            
-            // Timeout after 10 seconds
-            setTimeout(() => {
-                clearInterval(checkConnection);
-                reject(new Error('No se pudo conectar al servidor para video upload'));
-            }, 10000);
-        } else {
-            console.log('🔄 VIDEO UPLOAD: Reutilizando conexión WebSocket existente');
-            startVideoFrameExtraction(videoElement, resolve, reject, wasStreaming);
-        }
-    });
-}
-
-function startVideoFrameExtraction(videoElement, resolve, reject, wasStreaming) {
-    const canvas = document.createElement('canvas');
-    const ctx = canvas.getContext('2d');
+async function uploadVideoForPrediction(file) {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('confidenceThreshold', currentSettings.confidenceThreshold);
+    formData.append('predictionCount', currentSettings.predictionCount);
     
-    canvas.width = 640;  // Standard width for processing
-    canvas.height = 480; // Standard height for processing
+    const response = await fetch('/api/video/predict', { method: 'POST', body: formData });
+    const data = await response.json();
     
-    const targetFrames = 50; // Exactamente 50 frames
-    const videoDuration = videoElement.duration;
-    const frameInterval = videoDuration / targetFrames;
-    
-    console.log(`📹 VIDEO UPLOAD: Extrayendo ${targetFrames} frames de video de ${videoDuration.toFixed(2)}s`);
-    
-    // Validación básica de duración
-    if (videoDuration < 1.0) {
-        reject(new Error(`Video muy corto: ${videoDuration.toFixed(2)}s - Se necesita al menos 1 segundo`));
-        return;
+    if (!response.ok) {
+        // Errores de validación (video muy corto, sin manos...) con el mismo formato que el WebSocket
+        return { source: 'upload', error: data.detail || `Error HTTP ${response.status}` };
     }
     
-    let currentTime = 0;
-    let framesProcessed = 0;
-    
-    const extractNextFrame = () => {
-        if (framesProcessed >= targetFrames) {
-            console.log(`✅ VIDEO UPLOAD: Extracción completada - ${framesProcessed} frames enviados`);
-            updateStatus('✅ Frames extraídos - Esperando predicción...', 'info');
-            
-            // Enviar mensaje de finalización al backend para trigger final de predicción
-            if (ws && ws.readyState === WebSocket.OPEN) {
-                console.log('🏁 VIDEO UPLOAD: Enviando mensaje de finalización al servidor');
-                ws.send(JSON.stringify({
-                    type: 'video_upload_finished',
-                    total_frames: targetFrames,
-                    settings: currentSettings,
-                    source: 'upload_finish'  // Identificar como finalización de upload
-                }));
-            }
-            
-            resolve();
-            return;
-        }
-        
-        videoElement.currentTime = currentTime;
-    };
-    
-    videoElement.onseeked = function() {
-        // Draw current frame to canvas
-        ctx.drawImage(videoElement, 0, 0, canvas.width, canvas.height);
-        
-        // Convert to blob and send via WebSocket
-        canvas.toBlob(function(blob) {
-            if (!blob) return;
-            
-            const reader = new FileReader();
-            reader.onload = function() {
-                const base64data = reader.result.split(',')[1];
-                
-                if (ws && ws.readyState === WebSocket.OPEN) {
-                    ws.send(JSON.stringify({
-                        type: 'frame',
-                        data: base64data,
-                        settings: currentSettings,
-                        source: 'upload'
-                    }));
-                }
-                
-                framesProcessed++;
-                currentTime += frameInterval;
-                
-                // Update progress locally
-                const progress = (framesProcessed / targetFrames) * 100;
-                updateStatus(`📹 Extrayendo frames: ${framesProcessed}/${targetFrames} (${Math.round(progress)}%)`, 'info');
-                
-                // Extract next frame
-                setTimeout(extractNextFrame, 50); // Faster extraction
-            };
-            reader.readAsDataURL(blob);
-        }, 'image/jpeg', 0.85);
-    };
-    
-    // Start extraction
-    extractNextFrame();
+    console.log(`⏱️ VIDEO UPLOAD: ${data.frames_with_hands}/${data.frames_sampled} frames con manos, tiempos (ms):`, data.timing_ms);
+    return data;
 }
 
 function handleVideoUploadResponse(data) {